@@ -11,9 +11,14 @@ if str(_SRC) not in sys.path:
     sys.path.insert(0, str(_SRC))
 
 # 2. Local imports (initialized modules)
-from state.session_state import initialize_session_state      # src/state/session_state.py
-from logic.trigger_engine import TriggerEngine, build_default_graph  # src/logic/trigger_engine.py
-from src.processors import register_all_processors                      # src/processors.py
+from state.session_state import get_trace_log, initialize_session_state, session_token  # src/state/session_state.py
+from src.core.trigger_engine_runtime import get_engine            # src/core/trigger_engine_runtime.py
+from src.utils.streamlit_compat import fragment                   # src/utils/streamlit_compat.py
+from src.config import ADMIN_MODE                                  # src/config/__init__.py
+from src.utils.profiling import MODES, profiled                    # src/utils/profiling.py
+from src.utils.llm_usage import session_id                         # src/utils/llm_usage.py
+from src.utils.memory import MEMORY_WATCH, record_rerun            # src/utils/memory.py
+from src.cross_components import TraceViewer                      # src/cross_components.py
 from pages.wizard import run_wizard                                  # src/pages/wizard.py
 
 # Global App Configuration
@@ -23,26 +28,43 @@ st.set_page_config(
     layout="centered"
 )
 
-engine = TriggerEngine()
-build_default_graph(engine)
-register_all_processors(engine)
-
-# 4. Initialize session state and TriggerEngine on first load
+# 4. Initialize session state; the TriggerEngine is built once per process
 initialize_session_state()
 if "trigger_engine" not in st.session_state:
-    engine = TriggerEngine()
-    build_default_graph(engine)
-    register_all_processors(engine)  # registers all processors (salary_range, publication_channels, etc.)
-    st.session_state["trigger_engine"] = engine
-# Ensure trace_events list for logging (for Trace-Viewer)
-if "trace_events" not in st.session_state:
-    st.session_state["trace_events"] = []
+    st.session_state["trigger_engine"] = get_engine()
+
+# 5. Run the multi-step wizard UI – optionally profiled (admin only: the sidebar
+#    toggle or ?profile=1|sample|cprofile); when off, run_wizard is called directly.
+def _profile_mode() -> str | None:
+    if not ADMIN_MODE:
+        return None                     # anonymous visitors cannot switch profiling on
+    with st.sidebar.expander("🛠️ Admin", expanded=False):
+        if st.checkbox("Profile wizard reruns", key="_profile_toggle"):
+            return st.radio("Profiler", MODES, horizontal=True, key="_profile_mode")
+    requested = st.query_params.get("profile")
+    if requested in ("1", "true"):
+        return "cprofile"
+    return requested if requested in MODES else None
+
+
+_mode = _profile_mode()
+if _mode:
+    profiled(run_wizard, mode=_mode, step=st.session_state.get("wizard_step", 1),
+             session=session_id(session_token()))      # never the raw token – it restores the session
+else:
+    run_wizard()
+if MEMORY_WATCH:
+    record_rerun(session_token(), st.session_state)      # growth tracking for the diagnostics page
 
-# 5. Run the multi-step wizard UI
-run_wizard()
 
 # 6. Optional Trace-Viewer panel in sidebar (for debugging/tracing events)
-if st.session_state.get("trace_events"):
-    with st.sidebar.expander("🪄 Trace-Viewer", expanded=False):
-        for ev in st.session_state.trace_events:
-            st.write(ev)
+@fragment
+def render_trace_viewer() -> None:
+    """Own fragment – filtering/paging the viewer does not rerun the wizard."""
+    with st.expander("🪄 Trace-Viewer", expanded=False):
+        TraceViewer().render_ui()
+
+
+if get_trace_log().total:
+    with st.sidebar:
+        render_trace_viewer()
@@ -1,18 +1,27 @@
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Mapping
 
 # Import Pydantic model
 from src.models.job_models import JobSpec
 
 # Import tool functions
-from src.tools.scraping_tools import scrape_company_site
-from src.tools.file_tools import extract_text_from_file
+from src.tools.site_crawler import crawl_company_site
+from src.tools.file_tools import FileContent, extract_text_from_file
 
 # Import summarization utility
 from src.utils.summarize import summarize_text
 
+# Rule-based pre-extraction (runs before the LLM)
+from src.utils.rule_extractor import confident_fields
+
+# Latency spans and usage accounting
+from src.utils.tracing import traced
+from src.utils.tool_registry import call_with_retry
+
 # Determine runtime mode (OpenAI vs LocalAI) via env or config
 USE_LOCAL_MODEL = os.getenv("VACALYSER_LOCAL_MODE", "0") == "1"
+# Seconds the company-site crawl may take before the prompt is sent without the rest
+CRAWL_DEADLINE = float(os.getenv("VACALYSER_CRAWL_DEADLINE", "6"))
 
 # If using local model, import or configure it (e.g., via Ollama API client)
 if USE_LOCAL_MODEL:
@@ -67,18 +76,25 @@ SYSTEM_MESSAGE = (
     "Return the information as JSON that matches the schema of the JobSpec model, with no extra commentary."
 )
 
-def auto_fill_job_spec(input_url: str = "", file_bytes: bytes = None, file_name: str = "", summary_quality: str = "standard") -> Dict[str, Any]:
+def requested_keys(known: Mapping[str, str]) -> List[str]:
+    """JobSpec fields the model is asked for – everything the rules did not already fill."""
+    return [name for name in JobSpec.model_fields if name not in known]
+
+
+@traced("agent.auto_fill_job_spec")
+def auto_fill_job_spec(input_url: str = "", file_bytes: FileContent = None, file_name: str = "", summary_quality: str = "standard", raw_text: str = "") -> Dict[str, Any]:
     """
     Analyze a job description from a URL or file and return extracted fields as a dictionary.
     - input_url: URL of a job advertisement webpage.
-    - file_bytes: Raw bytes of an uploaded job description file.
+    - file_bytes: Raw content of an uploaded job description file (bytes, memoryview or binary file object).
     - file_name: Filename of the uploaded file.
     - summary_quality: One of {"economy", "standard", "high"} indicating how much to compress the content if it's large.
+    - raw_text: Already extracted ad text (e.g. from the bulk ingestion workers); used instead of a file.
     """
     # Validate input
-    if not input_url and not file_bytes:
-        raise ValueError("auto_fill_job_spec requires either a URL or a file input.")
-    if input_url and file_bytes:
+    if not input_url and file_bytes is None and not raw_text:
+        raise ValueError("auto_fill_job_spec requires a URL, a file or extracted text.")
+    if input_url and file_bytes is not None:
         # If both are provided, we prioritize URL and ignore the file to avoid confusion.
         file_bytes = None
         file_name = ""
@@ -87,54 +103,59 @@ def auto_fill_job_spec(input_url: str = "", file_bytes: bytes = None, file_name:
     user_message = ""
     if input_url:
         user_message += f"The job ad is located at this URL: {input_url}\n"
-    if file_bytes:
+    if file_bytes is not None or raw_text:
         user_message += "A job ad file is provided. Please analyze its contents carefully.\n"
-    user_message += "Extract all relevant job information and return it in JSON format matching the JobSpec schema."
 
-    # If the input text might be very long, consider summarizing it to compress context
-    # (We perform summarization outside the model to conserve tokens in the prompt if needed)
-    if file_bytes and file_name:
-        # If it's a file, we can attempt to compress if the text is huge.
-        try:
-            text_length = len(file_bytes)
-        except Exception:
-            text_length = 0
-        # Heuristics: if file size > 100KB, do summarization depending on quality
-        if text_length > 100_000:  # ~100 KB
-            extracted_text = extract_text_from_file(file_content=file_bytes.decode('utf-8', errors='ignore'), filename=file_name)
-            if isinstance(extracted_text, str) and len(extracted_text) > 5000:  # if extracted text is large
-                summary = summarize_text(extracted_text, quality=summary_quality)
-                # Replace user instruction to refer to summary instead of full text
-                user_message = (
-                    "The job ad text was summarized due to length. Please extract job info from the following summary:\n"
-                    f"{summary}\nReturn the info as JSON per JobSpec."
-                )
+    rule_fields: Dict[str, str] = {}
+
+    # Extract the file text exactly once, straight from the raw bytes (decoding a
+    # PDF/DOCX as UTF-8 first would both copy and corrupt it).
+    if raw_text or (file_bytes is not None and file_name):
+        text = raw_text
+        if not text:
+            try:
+                text = extract_text_from_file(file_content=file_bytes, filename=file_name)
+            except Exception as e:
+                user_message += f"\n(Note: Could not extract file text: {e})"
+        # If the input text is very long, summarize it to compress context
+        # (We perform summarization outside the model to conserve tokens in the prompt)
+        if len(text) > 5000:
+            summary = summarize_text(text, quality=summary_quality)
+            # Replace user instruction to refer to summary instead of full text
+            user_message = (
+                "The job ad text was summarized due to length. Please extract job info from the following summary:\n"
+                f"{summary}"
+            )
+        elif text:
+            user_message += "\nFile content:\n" + text
+        else:
+            user_message += "\n(Note: No extractable text from file.)"
+
+        # Deterministic fast path: fields the rules fill confidently are not asked
+        # from the model (smaller prompt, fewer output tokens).
+        rule_fields = confident_fields(text)
+    user_message += (
+        "\nExtract all relevant job information and return it as one JSON object with only these "
+        "keys (leave out unknown ones): " + ", ".join(requested_keys(rule_fields))
+    )
     # (For URL content, the model will call scrape_company_site itself if needed, we handle large content in the tool itself if required.)
 
     if USE_LOCAL_MODEL:
         # Local model mode: we cannot rely on the model to call functions. So we handle URL/file upfront.
         if input_url:
             try:
-                site_info = scrape_company_site(url=input_url)
+                # Homepage plus about / careers / benefits pages, bounded by CRAWL_DEADLINE
+                site_info = crawl_company_site(input_url, deadline=CRAWL_DEADLINE)
                 # Append any info from site to the user_message to assist local model
                 if site_info.get("title") or site_info.get("description"):
                     user_message += "\n"
                     user_message += f"(Website summary: {site_info.get('title','')}: {site_info.get('description','')})"
+                for category, page in site_info.get("pages", {}).items():
+                    if page.get("description"):
+                        user_message += f"\n(Website {category} page: {page['description']})"
             except Exception as e:
                 # Log scraping error, but continue without it
                 user_message += f"\n(Note: Could not scrape site: {e})"
-        if file_bytes and file_name:
-            try:
-                text = extract_text_from_file(file_content=file_bytes.decode('utf-8', errors='ignore'), filename=file_name)
-                if text and isinstance(text, str):
-                    # Possibly summarize if too long
-                    if len(text) > 5000:
-                        text = summarize_text(text, quality=summary_quality)
-                    user_message += "\nFile content:\n" + text[:10000]  # include at most 10000 chars of text or summary
-                else:
-                    user_message += "\n(Note: No extractable text from file.)"
-            except Exception as e:
-                user_message += f"\n(Note: Could not extract file text: {e})"
         # Query local LLM with the constructed user_message
         try:
             response_text = local_client.generate(text=user_message, system=SYSTEM_MESSAGE)
@@ -145,7 +166,9 @@ def auto_fill_job_spec(input_url: str = "", file_bytes: bytes = None, file_name:
     else:
         # OpenAI API mode
         try:
-            response = openai_client.chat.completions.create(
+            response = call_with_retry(
+                openai_client.chat.completions.create,
+                operation="auto_fill_job_spec",
                 model="gpt-4-0613",  # using function-calling enabled model variant
                 messages=[
                     {"role": "system", "content": SYSTEM_MESSAGE},
@@ -199,7 +222,9 @@ def auto_fill_job_spec(input_url: str = "", file_bytes: bytes = None, file_name:
         if not USE_LOCAL_MODEL and openai_client:
             repair_system_msg = "Your previous output was not valid JSON. Only output a valid JSON matching JobSpec now."
             try:
-                repair_resp = openai_client.chat.completions.create(
+                repair_resp = call_with_retry(
+                    openai_client.chat.completions.create,
+                    operation="auto_fill_job_spec.repair",
                     model="gpt-4-0613",
                     messages=[
                         {"role": "system", "content": SYSTEM_MESSAGE},
@@ -219,5 +244,9 @@ def auto_fill_job_spec(input_url: str = "", file_bytes: bytes = None, file_name:
                 return {}
         else:
             return {}
-    # Convert to dictionary (Pydantic model -> dict)
-    return job_spec.model_dump()
+    # Convert to dictionary (Pydantic model -> dict) and add the rule-based fields
+    result = job_spec.model_dump()
+    for key, value in rule_fields.items():
+        if not result.get(key):
+            result[key] = value
+    return result
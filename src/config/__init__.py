@@ -1 +1,12 @@
+"""
+Process-wide switches read from the environment.
 
+Environment variables:
+
+    VACALYSER_ADMIN=1    admin tools: profiling toggle / ``?profile=``, diagnostics page
+"""
+
+import os
+
+# Admin tools expose every session's data and add overhead – off on public deployments
+ADMIN_MODE = os.getenv("VACALYSER_ADMIN", "0") == "1"
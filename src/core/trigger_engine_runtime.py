@@ -1,31 +1,35 @@
 """
 Glue-code that
-• instantiates the TriggerEngine only once,
-• computes diffs on every rerun,
+• instantiates the TriggerEngine only once per process (graph + processors are
+  stateless – every call receives the session state explicitly),
+• reads the changed fields from the VacancyState's dirty flags (no
+  deep-copied snapshot of the whole session),
 • fires processors for *each* changed key.
 """
 
 from __future__ import annotations
 import streamlit as st
-from copy import deepcopy
 from src.logic.trigger_engine import TriggerEngine, build_default_graph
-from src.logic.processors import register_all_processors   # you’ll create this
+from src.processors import register_all_processors
+from src.state.session_state import get_vacancy_state
 
-# one global engine
-if "_engine" not in st.session_state:
-    st.session_state["_engine"] = TriggerEngine()
-    build_default_graph(st.session_state["_engine"])
-    register_all_processors(st.session_state["_engine"])
 
-engine: TriggerEngine = st.session_state["_engine"]
+@st.cache_resource(show_spinner=False)
+def get_engine() -> TriggerEngine:
+    """Build the trigger engine once and share it across reruns and sessions."""
+    engine = TriggerEngine()
+    build_default_graph(engine)
+    register_all_processors(engine)  # salary_range, publication_channels, …
+    return engine
 
-def dispatch_triggers() -> None:
-    prev: dict = st.session_state.get("_snapshot", {})
-    current = {k: v for k, v in st.session_state.items() if not k.startswith("_")}
-    changed = [k for k, v in current.items() if prev.get(k) != v]
 
-    for key in changed:
-        engine.notify_change(key, st.session_state)
+# one global engine
+engine: TriggerEngine = get_engine()
 
-    # store deep copy for next run
-    st.session_state["_snapshot"] = deepcopy(current)
+def dispatch_triggers() -> None:
+    """Fire processors for every wizard field changed since the last call."""
+    vacancy = get_vacancy_state()
+    changed = vacancy.dirty_keys()
+    for key in changed:
+        engine.notify_change(key, vacancy)
+    vacancy.clear_dirty(changed)
@@ -4,6 +4,9 @@ import time
 import streamlit as st
 from typing import Callable, Any, Dict, List
 
+from src.logic.question_generator import generate_questions
+from src.state.session_state import get_trace_log
+
 # --------------------------------------------------------------------- #
 #  1 · Tool-Registry – nur ChatGPT-Alias                                #
 # --------------------------------------------------------------------- #
@@ -55,57 +58,147 @@ class Guardrails:
 
 
 # --------------------------------------------------------------------- #
-#  3 · TraceViewer – sammelt Events in st.session_state                 #
+#  3 · TraceViewer – Ansicht auf das TraceLog der Session               #
 # --------------------------------------------------------------------- #
 class TraceViewer:
-    _STATE_KEY = "_trace_log"
+    """
+    Dünne Hülle um ``get_trace_log()`` (Ringpuffer, siehe state/trace_log.py).
+    Gerendert werden nur die neuesten ``_PAGE`` passenden Events, „Mehr“ lädt nach.
+    """
+    _LIMIT_KEY = "_trace_view_limit"
+    _PAGE = 50
 
     def __init__(self) -> None:
-        if self._STATE_KEY not in st.session_state:
-            st.session_state[self._STATE_KEY] = []
+        self._log = get_trace_log()
 
     def log(self, event: str, **payload):
-        st.session_state[self._STATE_KEY].append(
-            {"ts": round(time.time(), 3), "event": event, **payload}
-        )
+        details = payload.pop("details", "")
+        self._log.record(event, str(details), **payload)
 
     def render_ui(self):
-        for row in st.session_state[self._STATE_KEY]:
-            st.write(f"• {time.strftime('%H:%M:%S', time.localtime(row['ts']))}",
-                     row["event"], row.get("details", ""), row.get("data", ""))
+        log = self._log
+        if not log.total:
+            st.caption("Noch keine Events.")
+            return
+        tab_events, tab_timeline = st.tabs(["Events", "Timeline"])
+        with tab_events:
+            self._render_events(log)
+        with tab_timeline:
+            self.render_timeline()
+
+    def _render_events(self, log):
+        col_kind, col_text = st.columns([1, 1])
+        kinds = col_kind.multiselect("Art", log.kinds(), key="_trace_view_kinds")
+        contains = col_text.text_input("Filter", key="_trace_view_text")
+        limit = st.session_state.setdefault(self._LIMIT_KEY, self._PAGE)
+
+        rows = []
+        for ev in log.events(kinds=kinds or None, contains=contains, limit=limit, newest_first=True):
+            row = ev.as_dict()
+            row["ts"] = time.strftime("%H:%M:%S", time.localtime(ev.ts))
+            rows.append(row)
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f"{len(log)} von {log.total} Events im Speicher · {log.dropped} ausgelagert/verworfen")
+        if len(rows) >= limit:
+            st.button("Mehr anzeigen", key="_trace_view_more", on_click=self._show_more)
+
+    def render_timeline(self):
+        """Gantt-Ansicht eines Traces (Spans aus src/utils/tracing.py)."""
+        spans = self._log.events(kinds={"span"})
+        traces: Dict[str, List[Any]] = {}
+        for ev in spans:
+            traces.setdefault(ev.attrs["trace"], []).append(ev)
+        roots = [evs[0] for evs in traces.values() if evs[0].attrs.get("parent") is None]
+        if not roots:
+            st.caption("Noch keine Spans.")
+            return
+        roots.reverse()                         # neueste zuerst
+        root = st.selectbox(
+            "Trace", roots, key="_trace_view_trace",
+            format_func=lambda ev: f"{time.strftime('%H:%M:%S', time.localtime(ev.ts))} · "
+                                   f"{ev.message} · {ev.duration * 1000:.0f} ms",
+        )
+        depth = {root.attrs["span"]: 0}
+        rows = []
+        for ev in traces[root.attrs["trace"]]:
+            level = depth[ev.attrs["span"]] = depth.get(ev.attrs.get("parent"), -1) + 1
+            start_ms = (ev.ts - root.ts) * 1000
+            rows.append({
+                "span": f"{len(rows):02d} {'  ' * level}{ev.message}",
+                "start_ms": round(start_ms, 1),
+                "end_ms": round(start_ms + (ev.duration or 0) * 1000, 1),
+                "ms": round((ev.duration or 0) * 1000, 1),
+                "error": bool(ev.attrs.get("error")),
+            })
+        st.vega_lite_chart(rows, {
+            "mark": {"type": "bar", "cornerRadius": 2},
+            "encoding": {
+                "y": {"field": "span", "type": "ordinal", "sort": None, "title": None},
+                "x": {"field": "start_ms", "type": "quantitative", "title": "ms"},
+                "x2": {"field": "end_ms"},
+                "color": {"field": "error", "type": "nominal", "legend": None,
+                          "scale": {"domain": [False, True], "range": ["#4c78a8", "#e45756"]}},
+                "tooltip": [{"field": "span"}, {"field": "ms", "type": "quantitative"}],
+            },
+        }, use_container_width=True)
+
+    @classmethod
+    def _show_more(cls) -> None:
+        st.session_state[cls._LIMIT_KEY] += cls._PAGE
 
 
 # --------------------------------------------------------------------- #
-#  4 · DynamicQuestionEngine – einfache Warteschlange                   #
+#  4 · DynamicQuestionEngine – Warteschlange + gebündelte Folgefragen   #
 # --------------------------------------------------------------------- #
 class DynamicQuestionEngine:
+    """
+    Offene Folgefragen der Session. Die Warteschlange ist ein Dict
+    ``key → Frage`` (Einfügereihenfolge = Anzeigereihenfolge), Dedup ist O(1).
+    ``enqueue_missing`` erzeugt die Fragen für alle fehlenden Felder eines
+    Schritts mit *einem* LLM-Aufruf (``logic/question_generator.py``, gecacht
+    je Feldmenge und Rollenfamilie).
+    """
     _QUEUE_KEY = "_dq_queue"
     _ANSW_KEY  = "_dq_answers"
 
     def __init__(self) -> None:
         if self._QUEUE_KEY not in st.session_state:
-            st.session_state[self._QUEUE_KEY]: List[Dict[str, str]] = []
+            st.session_state[self._QUEUE_KEY]: Dict[str, str] = {}
         if self._ANSW_KEY not in st.session_state:
             st.session_state[self._ANSW_KEY]: Dict[str, str] = {}
+        self._queue: Dict[str, str] = st.session_state[self._QUEUE_KEY]
+        self._answers: Dict[str, str] = st.session_state[self._ANSW_KEY]
 
     # Frage einstellen
     def enqueue(self, key: str, question: str):
-        if key in st.session_state[self._ANSW_KEY]:
+        if key in self._answers:
             return                          # schon beantwortet
-        if not any(q["key"] == key for q in st.session_state[self._QUEUE_KEY]):
-            st.session_state[self._QUEUE_KEY].append({"key": key, "q": question})
+        self._queue.setdefault(key, question)
+
+    # Fragen für alle fehlenden Felder – ein gebündelter, gecachter LLM-Aufruf
+    def enqueue_missing(self, keys: List[str], *, job_title: str = "") -> Dict[str, str]:
+        new_keys = [k for k in keys if k not in self._answers and k not in self._queue]
+        if new_keys:
+            self._queue.update(generate_questions(new_keys, job_title=job_title))
+        return self.pending(keys)
+
+    # Offene Fragen (optional nur für *keys*, in deren Reihenfolge)
+    def pending(self, keys: List[str] | None = None) -> Dict[str, str]:
+        if keys is None:
+            return dict(self._queue)
+        return {k: self._queue[k] for k in keys if k in self._queue}
+
+    # Antwort übernehmen → Frage verlässt die Warteschlange
+    def answer(self, key: str, value: str):
+        if value:
+            self._answers[key] = value
+            self._queue.pop(key, None)
 
     # Alle offenen Fragen rendern
     def render_pending_questions(self):
-        if not st.session_state[self._QUEUE_KEY]:
+        if not self._queue:
             return
 
         st.subheader("↪ Folgefragen")
-        remaining = []
-        for item in st.session_state[self._QUEUE_KEY]:
-            answer = st.text_input(item["q"], key=f"dq_{item['key']}")
-            if answer:
-                st.session_state[self._ANSW_KEY][item["key"]] = answer
-            else:
-                remaining.append(item)      # bleibt weiter offen
-        st.session_state[self._QUEUE_KEY] = remaining
+        for key, question in list(self._queue.items()):
+            self.answer(key, st.text_input(question, key=f"dq_{key}"))
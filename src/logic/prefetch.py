@@ -0,0 +1,274 @@
+"""
+Speculative prefetch
+====================
+
+While the recruiter works on step N, the enrichments step N+1 will most
+likely want – a role breakdown for step 3, task / skill / salary suggestions
+for steps 4–7 – are computed in a background thread pool. When step N+1
+opens, the result is already there (``ready``), and the foreground functions
+behind it hit their ``LLMCache`` instead of calling the model again.
+
+* One job per (session, target step). Scheduling the same step again with an
+  unchanged spec is a no-op; a changed spec cancels the old job and starts a
+  new one.
+* ``cancel(session)`` drops a session's predictions (e.g. on "Back" or a new
+  ad). Queued jobs never run; a job already waiting on the model finishes
+  in its worker, but its result is discarded.
+* Per-session concurrency cap (``VACALYSER_PREFETCH_PER_SESSION``) – one
+  user clicking through quickly cannot occupy the whole pool.
+* Cost guard: at most ``VACALYSER_PREFETCH_MAX_JOBS`` speculative jobs per
+  session, and none once the session's booked LLM spend
+  (``llm_usage.session_cost``) reaches ``VACALYSER_PREFETCH_MAX_USD``.
+  Calls made by a job are booked for its session (``llm_usage.attributed``).
+
+Environment variables:
+
+    VACALYSER_PREFETCH=0                 disable prefetching
+    VACALYSER_PREFETCH_WORKERS           pool size, process-wide (default 4)
+    VACALYSER_PREFETCH_PER_SESSION       jobs running at once per session (default 2)
+    VACALYSER_PREFETCH_MAX_JOBS          jobs started per session (default 8)
+    VACALYSER_PREFETCH_MAX_USD           no prefetch above this session spend (default 0.25)
+
+Typical usage
+-------------
+>>> from src.logic.prefetch import prefetcher
+>>> prefetcher.schedule(token, 3, SessionState().get_job_spec_dict())   # doctest: +SKIP
+True
+>>> prefetcher.ready(token, 3)                                           # doctest: +SKIP
+{'role_description': '…', 'reports_to': 'Head of Data'}
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from src.config.keys import STEP_KEYS
+from src.logic.step_suggestions import suggest_step
+from src.utils.llm_cache import fingerprint
+from src.utils.llm_usage import attributed, session_cost
+from src.utils.tracing import span
+
+PREFETCH_ENABLED = os.getenv("VACALYSER_PREFETCH", "1") != "0"
+PREFETCH_WORKERS = int(os.getenv("VACALYSER_PREFETCH_WORKERS", "4"))
+PREFETCH_PER_SESSION = int(os.getenv("VACALYSER_PREFETCH_PER_SESSION", "2"))
+PREFETCH_MAX_JOBS = int(os.getenv("VACALYSER_PREFETCH_MAX_JOBS", "8"))
+PREFETCH_MAX_USD = float(os.getenv("VACALYSER_PREFETCH_MAX_USD", "0.25"))
+# Sessions whose jobs are remembered (oldest dropped first)
+_MAX_SESSIONS = 1000
+
+Enrichment = Callable[[Mapping[str, Any]], Dict[str, str]]
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 1  What to prefetch for which step
+# ────────────────────────────────────────────────────────────────────────────
+def _role_breakdown(spec: Mapping[str, Any]) -> Dict[str, str]:
+    from src.pipelines.role_breakdown import generate_role_breakdown   # openai/pydantic on demand
+
+    result = {}
+    for key, value in generate_role_breakdown(dict(spec)).items():
+        if isinstance(value, (list, tuple)):
+            value = "; ".join(map(str, value))
+        if key in STEP_KEYS[3] and value:
+            result[key] = str(value)
+    return result
+
+
+def _suggestions_for(step: int) -> Enrichment:
+    def run(spec: Mapping[str, Any]) -> Dict[str, str]:
+        return suggest_step(spec, step)
+    return run
+
+
+# target step → (name, enrichment); the result maps field → proposed value
+ENRICHMENTS: Dict[int, Tuple[str, Enrichment]] = {
+    3: ("role_breakdown", _role_breakdown),
+    4: ("task_suggestions", _suggestions_for(4)),
+    5: ("skill_suggestions", _suggestions_for(5)),
+    6: ("salary_and_benefits", _suggestions_for(6)),
+    7: ("process_suggestions", _suggestions_for(7)),
+}
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 2  Scheduler
+# ────────────────────────────────────────────────────────────────────────────
+class _Job:
+    __slots__ = ("step", "name", "fingerprint", "future", "cancelled")
+
+    def __init__(self, step: int, name: str, fp: str) -> None:
+        self.step = step
+        self.name = name
+        self.fingerprint = fp
+        self.future: Optional[Future] = None
+        self.cancelled = False
+
+
+class _SessionJobs:
+    __slots__ = ("jobs", "started", "running")
+
+    def __init__(self) -> None:
+        self.jobs: Dict[int, _Job] = {}
+        self.started = 0
+        self.running = 0                    # includes cancelled jobs still in a worker
+
+
+class PrefetchScheduler:
+    """Background enrichment jobs per (session, step) – see module docstring."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = PREFETCH_WORKERS,
+        per_session: int = PREFETCH_PER_SESSION,
+        max_jobs: int = PREFETCH_MAX_JOBS,
+        max_usd: float = PREFETCH_MAX_USD,
+        enrichments: Mapping[int, Tuple[str, Enrichment]] = ENRICHMENTS,
+    ) -> None:
+        self.workers = workers
+        self.per_session = per_session
+        self.max_jobs = max_jobs
+        self.max_usd = max_usd
+        self.enrichments = enrichments
+        self._lock = threading.RLock()     # done-callbacks of cancelled futures run under it
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._sessions: "OrderedDict[str, _SessionJobs]" = OrderedDict()
+        self.counts: Counter = Counter()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vacalyser-prefetch")
+        return self._pool
+
+    def _session(self, session: str) -> _SessionJobs:
+        jobs = self._sessions.get(session)
+        if jobs is None:
+            jobs = self._sessions[session] = _SessionJobs()
+            while len(self._sessions) > _MAX_SESSIONS:
+                _, dropped = self._sessions.popitem(last=False)
+                for job in dropped.jobs.values():
+                    self._cancel(job)
+        self._sessions.move_to_end(session)
+        return jobs
+
+    def _cancel(self, job: _Job) -> None:
+        job.cancelled = True
+        if job.future is not None:
+            job.future.cancel()             # only succeeds while still queued
+        self.counts["cancelled"] += 1
+
+    # ---------------------------------------------------------------- writes
+    def schedule(
+        self,
+        session: str,
+        step: int,
+        spec: Mapping[str, Any],
+        *,
+        attribution: Optional[Tuple[str, str, str]] = None,
+    ) -> bool:
+        """Start the enrichment for *step* from *spec*; True if a new job was queued."""
+        if not PREFETCH_ENABLED or step not in self.enrichments:
+            return False
+        name, enrich = self.enrichments[step]
+        spec = dict(spec)                   # the worker must not see later edits
+        fp = fingerprint(spec)
+        with self._lock:
+            state = self._session(session)
+            job = state.jobs.get(step)
+            if job is not None and job.fingerprint == fp and not job.cancelled:
+                return False                # same prediction already queued / done
+            if job is not None:
+                self._cancel(job)
+                del state.jobs[step]
+            if state.running >= self.per_session:
+                self.counts["capped"] += 1
+                return False
+            if state.started >= self.max_jobs or session_cost(session) >= self.max_usd:
+                self.counts["over_budget"] += 1
+                return False
+            job = state.jobs[step] = _Job(step, name, fp)
+            state.started += 1
+            state.running += 1
+            self.counts["scheduled"] += 1
+            job.future = self._executor().submit(self._run, job, enrich, spec, attribution)
+        job.future.add_done_callback(lambda _: self._finished(state))
+        return True
+
+    def _finished(self, state: _SessionJobs) -> None:
+        with self._lock:
+            state.running -= 1
+
+    def _run(self, job: _Job, enrich: Enrichment, spec: Dict[str, Any],
+             attribution: Optional[Tuple[str, str, str]]) -> Dict[str, str]:
+        if job.cancelled:
+            return {}
+        owner = attributed(*attribution) if attribution else nullcontext()
+        with owner, span(f"prefetch.{job.name}", step=job.step):
+            return enrich(spec)
+
+    def cancel(self, session: str, steps: Optional[Iterable[int]] = None) -> int:
+        """Drop the predictions of *session* (all, or only *steps*); returns how many."""
+        with self._lock:
+            state = self._sessions.get(session)
+            if state is None:
+                return 0
+            targets = list(state.jobs) if steps is None else [s for s in steps if s in state.jobs]
+            for step in targets:
+                self._cancel(state.jobs.pop(step))
+        return len(targets)
+
+    def forget(self, session: str) -> None:
+        self.cancel(session)
+        with self._lock:
+            self._sessions.pop(session, None)
+
+    # ----------------------------------------------------------------- reads
+    def _job(self, session: str, step: int) -> Optional[_Job]:
+        with self._lock:
+            state = self._sessions.get(session)
+            job = state.jobs.get(step) if state is not None else None
+        return None if job is None or job.cancelled else job
+
+    def pending(self, session: str, step: int) -> bool:
+        """True while a prediction for *step* is still being computed."""
+        job = self._job(session, step)
+        return job is not None and job.future is not None and not job.future.done()
+
+    def ready(self, session: str, step: int) -> Dict[str, str]:
+        """Finished prediction for *step* (never blocks; {} if none, still running or failed)."""
+        job = self._job(session, step)
+        if job is None or job.future is None or not job.future.done() or job.future.cancelled():
+            return {}
+        try:
+            return dict(job.future.result())
+        except Exception as e:
+            print(f"prefetch: {job.name} for step {step} failed - {e}")
+            with self._lock:
+                self.counts["failed"] += 1
+                job.cancelled = True        # report once
+            return {}
+
+    def take(self, session: str, step: int) -> Dict[str, str]:
+        """Like ``ready`` but consumes the prediction (counted as used)."""
+        result = self.ready(session, step)
+        if result:
+            with self._lock:
+                state = self._sessions.get(session)
+                if state is not None:
+                    state.jobs.pop(step, None)
+                self.counts["used"] += 1
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the jobs currently queued or running (diagnostics page)."""
+        with self._lock:
+            active = sum(state.running for state in self._sessions.values())
+            return {**self.counts, "active": active, "sessions": len(self._sessions)}
+
+
+prefetcher = PrefetchScheduler()
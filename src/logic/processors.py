@@ -1,26 +1,15 @@
 from __future__ import annotations
 from src.logic.trigger_engine import TriggerEngine
-from src.utils.tool_registry import call_with_retry   # tenacity-wrapped openai call
-from openai import OpenAI
-
-client = OpenAI()
+from src.logic.step_suggestions import suggest_fields
 
 # ───────────────────────── processors ──────────────────────────
 def update_salary_range(state: dict) -> None:
     if state.get("salary_range") and state["salary_range"] != "competitive":
         return                      # already concrete
 
-    prompt = (
-        "Estimate a fair annual salary range in EUR for the following role.\n"
-        f"City: {state.get('city')}\n"
-        f"Tasks: {state.get('task_list')}\n"
-        f"Must-have skills: {state.get('must_have_skills')}"
-    )
-    answer = call_with_retry(client.chat.completions.create,
-        model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
-        temperature=0.2, max_tokens=40
-    )
-    state["salary_range"] = answer.choices[0].message.content.strip()
+    estimate = suggest_fields(state, ["salary_range"]).get("salary_range")   # cached per spec
+    if estimate:
+        state["salary_range"] = estimate
 
 def update_publication_channels(state: dict) -> None:
     remote = state.get("remote_work_policy", "").lower()
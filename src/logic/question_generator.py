@@ -0,0 +1,104 @@
+"""
+Follow-up question generator
+============================
+
+One batched LLM call turns *all* missing fields of a wizard step into short,
+role-aware follow-up questions ("Which cloud platforms will the Data Engineer
+work with?" instead of "Tool Proficiency").
+
+* Results are cached process-wide per ``(field set, role family)`` – the
+  prompt contains nothing else, so a cached answer is valid for every
+  session with the same gaps and a similar job title.
+* ``role_family("Senior Data Engineer (m/w/d)")`` → ``"data engineer"``:
+  seniority words, gender tags and punctuation are dropped.
+* If the model is unavailable or answers with something unusable, the
+  generic field label is used for the affected fields (and nothing is cached).
+
+Typical usage
+-------------
+>>> from src.logic.question_generator import generate_questions, role_family
+>>> role_family("Sr. Backend Developer (w/m/d)")
+'backend developer'
+>>> generate_questions(["tool_proficiency", "team_structure"], job_title="Data Engineer")  # doctest: +SKIP
+{'tool_proficiency': 'Which tools …?', 'team_structure': 'How is the team …?'}
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Sequence
+
+from src.utils.llm_cache import LLMCache, parse_json_object
+from src.utils.tracing import span
+
+QUESTION_MODEL = "gpt-4o-mini"
+_cache = LLMCache("follow_up_questions", maxsize=1024)
+
+_SENIORITY_RE = re.compile(
+    r"\b(senior|junior|sr|jr|lead|principal|head of|chief|staff|associate|intern|werkstudent|"
+    r"trainee|mid|level\s*\w+|[ivx]{1,3})\b\.?",
+    re.IGNORECASE,
+)
+_TAG_RE = re.compile(r"\(.*?\)|\s[/|–-]\s.*$|,.*$")
+
+
+def role_family(job_title: str) -> str:
+    """Normalised job title used as cache key ("" if unknown)."""
+    title = _TAG_RE.sub(" ", job_title or "")
+    title = _SENIORITY_RE.sub(" ", title)
+    words = re.findall(r"[^\W\d_]+", title.lower())
+    return " ".join(words[:3])
+
+
+def field_label(key: str) -> str:
+    return key.replace("_", " ").title()
+
+
+def field_hint(key: str) -> str:
+    """What *key* means – the JobSpec field description, else its label."""
+    try:
+        from src.models.job_models import JobSpec
+        field = JobSpec.model_fields.get(key)
+    except ImportError:
+        field = None
+    return field.description if field is not None and field.description else field_label(key)
+
+
+def _ask_model(fields: Sequence[str], family: str) -> Dict[str, str]:
+    from src.utils.tool_registry import chat_completion       # needs OPENAI_API_KEY – import on demand
+
+    lines = "\n".join(f"- {key}: {field_hint(key)}" for key in fields)
+    prompt = (
+        f"A recruiter is writing a job ad for a {family or 'generic'} position and has not yet "
+        "filled in the fields below. For each field write ONE short, specific follow-up question "
+        "(max. 15 words) that helps the recruiter answer it for this kind of role.\n"
+        f"Fields:\n{lines}\n\n"
+        "Answer only with a JSON object mapping each field key to its question."
+    )
+    answer = chat_completion(
+        prompt,
+        model=QUESTION_MODEL,
+        temperature=0.3,
+        max_tokens=40 * len(fields) + 20,
+        operation="follow_up_questions",
+    )
+    data = parse_json_object(answer)
+    questions = {key: str(data[key]).strip() for key in fields if isinstance(data.get(key), str) and data[key].strip()}
+    if len(questions) < len(fields):
+        raise ValueError(f"answer covers {len(questions)} of {len(fields)} fields")
+    return questions
+
+
+def generate_questions(fields: Sequence[str], *, job_title: str = "") -> Dict[str, str]:
+    """Question per field in *fields* – one (cached) LLM call for the whole batch."""
+    fields = list(dict.fromkeys(fields))
+    if not fields:
+        return {}
+    family = role_family(job_title)
+    key = (frozenset(fields), family)
+    with span("questions.generate", fields=len(fields), family=family):
+        try:
+            return dict(_cache.get_or_compute(key, lambda: _ask_model(fields, family)))
+        except Exception as e:
+            print(f"generate_questions: falling back to field labels - {e}")
+            return {field: field_label(field) for field in fields}
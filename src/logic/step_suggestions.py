@@ -0,0 +1,134 @@
+"""
+Step suggestions
+================
+
+Proposes values for *all* empty fields of a wizard step with one LLM round
+trip, instead of one call (or one question) per field.
+
+* Input is the job-spec dict (``SessionState.get_job_spec_dict()``); the
+  filled fields become a compact context, the empty ones a JSON schema
+  limited to exactly those keys (key → field description / format hint).
+* Results are cached process-wide by a fingerprint of (fields asked,
+  context), so a rerun, a second session on the same ad or a processor asking
+  for one of the fields again costs nothing. After a batch, each field is also
+  cached on its own, so ``suggest_fields(spec, ["salary_range"])`` on the
+  same spec is a hit.
+* Fields the model cannot know (contact data, URLs, internal ids, uploads)
+  are never asked for. Fields the model leaves ``null`` are omitted.
+
+Typical usage
+-------------
+>>> from src.logic.step_suggestions import suggest_step
+>>> suggest_step(SessionState().get_job_spec_dict(), 6)          # doctest: +SKIP
+{'salary_range': '60 000 – 75 000 EUR', 'currency': 'EUR', 'vacation_days': '30', …}
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Mapping, Sequence
+
+from src.config.keys import STEP_KEYS
+from src.logic.question_generator import field_hint
+from src.utils.llm_cache import LLMCache, fingerprint, parse_json_object
+from src.utils.tracing import span
+
+SUGGEST_MODEL = "gpt-4o-mini"
+_cache = LLMCache("step_suggestions", maxsize=1024)
+
+# Facts only the recruiter knows – never guessed
+NOT_SUGGESTED = frozenset({
+    "input_url", "uploaded_file", "parsed_data_raw", "source_language", "company_website",
+    "recruitment_contact_email", "recruitment_contact_phone", "internal_job_id",
+    "comments_internal", "social_media_links", "video_introduction_option",
+})
+# Answer formats where free text would be useless downstream
+_FORMATS = {
+    "salary_range": 'annual range as "min – max EUR", e.g. "55 000 – 65 000 EUR"',
+    "currency": "ISO code, e.g. EUR",
+    "vacation_days": "number of days per year",
+    "number_of_interviews": "a number",
+}
+# Characters of one filled field that go into the context
+_CONTEXT_CHARS = 300
+
+
+def suggestable(spec: Mapping[str, Any], step: int) -> List[str]:
+    """Empty fields of *step* the model may propose values for, in ``STEP_KEYS`` order."""
+    return [k for k in STEP_KEYS[step] if k not in NOT_SUGGESTED and not spec.get(k)]
+
+
+def _context(spec: Mapping[str, Any]) -> Dict[str, str]:
+    """Filled text fields, truncated – everything the model gets to see."""
+    context = {}
+    for key in spec:                        # dict or VacancyState (processors)
+        value = spec.get(key)
+        if key in NOT_SUGGESTED or not value:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = "; ".join(map(str, value))
+        if isinstance(value, (str, int, float)):
+            context[key] = str(value)[:_CONTEXT_CHARS]
+    return context
+
+
+def _cache_key(fields: Sequence[str], context: Mapping[str, str]) -> str:
+    return fingerprint({"fields": sorted(fields), "context": context})
+
+
+def _ask_model(fields: Sequence[str], context: Mapping[str, str]) -> Dict[str, str]:
+    from src.utils.tool_registry import chat_completion       # needs OPENAI_API_KEY – import on demand
+
+    schema = {key: _FORMATS.get(key) or field_hint(key) for key in fields}
+    prompt = (
+        "Known facts about a job vacancy (JSON):\n"
+        f"{json.dumps(context, ensure_ascii=False)}\n\n"
+        "Propose realistic values for the missing fields below, consistent with the facts "
+        "and typical for this kind of role in Germany. Keep each value short. "
+        "Use null where no reasonable guess is possible.\n"
+        f"Schema (field → meaning):\n{json.dumps(schema, ensure_ascii=False)}\n\n"
+        "Answer only with a JSON object with exactly these keys."
+    )
+    answer = chat_completion(
+        prompt,
+        system="You are an experienced recruiter drafting a job specification.",
+        model=SUGGEST_MODEL,
+        temperature=0.2,
+        max_tokens=60 * len(fields) + 20,
+        operation="step_suggestions",
+    )
+    data = parse_json_object(answer)
+    suggestions = {}
+    for key in fields:
+        value = data.get(key)
+        if isinstance(value, (list, tuple)):
+            value = "; ".join(map(str, value))
+        if value not in (None, "") and str(value).strip():
+            suggestions[key] = str(value).strip()
+    return suggestions
+
+
+def suggest_fields(spec: Mapping[str, Any], fields: Sequence[str]) -> Dict[str, str]:
+    """Proposed values for *fields* (only those with a suggestion) – one cached LLM call."""
+    fields = [k for k in dict.fromkeys(fields) if k not in NOT_SUGGESTED]
+    if not fields:
+        return {}
+    context = _context(spec)
+    key = _cache_key(fields, context)
+    with span("suggestions.fields", fields=len(fields), context=len(context)):
+        try:
+            suggestions = dict(_cache.get_or_compute(key, lambda: _ask_model(fields, context)))
+        except Exception as e:
+            print(f"suggest_fields: no suggestions - {e}")
+            return {}
+    if len(fields) > 1:
+        for field in fields:                # later single-field requests on this spec are hits
+            single = _cache_key([field], context)
+            if field in suggestions and single not in _cache:
+                _cache.put(single, {field: suggestions[field]})
+    return suggestions
+
+
+def suggest_step(spec: Mapping[str, Any], step: int) -> Dict[str, str]:
+    """Proposed values for every empty, suggestable field of wizard *step*."""
+    return suggest_fields(spec, suggestable(spec, step))
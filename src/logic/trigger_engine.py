@@ -21,6 +21,8 @@ from __future__ import annotations
 from typing import Callable, Dict, Iterable, Set
 import networkx as nx
 
+from src.utils.tracing import span
+
 __all__ = ["TriggerEngine", "build_default_graph"]  # re-export
 
 
@@ -64,7 +66,8 @@ class TriggerEngine:
         for node in affected:
             processor = self._processors.get(node)
             if processor is not None:
-                processor(state)
+                with span(f"processor.{node}", trigger=updated_key):
+                    processor(state)
 
 
 # ────────────────────────────────────────────────────────────────────────────
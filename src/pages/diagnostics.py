@@ -0,0 +1,200 @@
+# pages/diagnostics.py
+"""Streamlit-Seite: Diagnose
+
+* Profil-Mitschnitte einzelner Wizard-Reruns (``src/utils/profiling.py``):
+  Liste, Top-Funktionen und Download von Flame-Graph- (folded) und
+  cProfile-Dateien. Mitschnitte entstehen nur mit ``?profile=1`` in der URL
+  oder über den Admin-Schalter – beides nur mit ``VACALYSER_ADMIN=1``.
+* Speicher je Session (``src/utils/memory.py``): Größe je Session-State-Key,
+  wachsende Keys, Sessions pro GB und tracemalloc-Diffs zwischen Reruns.
+* Prefetch (``src/logic/prefetch.py``): gestartete, genutzte, verworfene und
+  durch Limit bzw. Kostenbremse übersprungene Vorberechnungen.
+
+Die Seite zeigt den State aller Sessions und kann tracemalloc prozessweit
+einschalten – sie ist nur mit ``VACALYSER_ADMIN=1`` erreichbar."""
+
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import streamlit as st
+
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.config import ADMIN_MODE
+from src.logic.prefetch import PREFETCH_ENABLED, prefetcher
+from src.state.blob_store import blob_stats
+from src.state.session_state import session_token
+from src.utils import memory
+from src.utils.llm_usage import session_id
+from src.utils.profiling import PROFILE_DIR, capture_file, list_captures, self_time
+
+st.title("🩺 Diagnostics")
+if not ADMIN_MODE:
+    st.warning("Diagnostics are only available in admin mode (VACALYSER_ADMIN=1).")
+    st.stop()
+
+# ---------------------------------------------------------------------------
+# Profil-Mitschnitte
+# ---------------------------------------------------------------------------
+st.header("Rerun profiles")
+st.caption(f"Captures are tagged with the hashed session id; yours is `{session_id(session_token())}`.")
+captures = list_captures()
+if not captures:
+    st.info(
+        "No captures yet. With VACALYSER_ADMIN=1, open the wizard with `?profile=1` (cProfile + "
+        "sampling) or `?profile=sample` (sampling only) in the URL, or enable the admin toggle."
+    )
+else:
+    st.dataframe(
+        [
+            {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(c["ts"])),
+                "session": c["session"],
+                "step": c["step"],
+                "mode": c["mode"],
+                "wall_s": c["wall_s"],
+                "samples": c["samples"],
+                "error": c.get("error") or "",
+                "id": c["id"],
+            }
+            for c in captures
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+    selected = st.selectbox(
+        "Capture",
+        captures,
+        format_func=lambda c: f"{c['id']} · step {c['step']} · {c['wall_s']:.2f} s",
+    )
+
+    folded_path = capture_file(selected["id"], ".folded")
+    prof_path = capture_file(selected["id"], ".prof")
+    col_self, col_cum = st.columns(2)
+    with col_self:
+        st.subheader("Sampled self time")
+        if folded_path is not None:
+            interval_ms = selected["sample_interval_s"] * 1000
+            st.dataframe(
+                [{"frame": frame, "samples": n, "≈ms": round(n * interval_ms)}
+                 for frame, n in self_time(folded_path.read_text(encoding="utf-8"))],
+                hide_index=True,
+                use_container_width=True,
+            )
+    with col_cum:
+        st.subheader("cProfile (cumulative)")
+        if prof_path is not None:
+            out = io.StringIO()
+            pstats.Stats(str(prof_path), stream=out).strip_dirs().sort_stats("cumulative").print_stats(25)
+            st.code(out.getvalue(), language="text")
+        else:
+            st.caption("Sampling-only capture.")
+
+    dl1, dl2 = st.columns(2)
+    if folded_path is not None:
+        dl1.download_button(
+            "⬇️ Flame graph (.folded)", folded_path.read_bytes(), file_name=folded_path.name,
+            help="Open in speedscope.app or render with flamegraph.pl",
+        )
+    if prof_path is not None:
+        dl2.download_button("⬇️ cProfile (.prof)", prof_path.read_bytes(), file_name=prof_path.name)
+    st.caption(f"Captures are stored in `{PROFILE_DIR}`.")
+
+# ---------------------------------------------------------------------------
+# Speicher je Session
+# ---------------------------------------------------------------------------
+st.header("Session memory")
+_MB = 1024 * 1024
+
+sessions = memory.list_session_states()
+rows, per_key = [], {}
+for sid, state in sessions:
+    token = state.get("_session_token", sid)
+    sizes = memory.measure_state(state)
+    memory.size_history.record(token, sizes)
+    per_key[token] = sizes
+    rows.append({"session": session_id(token), "keys": len(sizes), "retained_kb": round(sum(sizes.values()) / 1024, 1),
+                 "growing": ", ".join(k for k, _, _ in memory.size_history.growing_keys(token))})
+memory.size_history.forget(per_key)
+
+retained = [sum(sizes.values()) for sizes in per_key.values()]
+avg = sum(retained) / len(retained) if retained else 0
+rss = memory.process_rss()
+blobs = blob_stats()
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Live sessions", len(per_key))
+m2.metric("Avg retained / session", f"{avg / 1024:.0f} KB")
+m3.metric("Sessions per GB (state only)", f"{1024 * _MB / avg:,.0f}" if avg else "–",
+          help="Session state alone; add the process baseline (RSS with no sessions) when sizing pods.")
+m4.metric("Process RSS", f"{rss / _MB:.0f} MB" if rss else "–",
+          help=f"Shared blob store: {blobs['blobs']} texts, {blobs['compressed_bytes'] / 1024:.0f} KB compressed")
+st.dataframe(rows, hide_index=True, use_container_width=True)
+
+if per_key:
+    chosen = st.selectbox("Session", list(per_key), format_func=lambda t: t[:8])
+    growing = {k: (a, b) for k, a, b in memory.size_history.growing_keys(chosen)}
+    for key, (first, last) in growing.items():
+        st.warning(f"`{key}` grew on every measurement: {first / 1024:.1f} KB → {last / 1024:.1f} KB")
+    st.dataframe(
+        [{"key": k, "kb": round(v / 1024, 1), "shared": k in memory.SHARED_KEYS, "growing": k in growing}
+         for k, v in sorted(per_key[chosen].items(), key=lambda kv: kv[1], reverse=True)],
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(
+        "Sizes are measured whenever this page renders"
+        + (" and after every wizard rerun." if memory.MEMORY_WATCH else
+           "; set VACALYSER_MEMORY_WATCH=1 to also measure after every wizard rerun.")
+    )
+
+# ---------------------------------------------------------------------------
+# tracemalloc
+# ---------------------------------------------------------------------------
+st.subheader("Allocation diff (tracemalloc)")
+tracing = tracemalloc.is_tracing()
+t1, t2 = st.columns(2)
+if t1.button("Stop tracing" if tracing else "Start tracing"):
+    if tracing:
+        memory.stop_tracing()
+    else:
+        memory.start_tracing()
+    st.rerun()
+if tracing:
+    if t2.button("Take snapshot"):
+        memory.take_snapshot()
+    diff = memory.snapshot_diff()
+    if diff:
+        first, last = memory.snapshot_times()
+        st.caption(f"Growth between snapshots at {time.strftime('%H:%M:%S', time.localtime(first))} "
+                   f"and {time.strftime('%H:%M:%S', time.localtime(last))}")
+        st.dataframe(diff, hide_index=True, use_container_width=True)
+    else:
+        st.caption("Take two snapshots (or enable VACALYSER_MEMORY_WATCH to snapshot every rerun) to see a diff.")
+else:
+    st.caption("Tracing costs memory and CPU – start it only while investigating.")
+
+# ---------------------------------------------------------------------------
+# Prefetch
+# ---------------------------------------------------------------------------
+st.header("Speculative prefetch")
+if not PREFETCH_ENABLED:
+    st.caption("Disabled (VACALYSER_PREFETCH=0).")
+else:
+    counts = prefetcher.stats()
+    p1, p2, p3, p4, p5 = st.columns(5)
+    p1.metric("Scheduled", counts.get("scheduled", 0))
+    p2.metric("Used", counts.get("used", 0),
+              help="Predictions applied by the user – the rest cost tokens without saving a wait.")
+    p3.metric("Cancelled / failed", f"{counts.get('cancelled', 0)} / {counts.get('failed', 0)}")
+    p4.metric("Skipped (cap / budget)", f"{counts.get('capped', 0)} / {counts.get('over_budget', 0)}")
+    p5.metric("Running now", counts.get("active", 0))
+    st.caption(
+        f"Limits: {prefetcher.per_session} concurrent and {prefetcher.max_jobs} total jobs per session, "
+        f"no prefetch above ${prefetcher.max_usd:.2f} session spend, {prefetcher.workers} workers."
+    )
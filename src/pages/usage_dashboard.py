@@ -0,0 +1,119 @@
+# pages/usage_dashboard.py
+"""Streamlit-Seite: LLM-Verbrauch (Tokens, Kosten, Latenz)
+
+Zeigt die Buchungen aus ``src/utils/llm_usage.py`` – je Prozess, Operation,
+Modell, Vakanz und Session – plus die letzten Aufrufe. Die gleichen Zahlen
+liegen maschinenlesbar in ``usage_summary.json`` / ``usage.jsonl``.
+
+Ohne ``VACALYSER_ADMIN=1`` sieht jede Session nur ihre eigenen Zahlen; die
+prozessweite Sicht (alle Sessions, Vakanzen und Stellentitel) ist Admins
+vorbehalten."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import streamlit as st
+
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.config import ADMIN_MODE
+from src.state.session_state import session_token
+from src.utils.llm_usage import USAGE_DIR, USAGE_LOG_ENABLED, recent_calls, session_id, usage_summary
+
+st.title("📊 LLM usage & cost")
+
+# ---------------------------------------------------------------------------
+# Scope
+# ---------------------------------------------------------------------------
+if ADMIN_MODE:
+    scope = st.radio("Scope", ("This process", "This session"), horizontal=True)
+else:
+    scope = "This session"              # other sessions' costs and job titles are admin-only
+    st.caption("Showing this session only – the process-wide view needs admin mode (VACALYSER_ADMIN=1).")
+session = session_token() if scope == "This session" else None
+summary = usage_summary(session=session)
+if not ADMIN_MODE:
+    summary = {"generated": summary["generated"], "session": summary["session"]}
+totals = summary["session"][session_id(session)] if session else summary["process"]
+
+# ---------------------------------------------------------------------------
+# Key figures
+# ---------------------------------------------------------------------------
+c1, c2, c3, c4, c5 = st.columns(5)
+c1.metric("Calls", totals["calls"], help=f"{totals['api_calls']} API calls, {totals['cache_hits']} cache hits")
+c2.metric("Cost (USD)", f"{totals['cost_usd']:.4f}")
+c3.metric("Tokens in / out", f"{totals['prompt_tokens']:,} / {totals['completion_tokens']:,}")
+c4.metric("Cache hit rate", f"{totals['cache_hit_rate']:.0%}",
+          help=f"{totals['cached_prompt_tokens']:,} prompt tokens served from OpenAI's prompt cache")
+c5.metric("Avg latency", f"{totals['avg_latency_s']:.2f} s",
+          help=f"{totals['retries']} retries, {totals['errors']} failed calls")
+
+
+# ---------------------------------------------------------------------------
+# Breakdown tables – most expensive first
+# ---------------------------------------------------------------------------
+def _table(group: dict, label: str, titles: dict | None = None) -> None:
+    rows = [
+        {label: key, **({"title": titles.get(key, "")} if titles is not None else {}), **vals}
+        for key, vals in sorted(group.items(), key=lambda kv: kv[1]["cost_usd"], reverse=True)
+    ]
+    if rows:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No calls yet.")
+
+
+if session is None:
+    tab_op, tab_model, tab_vacancy, tab_session = st.tabs(["By operation", "By model", "By vacancy", "By session"])
+    with tab_op:
+        _table(summary["operation"], "operation")
+    with tab_model:
+        _table(summary["model"], "model")
+    with tab_vacancy:
+        _table(summary["vacancy"], "vacancy", summary["vacancy_titles"])
+    with tab_session:
+        _table(summary["session"], "session")
+        st.caption(f"Session ids are salted hashes of the session tokens; yours is `{session_id(session_token())}`.")
+
+# ---------------------------------------------------------------------------
+# Recent calls
+# ---------------------------------------------------------------------------
+st.subheader("Recent calls")
+calls = recent_calls(100, session=session)
+st.dataframe(
+    [
+        {
+            "time": time.strftime("%H:%M:%S", time.localtime(r.ts)),
+            "operation": r.operation,
+            "model": r.model,
+            "in": r.prompt_tokens,
+            "out": r.completion_tokens,
+            "cached": r.cached_tokens,
+            "latency_s": round(r.latency, 2),
+            "retries": r.retries,
+            "cache_hit": r.cache_hit,
+            "cost_usd": round(r.cost_usd, 5),
+            "vacancy": r.vacancy,
+            "error": r.error or "",
+        }
+        for r in calls
+    ],
+    hide_index=True,
+    use_container_width=True,
+)
+
+# ---------------------------------------------------------------------------
+# Machine-readable export
+# ---------------------------------------------------------------------------
+st.download_button(
+    "⬇️ usage_summary.json",
+    data=json.dumps(summary, indent=1),
+    file_name="usage_summary.json",
+    mime="application/json",
+)
+if USAGE_LOG_ENABLED:
+    st.caption(f"Also written to `{USAGE_DIR}` (usage.jsonl per call, usage_summary.json every few seconds).")
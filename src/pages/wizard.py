@@ -2,21 +2,35 @@
 
 from __future__ import annotations
 
+import time
+
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 
 # --- Import from your repo's modules ---
 # Session state helpers
-from state.session_state import initialize_session_state
+from state.session_state import (
+    SessionState, get_trace_log, get_vacancy_state, initialize_session_state, persist_session,
+    session_token, vacancy_key,
+)
+from src.state.blob_store import BlobRef, load_text, put_text
 
-# Trigger Engine
-from logic.trigger_engine import TriggerEngine, build_default_graph
+# Trigger Engine (built once per process)
+from src.core.trigger_engine_runtime import get_engine
 
 # Tools
 from src.tools.file_tools import extract_text_from_file
-from src.tools.scraping_tools import scrape_company_site
+from src.tools.scraping_tools import fetch_url_text as _fetch_url_text
 from src.utils.text_cleanup import clean_text
+from src.utils.field_matcher import match_fields
+from src.utils.rule_extractor import confident_fields
+from src.utils.streamlit_compat import fragment
+from src.utils.tracing import span, traced
+
+# Follow-up questions (one batched, cached LLM call per step)
+from src.cross_components import DynamicQuestionEngine
+from src.logic.question_generator import field_label
+from src.logic.step_suggestions import suggest_fields
+from src.logic.prefetch import prefetcher  # next-step enrichments, computed in the background
 
 # Config
 from src.config.keys import STEP_KEYS  # field definitions for each wizard step
@@ -28,7 +42,7 @@ if "initialized" not in st.session_state:
     initialize_session_state()  # your custom function if needed
     # Only build the trigger engine if not already in state
     if "trigger_engine" not in st.session_state:
-        st.session_state["trigger_engine"] = TriggerEngine(build_default_graph())
+        st.session_state["trigger_engine"] = get_engine()
     st.session_state["initialized"] = True
 
 
@@ -37,156 +51,63 @@ if "initialized" not in st.session_state:
 # ------------------------------------------------------------------
 def fetch_url_text(url: str) -> str:
     """
-    Fetch text from a given URL. 
-    - For HTML pages: calls scrape_company_site(url).
-    - For PDF or docx: downloads content & calls extract_text_from_file.
-    - Fallback: returns raw text.
+    Fetch text from a given URL via scraping_tools.fetch_url_text
+    (HTML → main content, PDF/DOCX → extract_text_from_file, else raw text),
+    warn in the UI on failure and clean the result.
     """
     try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        content_type = resp.headers.get("Content-Type", "").lower()
+        text = _fetch_url_text(url)
     except Exception as e:
         st.warning(f"Failed to fetch URL: {e}")
         return ""
 
-    text = ""
-    if "text/html" in content_type:
-        # Use your scraping_tools function
-        text = scrape_company_site(url)
-    elif "pdf" in content_type or "application/pdf" in content_type:
-        text = extract_text_from_file(resp.content, "file.pdf")
-    elif "msword" in content_type or "officedocument" in content_type:
-        text = extract_text_from_file(resp.content, "file.docx")
-    else:
-        # fallback for plain text or unknown file
-        text = resp.text
-
     # Optionally clean text
     text = clean_text(text)
     return text
 
 
 # ------------------------------------------------------------------
-# 3. Utility: match extracted text to known keys in session_state
+# 3. Utility: match extracted text to known keys in the VacancyState
 # ------------------------------------------------------------------
 def match_and_store_keys(raw_text: str) -> None:
     """
-    Scan raw_text for known field labels (like "Job Title:", etc.),
-    and if found, store their values in st.session_state.
+    Scan raw_text for known field labels (like "Job Title:", "Gehalt:", etc.)
+    in a single pass (see src.utils.field_matcher), and store the values found
+    in the session's VacancyState.
     """
     if not raw_text:
         return
 
-    label_map = {
-        "job_title": "Job Title:",
-        "company_name": "Company Name:",
-        "brand_name": "Brand Name:",
-        "headquarters_location": "HQ Location:",
-        "company_website": "Company Website:",
-        "date_of_employment_start": "Date of Employment Start:",
-        "job_type": "Job Type:",
-        "contract_type": "Contract Type:",
-        "job_level": "Job Level:",
-        "city": "City (Job Location):",
-        "team_structure": "Team Structure:",
-        "role_description": "Role Description:",
-        "reports_to": "Reports To:",
-        "supervises": "Supervises:",
-        "role_type": "Role Type:",
-        "role_priority_projects": "Role Priority Projects:",
-        "travel_requirements": "Travel Requirements:",
-        "work_schedule": "Work Schedule:",
-        "role_keywords": "Role Keywords:",
-        "decision_making_authority": "Decision Making Authority:",
-        "role_performance_metrics": "Role Performance Metrics:",
-        "task_list": "Task List:",
-        "key_responsibilities": "Key Responsibilities:",
-        "technical_tasks": "Technical Tasks:",
-        "managerial_tasks": "Managerial Tasks:",
-        "administrative_tasks": "Administrative Tasks:",
-        "customer_facing_tasks": "Customer-Facing Tasks:",
-        "internal_reporting_tasks": "Internal Reporting Tasks:",
-        "performance_tasks": "Performance Tasks:",
-        "innovation_tasks": "Innovation Tasks:",
-        "task_prioritization": "Task Prioritization:",
-        "hard_skills": "Hard Skills:",
-        "soft_skills": "Soft Skills:",
-        "must_have_skills": "Must-Have Skills:",
-        "nice_to_have_skills": "Nice-to-Have Skills:",
-        "certifications_required": "Certifications Required:",
-        "language_requirements": "Language Requirements:",
-        "tool_proficiency": "Tool Proficiency:",
-        "domain_expertise": "Domain Expertise:",
-        "leadership_competencies": "Leadership Competencies:",
-        "technical_stack": "Technical Stack:",
-        "industry_experience": "Industry Experience:",
-        "analytical_skills": "Analytical Skills:",
-        "communication_skills": "Communication Skills:",
-        "project_management_skills": "Project Management Skills:",
-        "soft_requirement_details": "Additional Soft Requirements:",
-        "visa_sponsorship": "Visa Sponsorship:",
-        "salary_range": "Salary Range:",
-        "currency": "Currency:",
-        "pay_frequency": "Pay Frequency:",
-        "commission_structure": "Commission Structure:",
-        "bonus_scheme": "Bonus Scheme:",
-        "vacation_days": "Vacation Days:",
-        "flexible_hours": "Flexible Hours:",
-        "remote_work_policy": "Remote Work Policy:",
-        "relocation_assistance": "Relocation Assistance:",
-        "childcare_support": "Childcare Support:",
-        "recruitment_steps": "Recruitment Steps:",
-        "recruitment_timeline": "Recruitment Timeline:",
-        "number_of_interviews": "Number of Interviews:",
-        "interview_format": "Interview Format:",
-        "assessment_tests": "Assessment Tests:",
-        "onboarding_process_overview": "Onboarding Process Overview:",
-        "recruitment_contact_email": "Recruitment Contact Email:",
-        "recruitment_contact_phone": "Recruitment Contact Phone:",
-        "application_instructions": "Application Instructions:",
-        "language_of_ad": "Language of Ad:",
-        "translation_required": "Translation Required:",
-        "employer_branding_elements": "Employer Branding Elements:",
-        "desired_publication_channels": "Desired Publication Channels:",
-        "internal_job_id": "Internal Job ID:",
-        "ad_seniority_tone": "Ad Seniority Tone:",
-        "ad_length_preference": "Ad Length Preference:",
-        "deadline_urgency": "Deadline Urgency:",
-        "company_awards": "Company Awards:",
-        "diversity_inclusion_statement": "Diversity & Inclusion Statement:",
-        "legal_disclaimers": "Legal Disclaimers:",
-        "social_media_links": "Social Media Links:",
-        "video_introduction_option": "Video Introduction Option:",
-        "comments_internal": "Comments (Internal):",
-    }
+    vacancy = get_vacancy_state()
+    vacancy.update(match_fields(raw_text))
+
+    # Deterministic rules (e-mail, salary, start date, …) fill what is still empty
+    for key, value in confident_fields(raw_text).items():
+        if not vacancy.get(key):
+            vacancy.set(key, value)
 
-    # simple text search
-    text = raw_text
-    for key, label in label_map.items():
-        if label in text:
-            start_idx = text.find(label) + len(label)
-            end_line = text.find("\n", start_idx)
-            if end_line == -1:
-                end_line = len(text)
-            value = text[start_idx:end_line].strip().lstrip(": ").rstrip()
-            if value:
-                st.session_state[key] = value
+
+def _field(key: str) -> str:
+    """Current value of a wizard field for a widget default ("" if unset)."""
+    return get_vacancy_state().get(key, "")
 
 
 # ------------------------------------------------------------------
 # 4. Step 1: Start Discovery Page (Upload or fetch job info)
 # ------------------------------------------------------------------
+@fragment
 def start_discovery_page():
     """
     Step 1 UI: 
       - Language toggle
       - Enter job title
       - Provide a link to a job ad or upload a PDF/DOCX
-      - On analysis, store results in session_state
+      - On analysis, store results in the VacancyState
     """
     import streamlit as st
 
+    vacancy = get_vacancy_state()
+
     # Language toggle (session-level)
     lang = st.radio("🌐 Sprache / Language", ("Deutsch", "English"), horizontal=True)
 
@@ -224,25 +145,37 @@ def start_discovery_page():
     col1, col2 = st.columns(2)
 
     with col1:
-        job_title = st.text_input(button_job, value=st.session_state.get("job_title", ""), placeholder="e.g. Senior Data Scientist")
+        job_title = st.text_input(button_job, value=_field("job_title"), placeholder="e.g. Senior Data Scientist")
         if job_title:
-            st.session_state["job_title"] = job_title
+            vacancy.set("job_title", job_title)
 
-        input_url = st.text_input("🔗 Job Ad URL (optional)", value=st.session_state.get("input_url", ""))
+        input_url = st.text_input("🔗 Job Ad URL (optional)", value=_field("input_url"))
         if input_url:
-            st.session_state["input_url"] = input_url
+            vacancy.set("input_url", input_url)
 
     with col2:
         uploaded_file = st.file_uploader(button_upload, type=["pdf", "docx", "txt"])
         if uploaded_file is not None:
-            file_bytes = uploaded_file.read()
-            # Use your shared function from file_tools
-            raw_text = extract_text_from_file(file_bytes, uploaded_file.name)
-            # Optionally clean text
-            raw_text = clean_text(raw_text)
-
-            if raw_text:
-                st.session_state["uploaded_file"] = raw_text
+            # Unique per upload – a different file with the same name and size is new
+            upload_id = uploaded_file.file_id
+            # Extract once per upload, not on every rerun
+            if st.session_state.get("_upload_id") != upload_id:
+                # UploadedFile is a BytesIO – hand it over as-is (no .read() copy)
+                try:
+                    raw_text = extract_text_from_file(uploaded_file, uploaded_file.name)
+                except ValueError:
+                    raw_text = ""
+                # Optionally clean text
+                raw_text = clean_text(raw_text)
+                st.session_state["_upload_id"] = upload_id
+
+                if raw_text:
+                    # Keep the text once, in the blob store; session state holds a BlobRef
+                    vacancy.set("uploaded_file", uploaded_file.name)
+                    vacancy.set("parsed_data_raw", put_text(raw_text))
+                else:
+                    vacancy.set("uploaded_file", None)
+            if vacancy.get("uploaded_file"):
                 st.success("✅ File uploaded and text extracted.")
             else:
                 st.error("❌ Failed to extract text from the uploaded file.")
@@ -250,27 +183,35 @@ def start_discovery_page():
     analyze_clicked = st.button("🔎 Analyze Sources")
 
     if analyze_clicked:
-        raw_text = ""
-        if st.session_state.get("uploaded_file"):
-            raw_text = st.session_state["uploaded_file"]
-        elif st.session_state.get("input_url"):
-            raw_text = fetch_url_text(st.session_state["input_url"])
-
-        if not raw_text:
-            st.warning("⚠️ Please provide a valid URL or upload a file before analysis.")
-        else:
-            # store raw text & attempt to auto-extract fields
-            st.session_state["parsed_data_raw"] = raw_text
-            try:
-                match_and_store_keys(raw_text)
-                st.success("🎯 Analysis complete! Key details auto-filled.")
-
-                # Log any event into trace if you want
-                if "trace_events" not in st.session_state:
-                    st.session_state["trace_events"] = []
-                st.session_state.trace_events.append("Auto-extracted fields from provided job description.")
-            except Exception as e:
-                st.error(f"❌ Analysis failed: {e}")
+        analyze_sources(vacancy)
+
+
+@traced("wizard.analyze")
+def analyze_sources(vacancy) -> None:
+    """Fetch/load the ad text and auto-fill fields – one span tree per click."""
+    raw_text = ""
+    if vacancy.get("uploaded_file"):
+        raw_text = load_text(vacancy.get("parsed_data_raw"))
+    elif vacancy.get("input_url"):
+        raw_text = fetch_url_text(vacancy["input_url"])
+
+    if not raw_text:
+        st.warning("⚠️ Please provide a valid URL or upload a file before analysis.")
+        return
+    # store raw text (by reference) & attempt to auto-extract fields
+    prefetcher.cancel(session_token())          # predictions from the previous ad are stale
+    vacancy.set("parsed_data_raw", put_text(raw_text))
+    try:
+        started = time.perf_counter()
+        match_and_store_keys(raw_text)
+        persist_session()
+        st.success("🎯 Analysis complete! Key details auto-filled.")
+        _log(
+            "analyze", "Auto-extracted fields from provided job description.",
+            duration=time.perf_counter() - started, chars=len(raw_text),
+        )
+    except Exception as e:
+        st.error(f"❌ Analysis failed: {e}")
 
 
 # ------------------------------------------------------------------
@@ -278,17 +219,17 @@ def start_discovery_page():
 # ------------------------------------------------------------------
 def render_step2_static():
     st.title("Step 2: Basic Job & Company Info")
-    company_name = st.text_input("Company Name", value=st.session_state.get("company_name", ""), placeholder="e.g. Tech Corp Ltd.")
-    brand_name = st.text_input("Brand Name (if different)", value=st.session_state.get("brand_name", ""), placeholder="e.g. Parent Company Inc.")
-    headquarters_location = st.text_input("Headquarters Location", value=st.session_state.get("headquarters_location", ""), placeholder="e.g. Berlin, Germany")
-    company_website = st.text_input("Company Website", value=st.session_state.get("company_website", ""), placeholder="e.g. https://company.com")
-    date_of_start = st.text_input("Preferred Start Date", value=st.session_state.get("date_of_employment_start", ""), placeholder="e.g. ASAP or 2025-01-15")
+    company_name = st.text_input("Company Name", value=_field("company_name"), placeholder="e.g. Tech Corp Ltd.")
+    brand_name = st.text_input("Brand Name (if different)", value=_field("brand_name"), placeholder="e.g. Parent Company Inc.")
+    headquarters_location = st.text_input("Headquarters Location", value=_field("headquarters_location"), placeholder="e.g. Berlin, Germany")
+    company_website = st.text_input("Company Website", value=_field("company_website"), placeholder="e.g. https://company.com")
+    date_of_start = st.text_input("Preferred Start Date", value=_field("date_of_employment_start"), placeholder="e.g. ASAP or 2025-01-15")
     job_type = st.selectbox("Job Type", ["Full-Time", "Part-Time", "Internship", "Freelance", "Volunteer", "Other"], 
                              index=0)
     contract_type = st.selectbox("Contract Type", ["Permanent", "Fixed-Term", "Contract", "Other"], index=0)
     job_level = st.selectbox("Job Level", ["Entry-level", "Mid-level", "Senior", "Director", "C-level", "Other"], index=0)
-    city = st.text_input("City (Job Location)", value=st.session_state.get("city", ""), placeholder="e.g. London")
-    team_structure = st.text_area("Team Structure", value=st.session_state.get("team_structure", ""), placeholder="Describe the team setup, reporting hierarchy, etc.")
+    city = st.text_input("City (Job Location)", value=_field("city"), placeholder="e.g. London")
+    team_structure = st.text_area("Team Structure", value=_field("team_structure"), placeholder="Describe the team setup, reporting hierarchy, etc.")
     return {
         "company_name": company_name,
         "brand_name": brand_name,
@@ -304,16 +245,16 @@ def render_step2_static():
 
 def render_step3_static():
     st.title("Step 3: Role Definition")
-    role_description = st.text_area("Role Description", value=st.session_state.get("role_description", ""), placeholder="High-level summary of the role...")
-    reports_to = st.text_input("Reports To", value=st.session_state.get("reports_to", ""), placeholder="Position this role reports to")
-    supervises = st.text_area("Supervises", value=st.session_state.get("supervises", ""), placeholder="List positions or teams this role supervises")
+    role_description = st.text_area("Role Description", value=_field("role_description"), placeholder="High-level summary of the role...")
+    reports_to = st.text_input("Reports To", value=_field("reports_to"), placeholder="Position this role reports to")
+    supervises = st.text_area("Supervises", value=_field("supervises"), placeholder="List positions or teams this role supervises")
     role_type = st.selectbox("Role Type", ["Individual Contributor", "Team Lead", "Manager", "Director", "Executive", "Other"], index=0)
-    role_priority_projects = st.text_area("Priority Projects", value=st.session_state.get("role_priority_projects", ""), placeholder="Key projects or initiatives for this role")
-    travel_requirements = st.text_input("Travel Requirements", value=st.session_state.get("travel_requirements", ""), placeholder="e.g. Up to 20% travel required")
-    work_schedule = st.text_input("Work Schedule", value=st.session_state.get("work_schedule", ""), placeholder="e.g. Mon-Fri 9-5, rotating shifts")
-    role_keywords = st.text_area("Role Keywords", value=st.session_state.get("role_keywords", ""), placeholder="Keywords for this role (for SEO or analytics)")
-    decision_authority = st.text_input("Decision Making Authority", value=st.session_state.get("decision_making_authority", ""), placeholder="Scope of decisions (e.g. budget up to $10k)")
-    performance_metrics = st.text_area("Role Performance Metrics", value=st.session_state.get("role_performance_metrics", ""), placeholder="KPIs or success metrics for this role")
+    role_priority_projects = st.text_area("Priority Projects", value=_field("role_priority_projects"), placeholder="Key projects or initiatives for this role")
+    travel_requirements = st.text_input("Travel Requirements", value=_field("travel_requirements"), placeholder="e.g. Up to 20% travel required")
+    work_schedule = st.text_input("Work Schedule", value=_field("work_schedule"), placeholder="e.g. Mon-Fri 9-5, rotating shifts")
+    role_keywords = st.text_area("Role Keywords", value=_field("role_keywords"), placeholder="Keywords for this role (for SEO or analytics)")
+    decision_authority = st.text_input("Decision Making Authority", value=_field("decision_making_authority"), placeholder="Scope of decisions (e.g. budget up to $10k)")
+    performance_metrics = st.text_area("Role Performance Metrics", value=_field("role_performance_metrics"), placeholder="KPIs or success metrics for this role")
     return {
         "role_description": role_description,
         "reports_to": reports_to,
@@ -329,16 +270,16 @@ def render_step3_static():
 
 def render_step4_static():
     st.title("Step 4: Tasks & Responsibilities")
-    task_list = st.text_area("General Task List", value=st.session_state.get("task_list", ""), placeholder="Bullet points of day-to-day tasks")
-    key_responsibilities = st.text_area("Key Responsibilities", value=st.session_state.get("key_responsibilities", ""), placeholder="Major areas of responsibility")
-    technical_tasks = st.text_area("Technical Tasks", value=st.session_state.get("technical_tasks", ""), placeholder="Specialized/technical duties")
-    managerial_tasks = st.text_area("Managerial Tasks", value=st.session_state.get("managerial_tasks", ""), placeholder="Managerial or leadership duties")
-    administrative_tasks = st.text_area("Administrative Tasks", value=st.session_state.get("administrative_tasks", ""), placeholder="Administrative or support tasks")
-    customer_facing_tasks = st.text_area("Customer-Facing Tasks", value=st.session_state.get("customer_facing_tasks", ""), placeholder="Client-facing duties")
-    internal_reporting_tasks = st.text_area("Internal Reporting Tasks", value=st.session_state.get("internal_reporting_tasks", ""), placeholder="Reporting and documentation tasks")
-    performance_tasks = st.text_area("Performance-Related Tasks", value=st.session_state.get("performance_tasks", ""), placeholder="Tasks tied to performance metrics")
-    innovation_tasks = st.text_area("Innovation Tasks", value=st.session_state.get("innovation_tasks", ""), placeholder="R&D or innovation-related tasks")
-    task_prioritization = st.text_area("Task Prioritization", value=st.session_state.get("task_prioritization", ""), placeholder="How tasks are prioritized")
+    task_list = st.text_area("General Task List", value=_field("task_list"), placeholder="Bullet points of day-to-day tasks")
+    key_responsibilities = st.text_area("Key Responsibilities", value=_field("key_responsibilities"), placeholder="Major areas of responsibility")
+    technical_tasks = st.text_area("Technical Tasks", value=_field("technical_tasks"), placeholder="Specialized/technical duties")
+    managerial_tasks = st.text_area("Managerial Tasks", value=_field("managerial_tasks"), placeholder="Managerial or leadership duties")
+    administrative_tasks = st.text_area("Administrative Tasks", value=_field("administrative_tasks"), placeholder="Administrative or support tasks")
+    customer_facing_tasks = st.text_area("Customer-Facing Tasks", value=_field("customer_facing_tasks"), placeholder="Client-facing duties")
+    internal_reporting_tasks = st.text_area("Internal Reporting Tasks", value=_field("internal_reporting_tasks"), placeholder="Reporting and documentation tasks")
+    performance_tasks = st.text_area("Performance-Related Tasks", value=_field("performance_tasks"), placeholder="Tasks tied to performance metrics")
+    innovation_tasks = st.text_area("Innovation Tasks", value=_field("innovation_tasks"), placeholder="R&D or innovation-related tasks")
+    task_prioritization = st.text_area("Task Prioritization", value=_field("task_prioritization"), placeholder="How tasks are prioritized")
     return {
         "task_list": task_list,
         "key_responsibilities": key_responsibilities,
@@ -354,21 +295,21 @@ def render_step4_static():
 
 def render_step5_static():
     st.title("Step 5: Skills & Competencies")
-    hard_skills = st.text_area("Hard Skills", value=st.session_state.get("hard_skills", ""), placeholder="Technical or job-specific skills")
-    soft_skills = st.text_area("Soft Skills", value=st.session_state.get("soft_skills", ""), placeholder="Communication, teamwork, leadership, etc.")
-    must_have_skills = st.text_area("Must-Have Skills", value=st.session_state.get("must_have_skills", ""), placeholder="Non-negotiable requirements")
-    nice_to_have_skills = st.text_area("Nice-to-Have Skills", value=st.session_state.get("nice_to_have_skills", ""), placeholder="Preferred additional skills")
-    certifications_required = st.text_area("Certifications Required", value=st.session_state.get("certifications_required", ""), placeholder="Degrees or certifications (if any)")
-    language_requirements = st.text_area("Language Requirements", value=st.session_state.get("language_requirements", ""), placeholder="e.g. English C1, French B2")
-    tool_proficiency = st.text_area("Tool Proficiency", value=st.session_state.get("tool_proficiency", ""), placeholder="Software or tools expertise (e.g. Excel, AWS)")
-    domain_expertise = st.text_area("Domain Expertise", value=st.session_state.get("domain_expertise", ""), placeholder="Industry/field expertise (e.g. finance, AI)")
-    leadership_competencies = st.text_area("Leadership Competencies", value=st.session_state.get("leadership_competencies", ""), placeholder="For managerial roles: mentoring, strategic thinking, etc.")
-    technical_stack = st.text_area("Technical Stack", value=st.session_state.get("technical_stack", ""), placeholder="Technologies used (for technical roles)")
-    industry_experience = st.text_input("Industry Experience", value=st.session_state.get("industry_experience", ""), placeholder="Years of experience in relevant industry")
-    analytical_skills = st.text_input("Analytical Skills", value=st.session_state.get("analytical_skills", ""), placeholder="Analytical or critical-thinking skills")
-    communication_skills = st.text_input("Communication Skills", value=st.session_state.get("communication_skills", ""), placeholder="Written and verbal communication skills")
-    project_management_skills = st.text_input("Project Management Skills", value=st.session_state.get("project_management_skills", ""), placeholder="Ability to plan, execute, and manage projects")
-    soft_requirement_details = st.text_area("Additional Soft Requirements", value=st.session_state.get("soft_requirement_details", ""), placeholder="Other personality or work style requirements")
+    hard_skills = st.text_area("Hard Skills", value=_field("hard_skills"), placeholder="Technical or job-specific skills")
+    soft_skills = st.text_area("Soft Skills", value=_field("soft_skills"), placeholder="Communication, teamwork, leadership, etc.")
+    must_have_skills = st.text_area("Must-Have Skills", value=_field("must_have_skills"), placeholder="Non-negotiable requirements")
+    nice_to_have_skills = st.text_area("Nice-to-Have Skills", value=_field("nice_to_have_skills"), placeholder="Preferred additional skills")
+    certifications_required = st.text_area("Certifications Required", value=_field("certifications_required"), placeholder="Degrees or certifications (if any)")
+    language_requirements = st.text_area("Language Requirements", value=_field("language_requirements"), placeholder="e.g. English C1, French B2")
+    tool_proficiency = st.text_area("Tool Proficiency", value=_field("tool_proficiency"), placeholder="Software or tools expertise (e.g. Excel, AWS)")
+    domain_expertise = st.text_area("Domain Expertise", value=_field("domain_expertise"), placeholder="Industry/field expertise (e.g. finance, AI)")
+    leadership_competencies = st.text_area("Leadership Competencies", value=_field("leadership_competencies"), placeholder="For managerial roles: mentoring, strategic thinking, etc.")
+    technical_stack = st.text_area("Technical Stack", value=_field("technical_stack"), placeholder="Technologies used (for technical roles)")
+    industry_experience = st.text_input("Industry Experience", value=_field("industry_experience"), placeholder="Years of experience in relevant industry")
+    analytical_skills = st.text_input("Analytical Skills", value=_field("analytical_skills"), placeholder="Analytical or critical-thinking skills")
+    communication_skills = st.text_input("Communication Skills", value=_field("communication_skills"), placeholder="Written and verbal communication skills")
+    project_management_skills = st.text_input("Project Management Skills", value=_field("project_management_skills"), placeholder="Ability to plan, execute, and manage projects")
+    soft_requirement_details = st.text_area("Additional Soft Requirements", value=_field("soft_requirement_details"), placeholder="Other personality or work style requirements")
     visa_sponsorship = st.selectbox("Visa Sponsorship", ["No", "Yes", "Case-by-Case"], index=0)
     return {
         "hard_skills": hard_skills,
@@ -391,12 +332,12 @@ def render_step5_static():
 
 def render_step6_static():
     st.title("Step 6: Compensation & Benefits")
-    salary_range = st.text_input("Salary Range", value=st.session_state.get("salary_range", ""), placeholder="e.g. 50,000 - 60,000 EUR")
+    salary_range = st.text_input("Salary Range", value=_field("salary_range"), placeholder="e.g. 50,000 - 60,000 EUR")
     currency = st.selectbox("Currency", ["EUR", "USD", "GBP", "Other"], index=0)
     pay_frequency = st.selectbox("Pay Frequency", ["Annual", "Monthly", "Bi-weekly", "Weekly", "Other"], index=0)
-    commission_structure = st.text_input("Commission Structure", value=st.session_state.get("commission_structure", ""), placeholder="Details of any commission")
-    bonus_scheme = st.text_input("Bonus Scheme", value=st.session_state.get("bonus_scheme", ""), placeholder="Details of bonus or incentive scheme")
-    vacation_days = st.text_input("Vacation Days", value=st.session_state.get("vacation_days", ""), placeholder="e.g. 25 days")
+    commission_structure = st.text_input("Commission Structure", value=_field("commission_structure"), placeholder="Details of any commission")
+    bonus_scheme = st.text_input("Bonus Scheme", value=_field("bonus_scheme"), placeholder="Details of bonus or incentive scheme")
+    vacation_days = st.text_input("Vacation Days", value=_field("vacation_days"), placeholder="e.g. 25 days")
     flexible_hours = st.selectbox("Flexible Hours", ["No", "Yes", "Partial/Flex"], index=0)
     remote_policy = st.selectbox("Remote Work Policy", ["On-site", "Hybrid", "Full Remote", "Other"], index=0)
     relocation_assistance = st.selectbox("Relocation Assistance", ["No", "Yes", "Case-by-Case"], index=0)
@@ -416,15 +357,15 @@ def render_step6_static():
 
 def render_step7_static():
     st.title("Step 7: Recruitment Process")
-    recruitment_steps = st.text_area("Recruitment Steps", value=st.session_state.get("recruitment_steps", ""), placeholder="Outline the hiring process steps (e.g. screening, 2 interviews, etc.)")
-    recruitment_timeline = st.text_input("Recruitment Timeline", value=st.session_state.get("recruitment_timeline", ""), placeholder="Estimated time from application to offer")
-    number_of_interviews = st.text_input("Number of Interviews", value=st.session_state.get("number_of_interviews", ""), placeholder="e.g. 3")
-    interview_format = st.text_input("Interview Format", value=st.session_state.get("interview_format", ""), placeholder="e.g. Phone, On-site, Video")
-    assessment_tests = st.text_area("Assessment Tests", value=st.session_state.get("assessment_tests", ""), placeholder="Any tests or assignments for candidates?")
-    onboarding_process = st.text_area("Onboarding Process Overview", value=st.session_state.get("onboarding_process_overview", ""), placeholder="Brief overview of post-hire onboarding")
-    contact_email = st.text_input("Recruitment Contact Email", value=st.session_state.get("recruitment_contact_email", ""), placeholder="Email for applications or inquiries")
-    contact_phone = st.text_input("Recruitment Contact Phone", value=st.session_state.get("recruitment_contact_phone", ""), placeholder="Contact phone number (if applicable)")
-    application_instructions = st.text_area("Application Instructions", value=st.session_state.get("application_instructions", ""), placeholder="How to apply (e.g. via portal or email)")
+    recruitment_steps = st.text_area("Recruitment Steps", value=_field("recruitment_steps"), placeholder="Outline the hiring process steps (e.g. screening, 2 interviews, etc.)")
+    recruitment_timeline = st.text_input("Recruitment Timeline", value=_field("recruitment_timeline"), placeholder="Estimated time from application to offer")
+    number_of_interviews = st.text_input("Number of Interviews", value=_field("number_of_interviews"), placeholder="e.g. 3")
+    interview_format = st.text_input("Interview Format", value=_field("interview_format"), placeholder="e.g. Phone, On-site, Video")
+    assessment_tests = st.text_area("Assessment Tests", value=_field("assessment_tests"), placeholder="Any tests or assignments for candidates?")
+    onboarding_process = st.text_area("Onboarding Process Overview", value=_field("onboarding_process_overview"), placeholder="Brief overview of post-hire onboarding")
+    contact_email = st.text_input("Recruitment Contact Email", value=_field("recruitment_contact_email"), placeholder="Email for applications or inquiries")
+    contact_phone = st.text_input("Recruitment Contact Phone", value=_field("recruitment_contact_phone"), placeholder="Contact phone number (if applicable)")
+    application_instructions = st.text_area("Application Instructions", value=_field("application_instructions"), placeholder="How to apply (e.g. via portal or email)")
     return {
         "recruitment_steps": recruitment_steps,
         "recruitment_timeline": recruitment_timeline,
@@ -441,55 +382,64 @@ def render_step7_static():
 # ------------------------------------------------------------------
 # 6. Step 8: Additional info & final summary
 # ------------------------------------------------------------------
+@fragment
 def render_step8():
     st.title("Step 8: Additional Information & Final Review")
     st.subheader("Additional Metadata")
 
-    parsed_data = st.text_area(
-        "Parsed Data (Raw)",
-        value=st.session_state.get("parsed_data_raw", ""),
-        placeholder="(Auto-generated raw text from analysis)",
-        help="This is the raw text extracted from the provided source, if any."
-    )
+    vacancy = get_vacancy_state()
+    raw_ref = vacancy.get("parsed_data_raw")
+    raw_size = raw_ref.size if isinstance(raw_ref, BlobRef) else len(raw_ref or "")
+    # The raw text is only loaded (and sent to the browser) when asked for
+    if st.toggle(f"Show parsed data (raw, {raw_size:,} characters)", key="show_parsed_raw"):
+        parsed_data = st.text_area(
+            "Parsed Data (Raw)",
+            value=load_text(raw_ref),
+            placeholder="(Auto-generated raw text from analysis)",
+            help="This is the raw text extracted from the provided source, if any."
+        )
+        if parsed_data != load_text(raw_ref):
+            vacancy.set("parsed_data_raw", put_text(parsed_data))
 
-    language_of_ad = st.text_input("Language of Ad", value=st.session_state.get("language_of_ad", ""), placeholder="e.g. English, German")
+    language_of_ad = st.text_input("Language of Ad", value=_field("language_of_ad"), placeholder="e.g. English, German")
     translation_required = st.selectbox("Translation Required?", ["No", "Yes"], index=0)
-    branding_elements = st.text_area("Employer Branding Elements", value=st.session_state.get("employer_branding_elements", ""), placeholder="Company culture or branding highlights to include")
-    publication_channels = st.text_area("Desired Publication Channels", value=st.session_state.get("desired_publication_channels", ""), placeholder="Where this ad will be posted (if specific)")
-    internal_job_id = st.text_input("Internal Job ID", value=st.session_state.get("internal_job_id", ""), placeholder="Internal reference ID for this position")
+    branding_elements = st.text_area("Employer Branding Elements", value=_field("employer_branding_elements"), placeholder="Company culture or branding highlights to include")
+    publication_channels = st.text_area("Desired Publication Channels", value=_field("desired_publication_channels"), placeholder="Where this ad will be posted (if specific)")
+    internal_job_id = st.text_input("Internal Job ID", value=_field("internal_job_id"), placeholder="Internal reference ID for this position")
     ad_seniority_tone = st.selectbox("Ad Seniority Tone", ["Casual", "Formal", "Neutral", "Enthusiastic"], index=0)
     ad_length_pref = st.selectbox("Ad Length Preference", ["Short & Concise", "Detailed", "Flexible"], index=0)
-    deadline_urgency = st.text_input("Application Deadline/Urgency", value=st.session_state.get("deadline_urgency", ""), placeholder="e.g. Apply by 30 June; Urgent fill")
-    company_awards = st.text_area("Company Awards", value=st.session_state.get("company_awards", ""), placeholder="Notable awards or recognitions of the company")
-    diversity_statement = st.text_area("Diversity & Inclusion Statement", value=st.session_state.get("diversity_inclusion_statement", ""), placeholder="Company's D&I commitment statement")
-    legal_disclaimers = st.text_area("Legal Disclaimers", value=st.session_state.get("legal_disclaimers", ""), placeholder="Any legal or compliance text for the ad")
-    social_links = st.text_area("Social Media Links", value=st.session_state.get("social_media_links", ""), placeholder="Links to company social media profiles (if included in ad)")
+    deadline_urgency = st.text_input("Application Deadline/Urgency", value=_field("deadline_urgency"), placeholder="e.g. Apply by 30 June; Urgent fill")
+    company_awards = st.text_area("Company Awards", value=_field("company_awards"), placeholder="Notable awards or recognitions of the company")
+    diversity_statement = st.text_area("Diversity & Inclusion Statement", value=_field("diversity_inclusion_statement"), placeholder="Company's D&I commitment statement")
+    legal_disclaimers = st.text_area("Legal Disclaimers", value=_field("legal_disclaimers"), placeholder="Any legal or compliance text for the ad")
+    social_links = st.text_area("Social Media Links", value=_field("social_media_links"), placeholder="Links to company social media profiles (if included in ad)")
     video_option = st.selectbox("Video Introduction Option", ["No", "Yes"], index=0)
-    comments_internal = st.text_area("Comments (Internal)", value=st.session_state.get("comments_internal", ""), placeholder="Any internal comments or notes")
-
-    # Save all step8 fields into session_state
-    st.session_state["parsed_data_raw"] = parsed_data
-    st.session_state["language_of_ad"] = language_of_ad
-    st.session_state["translation_required"] = translation_required
-    st.session_state["employer_branding_elements"] = branding_elements
-    st.session_state["desired_publication_channels"] = publication_channels
-    st.session_state["internal_job_id"] = internal_job_id
-    st.session_state["ad_seniority_tone"] = ad_seniority_tone
-    st.session_state["ad_length_preference"] = ad_length_pref
-    st.session_state["deadline_urgency"] = deadline_urgency
-    st.session_state["company_awards"] = company_awards
-    st.session_state["diversity_inclusion_statement"] = diversity_statement
-    st.session_state["legal_disclaimers"] = legal_disclaimers
-    st.session_state["social_media_links"] = social_links
-    st.session_state["video_introduction_option"] = video_option
-    st.session_state["comments_internal"] = comments_internal
+    comments_internal = st.text_area("Comments (Internal)", value=_field("comments_internal"), placeholder="Any internal comments or notes")
+
+    # Save all step8 fields into the VacancyState
+    vacancy.update({
+        "language_of_ad": language_of_ad,
+        "translation_required": translation_required,
+        "employer_branding_elements": branding_elements,
+        "desired_publication_channels": publication_channels,
+        "internal_job_id": internal_job_id,
+        "ad_seniority_tone": ad_seniority_tone,
+        "ad_length_preference": ad_length_pref,
+        "deadline_urgency": deadline_urgency,
+        "company_awards": company_awards,
+        "diversity_inclusion_statement": diversity_statement,
+        "legal_disclaimers": legal_disclaimers,
+        "social_media_links": social_links,
+        "video_introduction_option": video_option,
+        "comments_internal": comments_internal,
+    })
 
     # Display final summary of all fields
     st.subheader("Final Summary")
     for step_index, keys in STEP_KEYS.items():
         for key in keys:
             label = key.replace("_", " ").title()
-            value = st.session_state.get(key, "")
+            value = vacancy.get(key, "")
             st.markdown(f"**{label}:** {value}")
         # optional: visual separation
         if step_index in (2,3,4,5,6,7):
@@ -499,256 +449,209 @@ def render_step8():
 
 
 # ------------------------------------------------------------------
-# 7. Main function to orchestrate the multi-step wizard
+# 7. Generic step rendering (steps 2..7)
+# ------------------------------------------------------------------
+# Each step body and its dynamic-question panel is a Streamlit fragment:
+# typing into a widget reruns only that fragment, not app.py + the whole
+# wizard. Only a step change needs a full rerun – and exactly one.
+STEP_FORMS = {
+    2: render_step2_static,
+    3: render_step3_static,
+    4: render_step4_static,
+    5: render_step5_static,
+    6: render_step6_static,
+    7: render_step7_static,
+}
+LAST_STEP = 8
+
+# Step 2 asks short questions unless the field is free text
+_LONG_ANSWER_HINTS = ("description", "tasks", "details", "comments")
+
+
+def _log(kind: str, message: str, **attrs) -> None:
+    get_trace_log().record(kind, message, **attrs)
+
+
+def _missing_keys(step: int) -> list[str]:
+    return get_vacancy_state().missing(step)
+
+
+def _notify_step(step: int) -> None:
+    """Fire processors for the fields of *step* that actually changed."""
+    vacancy = get_vacancy_state()
+    changed = vacancy.dirty_keys(step)
+    engine = st.session_state.trigger_engine
+    with span("wizard.notify_step", step=step, changed=len(changed)):
+        for k in changed:
+            engine.notify_change(k, vacancy)
+    vacancy.clear_dirty(changed)
+
+
+def _prefetch_next(step: int) -> None:
+    """Start the likely enrichments of step+1 in the background (no-op if already predicted)."""
+    vacancy = get_vacancy_state()
+    token = session_token()
+    if prefetcher.schedule(token, step + 1, SessionState().get_job_spec_dict(),
+                           attribution=(token, vacancy_key(vacancy), vacancy.get("job_title", ""))):
+        _log("prefetch", f"Prefetching suggestions for step {step + 1}.", step=step + 1)
+
+
+def _prefetched(step: int) -> dict[str, str]:
+    """Finished background suggestions for the still-empty fields of *step*."""
+    vacancy = get_vacancy_state()
+    return {k: v for k, v in prefetcher.ready(session_token(), step).items() if not vacancy.get(k)}
+
+
+def _apply_prefetched(step: int) -> None:
+    vacancy = get_vacancy_state()
+    suggestions = {k: v for k, v in prefetcher.take(session_token(), step).items() if not vacancy.get(k)}
+    vacancy.update(suggestions)
+    _log("prefetch", f"Step {step}: applied {len(suggestions)} prefetched suggestions.",
+         step=step, applied=len(suggestions))
+
+
+def _go_to_step(step: int) -> None:
+    """Switch the wizard step, autosave and rerun the full app once."""
+    st.session_state["wizard_step"] = step
+    persist_session()
+    st.rerun()
+
+
+def _questions(step: int) -> dict[str, str]:
+    """Open follow-up questions of *step*, generated in one batched call if needed."""
+    engine = DynamicQuestionEngine()
+    questions = engine.pending(STEP_KEYS[step])
+    if not questions:
+        missing = _missing_keys(step)
+        if missing:
+            with st.spinner("Preparing follow-up questions…"):
+                questions = engine.enqueue_missing(missing, job_title=_field("job_title"))
+    return questions
+
+
+def _apply_suggestions(step: int, keys: list[str]) -> None:
+    """Fill the still-empty follow-up fields of *step* – one batched suggestion call."""
+    vacancy = get_vacancy_state()
+    empty = [k for k in keys if not vacancy.get(k) and not st.session_state.get(f"dq_{k}")]
+    suggestions = suggest_fields(SessionState().get_job_spec_dict(), empty)
+    for key, value in suggestions.items():
+        vacancy.set(key, value)
+        st.session_state.pop(f"dq_{key}", None)   # widget re-initialises from the suggestion
+    _log("wizard", f"Step {step}: suggested {len(suggestions)} of {len(empty)} empty fields.",
+         step=step, suggested=len(suggestions))
+
+
+def _dynamic_widget(step: int, key: str):
+    if step == 6:
+        return st.text_input
+    if step == 2 and not any(hint in key for hint in _LONG_ANSWER_HINTS):
+        return st.text_input
+    return st.text_area
+
+
+@fragment
+def render_step_form(step: int) -> None:
+    """Static form of *step*; on submit either open the dynamic Qs or advance."""
+    suggestions = _prefetched(step)
+    if suggestions:
+        st.button(
+            f"✨ Apply {len(suggestions)} suggestions", key=f"prefetched_step{step}",
+            on_click=_apply_prefetched, args=(step,),
+            help="Fills the empty fields: " + ", ".join(field_label(k) for k in suggestions),
+        )
+    elif prefetcher.pending(session_token(), step):
+        st.caption("⏳ Suggestions for this step are being prepared…")
+    with st.form(f"step{step}_form"):
+        values = STEP_FORMS[step]()
+        submitted = st.form_submit_button("Next")
+    if not submitted:
+        return
+
+    # Update state + trigger engine
+    get_vacancy_state().update(values)
+    _notify_step(step)
+    _prefetch_next(step)                # runs while the user answers follow-ups / opens the next step
+
+    missing = _missing_keys(step)
+    if missing:
+        _questions(step)                # one batched LLM call for all gaps of the step
+        st.session_state[f"step{step}_static_submitted"] = True
+        _log("wizard", f"Step {step} submitted. Missing: {missing}", step=step, missing=len(missing))
+        persist_session()
+        st.rerun()                      # one rerun: show the dynamic-question panel
+    else:
+        st.session_state[f"step{step}_static_submitted"] = False
+        _log("wizard", f"Step {step} submitted. All fields provided.", step=step)
+        _go_to_step(step + 1)
+
+
+@fragment
+def render_dynamic_questions(step: int) -> None:
+    """Follow-up questions for fields still empty after the static form."""
+    vacancy = get_vacancy_state()
+    # Questions stay listed until Continue, even once typed in (no disappearing widgets)
+    questions = _questions(step)
+    st.info("Please provide additional details for the following fields:")
+    st.button(
+        "✨ Suggest answers", key=f"suggest_step{step}", on_click=_apply_suggestions, args=(step, list(questions)),
+        help="Proposes values for all empty fields at once – review them before continuing.",
+    )
+    for key, question in questions.items():
+        answer = _dynamic_widget(step, key)(question, value=_field(key), key=f"dq_{key}", help=field_label(key))
+        vacancy.set(key, answer)
+
+    if st.button("Continue", key=f"continue_step{step}"):
+        engine = DynamicQuestionEngine()
+        for key in questions:
+            engine.answer(key, vacancy.get(key))
+        _notify_step(step)
+        st.session_state[f"step{step}_static_submitted"] = False
+        _log("wizard", f"Step {step} dynamic questions answered, on to step {step + 1}.", step=step)
+        _go_to_step(step + 1)
+
+
+def _step_back(step: int) -> None:
+    # If going back from a step with dynamic Q open, reset its flag
+    st.session_state[f"step{step}_static_submitted"] = False
+    st.session_state["wizard_step"] = step - 1
+    prefetcher.cancel(session_token())  # edits on the way back change every prediction
+    persist_session()
+
+
+def _step_forward(step: int) -> None:
+    st.session_state["wizard_step"] = step + 1
+    persist_session()
+
+
+# ------------------------------------------------------------------
+# 8. Main function to orchestrate the multi-step wizard
 # ------------------------------------------------------------------
 def run_wizard():
     """
-    Orchestrates the 8-step flow. 
+    Orchestrates the 8-step flow.
     Each step has a static form; if fields are missing after form submission,
     we display dynamic Qs. We also track changes via trigger_engine.
+
+    Navigation buttons use on_click callbacks, so the click's own rerun
+    already renders the new step – no extra st.rerun() round trip.
     """
     step = st.session_state.get("wizard_step", 1)
+    if not 1 <= step <= LAST_STEP:
+        # fallback
+        step = st.session_state["wizard_step"] = 1
 
     if step == 1:
         start_discovery_page()
-
-    elif step == 2:
-        # Step 2 form
-        with st.form("step2_form"):
-            values = render_step2_static()
-            submitted = st.form_submit_button("Next")
-        if submitted:
-            # Update state + trigger engine
-            for k, v in values.items():
-                st.session_state[k] = v
-            for k in STEP_KEYS[2]:
-                st.session_state.trigger_engine.notify_change(k, st.session_state)
-
-            missing = [k for k in STEP_KEYS[2] if not st.session_state[k]]
-            if missing:
-                st.session_state["step2_static_submitted"] = True
-                if "trace_events" not in st.session_state:
-                    st.session_state["trace_events"] = []
-                st.session_state.trace_events.append(f"Step 2 submitted. Missing: {missing}")
-                st.rerun()
-            else:
-                st.session_state["step2_static_submitted"] = False
-                st.session_state["wizard_step"] = 3
-                st.session_state.trace_events.append("Step 2 submitted. All fields provided.")
-                st.rerun()
-
-        # If static form was submitted but some fields are still missing => dynamic Q
-        if st.session_state.get("step2_static_submitted"):
-            missing_keys = [k for k in STEP_KEYS[2] if not st.session_state[k]]
-            st.info("Please provide additional details for the following fields:")
-            for key in missing_keys[:5]:
-                label = key.replace("_", " ").title()
-                if "description" in key or "tasks" in key or "details" in key or "comments" in key:
-                    st.text_area(label, key=key)
-                else:
-                    st.text_input(label, key=key)
-
-            if st.button("Continue", key="continue_step2"):
-                for k in STEP_KEYS[2]:
-                    st.session_state.trigger_engine.notify_change(k, st.session_state)
-                st.session_state["step2_static_submitted"] = False
-                st.session_state["wizard_step"] = 3
-                st.session_state.trace_events.append("Step 2 dynamic questions answered. On to step 3.")
-                st.rerun()
-
-    elif step == 3:
-        # Step 3 form
-        with st.form("step3_form"):
-            values = render_step3_static()
-            submitted = st.form_submit_button("Next")
-        if submitted:
-            for k, v in values.items():
-                st.session_state[k] = v
-            for k in STEP_KEYS[3]:
-                st.session_state.trigger_engine.notify_change(k, st.session_state)
-            missing = [k for k in STEP_KEYS[3] if not st.session_state[k]]
-            if missing:
-                st.session_state["step3_static_submitted"] = True
-                st.session_state.trace_events.append(f"Step 3 submitted. Missing: {missing}")
-                st.experimental_rerun()
-            else:
-                st.session_state["step3_static_submitted"] = False
-                st.session_state["wizard_step"] = 4
-                st.session_state.trace_events.append("Step 3 submitted. All fields provided.")
-                st.rerun()
-
-        if st.session_state.get("step3_static_submitted"):
-            missing_keys = [k for k in STEP_KEYS[3] if not st.session_state[k]]
-            st.info("Please provide additional details for the following fields:")
-            for key in missing_keys[:5]:
-                label = key.replace("_", " ").title()
-                st.text_area(label, key=key)  # or text_input if short
-            if st.button("Continue", key="continue_step3"):
-                for k in STEP_KEYS[3]:
-                    st.session_state.trigger_engine.notify_change(k, st.session_state)
-                st.session_state["step3_static_submitted"] = False
-                st.session_state["wizard_step"] = 4
-                st.session_state.trace_events.append("Step 3 dynamic questions answered, on to step 4.")
-                st.rerun()
-
-    elif step == 4:
-        # Step 4 form
-        with st.form("step4_form"):
-            values = render_step4_static()
-            submitted = st.form_submit_button("Next")
-        if submitted:
-            for k, v in values.items():
-                st.session_state[k] = v
-            for k in STEP_KEYS[4]:
-                st.session_state.trigger_engine.notify_change(k, st.session_state)
-            missing = [k for k in STEP_KEYS[4] if not st.session_state[k]]
-            if missing:
-                st.session_state["step4_static_submitted"] = True
-                st.session_state.trace_events.append(f"Step 4 submitted. Missing: {missing}")
-                st.rerun()
-            else:
-                st.session_state["step4_static_submitted"] = False
-                st.session_state["wizard_step"] = 5
-                st.session_state.trace_events.append("Step 4 submitted. All fields provided.")
-                st.rerun()
-
-        if st.session_state.get("step4_static_submitted"):
-            missing_keys = [k for k in STEP_KEYS[4] if not st.session_state[k]]
-            st.info("Please provide additional details for the following fields:")
-            for key in missing_keys[:5]:
-                label = key.replace("_", " ").title()
-                st.text_area(label, key=key) 
-            if st.button("Continue", key="continue_step4"):
-                for k in STEP_KEYS[4]:
-                    st.session_state.trigger_engine.notify_change(k, st.session_state)
-                st.session_state["step4_static_submitted"] = False
-                st.session_state["wizard_step"] = 5
-                st.session_state.trace_events.append("Step 4 dynamic questions answered, on to step 5.")
-                st.rerun()
-
-    elif step == 5:
-        # Step 5 form
-        with st.form("step5_form"):
-            values = render_step5_static()
-            submitted = st.form_submit_button("Next")
-        if submitted:
-            for k, v in values.items():
-                st.session_state[k] = v
-            for k in STEP_KEYS[5]:
-                st.session_state.trigger_engine.notify_change(k, st.session_state)
-            missing = [k for k in STEP_KEYS[5] if not st.session_state[k]]
-            if missing:
-                st.session_state["step5_static_submitted"] = True
-                st.session_state.trace_events.append(f"Step 5 submitted. Missing: {missing}")
-                st.rerun()
-            else:
-                st.session_state["step5_static_submitted"] = False
-                st.session_state["wizard_step"] = 6
-                st.session_state.trace_events.append("Step 5 submitted. All fields provided.")
-                st.rerun()
-
-        if st.session_state.get("step5_static_submitted"):
-            missing_keys = [k for k in STEP_KEYS[5] if not st.session_state[k]]
-            st.info("Please provide additional details for the following fields:")
-            for key in missing_keys[:5]:
-                label = key.replace("_", " ").title()
-                st.text_area(label, key=key)
-            if st.button("Continue", key="continue_step5"):
-                for k in STEP_KEYS[5]:
-                    st.session_state.trigger_engine.notify_change(k, st.session_state)
-                st.session_state["step5_static_submitted"] = False
-                st.session_state["wizard_step"] = 6
-                st.session_state.trace_events.append("Step 5 dynamic questions answered, on to step 6.")
-                st.rerun()
-
-    elif step == 6:
-        # Step 6 form
-        with st.form("step6_form"):
-            values = render_step6_static()
-            submitted = st.form_submit_button("Next")
-        if submitted:
-            for k, v in values.items():
-                st.session_state[k] = v
-            for k in STEP_KEYS[6]:
-                st.session_state.trigger_engine.notify_change(k, st.session_state)
-            missing = [k for k in STEP_KEYS[6] if not st.session_state[k]]
-            if missing:
-                st.session_state["step6_static_submitted"] = True
-                st.session_state.trace_events.append(f"Step 6 submitted. Missing: {missing}")
-                st.rerun()
-            else:
-                st.session_state["step6_static_submitted"] = False
-                st.session_state["wizard_step"] = 7
-                st.session_state.trace_events.append("Step 6 submitted. All fields provided.")
-                st.rerun()
-
-        if st.session_state.get("step6_static_submitted"):
-            missing_keys = [k for k in STEP_KEYS[6] if not st.session_state[k]]
-            st.info("Please provide additional details for the following fields:")
-            for key in missing_keys[:5]:
-                label = key.replace("_", " ").title()
-                st.text_input(label, key=key)
-            if st.button("Continue", key="continue_step6"):
-                for k in STEP_KEYS[6]:
-                    st.session_state.trigger_engine.notify_change(k, st.session_state)
-                st.session_state["step6_static_submitted"] = False
-                st.session_state["wizard_step"] = 7
-                st.session_state.trace_events.append("Step 6 dynamic questions answered, on to step 7.")
-                st.rerun()
-
-    elif step == 7:
-        # Step 7 form
-        with st.form("step7_form"):
-            values = render_step7_static()
-            submitted = st.form_submit_button("Next")
-        if submitted:
-            for k, v in values.items():
-                st.session_state[k] = v
-            for k in STEP_KEYS[7]:
-                st.session_state.trigger_engine.notify_change(k, st.session_state)
-            missing = [k for k in STEP_KEYS[7] if not st.session_state[k]]
-            if missing:
-                st.session_state["step7_static_submitted"] = True
-                st.session_state.trace_events.append(f"Step 7 submitted. Missing: {missing}")
-                st.rerun()
-            else:
-                st.session_state["step7_static_submitted"] = False
-                st.session_state["wizard_step"] = 8
-                st.session_state.trace_events.append("Step 7 submitted. All fields provided.")
-                st.rerun()
-
-        if st.session_state.get("step7_static_submitted"):
-            missing_keys = [k for k in STEP_KEYS[7] if not st.session_state[k]]
-            st.info("Please provide additional details for the following fields:")
-            for key in missing_keys[:5]:
-                label = key.replace("_", " ").title()
-                st.text_area(label, key=key)
-            if st.button("Continue", key="continue_step7"):
-                for k in STEP_KEYS[7]:
-                    st.session_state.trigger_engine.notify_change(k, st.session_state)
-                st.session_state["step7_static_submitted"] = False
-                st.session_state["wizard_step"] = 8
-                st.session_state.trace_events.append("Step 7 dynamic questions answered, on to step 8.")
-                st.rerun()
-
-    elif step == 8:
+    elif step == LAST_STEP:
         render_step8()
-
     else:
-        # fallback
-        st.session_state["wizard_step"] = 1
-        st.rerun()
+        render_step_form(step)
+        if st.session_state.get(f"step{step}_static_submitted"):
+            render_dynamic_questions(step)
 
     # --- Navigation controls ---
     if step > 1:
-        if st.button("⬅️ Back"):
-            # If going back from a step with dynamic Q open, reset its flag
-            if st.session_state.get(f"step{step}_static_submitted"):
-                st.session_state[f"step{step}_static_submitted"] = False
-            st.session_state["wizard_step"] -= 1
-            st.rerun()
-
-    if step < 8 and not st.session_state.get(f"step{step}_static_submitted", False):
-        if st.button("Next ➡"):
-            st.session_state["wizard_step"] += 1
-            st.rerun()
+        st.button("⬅️ Back", on_click=_step_back, args=(step,))
+
+    if step < LAST_STEP and not st.session_state.get(f"step{step}_static_submitted", False):
+        st.button("Next ➡", on_click=_step_forward, args=(step,))
@@ -0,0 +1,270 @@
+"""
+Bulk ingestion CLI
+------------------
+
+Backfill historic job ads without the Streamlit wizard::
+
+    python -m src.pipelines.bulk_ingest ads/ -o specs.jsonl
+    python -m src.pipelines.bulk_ingest manifest.txt -o specs.jsonl --llm-concurrency 8
+
+*Input* is a directory (searched recursively for PDF/DOCX/TXT files) or a
+manifest file with one path or URL per line (``#`` starts a comment).
+
+Text extraction (``file_tools`` / ``scraping_tools``) runs in a process pool;
+``auto_fill_job_spec`` calls run in a thread pool capped at
+``--llm-concurrency``. Extraction is only allowed to run a little ahead of
+the LLM stage, so the LLM quota – not Python – is the bottleneck and memory
+stays flat.
+
+Every finished item is appended to the output JSONL and to a checkpoint
+file (``<output>.checkpoint.jsonl``) with its status; re-running the same
+command skips items already marked ``done`` – or already present in the
+output, in case a crash hit between the two writes. A source listed twice
+is processed once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Input discovery & checkpointing
+# ────────────────────────────────────────────────────────────────────────────
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def item_id(source: str) -> str:
+    """Stable id for a path or URL (used as the checkpoint key)."""
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_sources(target: str) -> Iterator[str]:
+    """Yield absolute file paths / URLs from a directory or a manifest file."""
+    path = Path(target)
+    if path.is_dir():
+        for file in sorted(path.rglob("*")):
+            if file.is_file() and file.suffix.lower() in SUPPORTED_EXTENSIONS:
+                yield str(file.resolve())
+        return
+
+    base = path.resolve().parent
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield line if _is_url(line) else str((base / line).resolve())
+
+
+def load_checkpoint(path: Path) -> Dict[str, str]:
+    """Return ``{item_id: status}`` from an existing checkpoint (last entry wins)."""
+    statuses: Dict[str, str] = {}
+    if not path.exists():
+        return statuses
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue                    # torn last line after a crash
+            statuses[row["id"]] = row["status"]
+    return statuses
+
+
+def load_output_ids(path: Path) -> set:
+    """Ids of the records already in the output JSONL."""
+    ids = set()
+    if not path.exists():
+        return ids
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                ids.add(json.loads(line)["id"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue                    # torn last line after a crash
+    return ids
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Stage 1 – extraction (runs in worker processes)
+# ────────────────────────────────────────────────────────────────────────────
+def _extract_source(source: str, max_chars: int) -> str:
+    """Return the cleaned ad text for a file path or URL."""
+    from src.utils.text_cleanup import clean_text
+
+    if _is_url(source):
+        from src.tools.scraping_tools import fetch_url_text
+
+        text = fetch_url_text(source)
+    else:
+        from src.tools.file_tools import extract_text_from_file, open_file_buffer
+
+        # Already one of `workers` processes – no nested PDF process pool
+        text = extract_text_from_file(open_file_buffer(source), source, max_chars=max_chars, workers=1)
+    return clean_text(text)[:max_chars]
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Stage 2 – LLM (runs in threads, I/O bound)
+# ────────────────────────────────────────────────────────────────────────────
+def _fill_spec(text: str, summary_quality: str) -> Dict[str, Any]:
+    from src.agents.vacancy_agent import auto_fill_job_spec
+
+    return auto_fill_job_spec(raw_text=text, summary_quality=summary_quality)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Driver
+# ────────────────────────────────────────────────────────────────────────────
+def run(
+    target: str,
+    output: Path,
+    *,
+    checkpoint: Path,
+    workers: int,
+    llm_concurrency: int,
+    max_chars: int,
+    summary_quality: str,
+    retry_failed: bool,
+) -> Dict[str, int]:
+    """Process every pending source; returns ``{"done": n, "failed": m, "skipped": k}``."""
+    statuses = load_checkpoint(checkpoint)
+    # A record written just before a crash may miss its checkpoint row
+    statuses.update(dict.fromkeys(load_output_ids(output), "done"))
+    skip = {"done"} | (set() if retry_failed else {"failed"})
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+
+    pending = iter(iter_sources(target))
+    # Keep extraction only slightly ahead of the LLM stage
+    max_extract_inflight = max(workers, llm_concurrency) * 2
+    max_llm_backlog = llm_concurrency * 2
+
+    seen: set = set()                       # ids queued in this run – duplicates are skipped
+    extracting: Dict[Future, str] = {}
+    filling: Dict[Future, str] = {}
+    exhausted = False
+    started = time.monotonic()
+    reported = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as extract_pool, \
+            ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool, \
+            open(output, "a", encoding="utf-8") as out_fh, \
+            open(checkpoint, "a", encoding="utf-8") as ckpt_fh:
+
+        def record(source: str, status: str, spec: Dict[str, Any] | None = None, error: str = "") -> None:
+            row_id = item_id(source)
+            if spec is not None:
+                out_fh.write(json.dumps({"id": row_id, "source": source, "job_spec": spec}, ensure_ascii=False) + "\n")
+                out_fh.flush()
+            ckpt = {"id": row_id, "source": source, "status": status}
+            if error:
+                ckpt["error"] = error[:500]
+            ckpt_fh.write(json.dumps(ckpt, ensure_ascii=False) + "\n")
+            ckpt_fh.flush()
+            counts[status] += 1
+
+        while True:
+            # Top up the extraction stage while the LLM backlog is small
+            while (not exhausted and len(extracting) < max_extract_inflight
+                   and len(extracting) + len(filling) < max_extract_inflight + max_llm_backlog):
+                source = next(pending, None)
+                if source is None:
+                    exhausted = True
+                    break
+                source_id = item_id(source)
+                if source_id in seen or statuses.get(source_id) in skip:
+                    counts["skipped"] += 1
+                    continue
+                seen.add(source_id)
+                extracting[extract_pool.submit(_extract_source, source, max_chars)] = source
+
+            if not extracting and not filling:
+                break
+
+            done, _ = wait(list(extracting) + list(filling), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in extracting:
+                    source = extracting.pop(fut)
+                    try:
+                        text = fut.result()
+                    except Exception as e:
+                        record(source, "failed", error=f"extraction: {e}")
+                        continue
+                    if not text:
+                        record(source, "failed", error="extraction: no text")
+                        continue
+                    filling[llm_pool.submit(_fill_spec, text, summary_quality)] = source
+                else:
+                    source = filling.pop(fut)
+                    try:
+                        spec = fut.result()
+                    except Exception as e:
+                        record(source, "failed", error=f"llm: {e}")
+                        continue
+                    if spec:
+                        record(source, "done", spec=spec)
+                    else:
+                        record(source, "failed", error="llm: empty or invalid JobSpec")
+
+            finished = counts["done"] + counts["failed"]
+            if finished // 25 > reported // 25:
+                reported = finished
+                rate = finished / max(time.monotonic() - started, 1e-6)
+                print(f"[bulk_ingest] {finished} processed ({rate:.2f}/s)", file=sys.stderr)
+
+    return counts
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.pipelines.bulk_ingest",
+        description="Extract job ads in bulk and write JobSpec records as JSONL.",
+    )
+    parser.add_argument("target", help="Directory of ad files or a manifest of paths/URLs")
+    parser.add_argument("-o", "--output", required=True, type=Path, help="JSONL output file (appended to)")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Parallel LLM requests")
+    parser.add_argument("--max-chars", type=int, default=50_000, help="Max characters of ad text per item")
+    parser.add_argument("--summary-quality", choices=("economy", "standard", "high"), default="economy")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-process items marked failed")
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or args.output.with_name(args.output.name + ".checkpoint.jsonl")
+    counts = run(
+        args.target,
+        args.output,
+        checkpoint=checkpoint,
+        workers=max(1, args.workers),
+        llm_concurrency=max(1, args.llm_concurrency),
+        max_chars=args.max_chars,
+        summary_quality=args.summary_quality,
+        retry_failed=args.retry_failed,
+    )
+    print(
+        f"[bulk_ingest] done={counts['done']} failed={counts['failed']} skipped={counts['skipped']}",
+        file=sys.stderr,
+    )
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
-import openai
 from src.models.job_models import JobSpec
+from src.utils.llm_cache import LLMCache, fingerprint
+from src.utils.tool_registry import chat_completion
 
 SYSTEM_MSG = "You are an assistant helping to elaborate a job role definition based on given information."
+# Same prompt → same draft (also lets a prefetched breakdown serve the step-3 request)
+_cache = LLMCache("role_breakdown", maxsize=256)
 
 def generate_role_breakdown(spec: dict) -> dict:
     """
@@ -27,16 +30,17 @@ def generate_role_breakdown(spec: dict) -> dict:
         "Output only in JSON with keys: role_description, reports_to, supervises, role_performance_metrics, role_priority_projects."
     )
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": SYSTEM_MSG},
-                {"role": "user", "content": user_msg}
-            ],
-            temperature=0.7,
-            max_tokens=800
+        content = _cache.get_or_compute(
+            fingerprint(user_msg),
+            lambda: chat_completion(
+                user_msg,
+                system=SYSTEM_MSG,
+                model="gpt-4",
+                temperature=0.7,
+                max_tokens=800,
+                operation="role_breakdown",
+            ),
         )
-        content = response.choices[0].message.content.strip()
     except Exception as e:
         print(f"generate_role_breakdown error: {e}")
         return {}
@@ -0,0 +1,196 @@
+"""
+Blob store
+----------
+
+Process-wide, content-addressed store for large texts (raw ad text, extracted
+documents). Session state keeps only a small ``BlobRef``; the text itself is
+held once per process – compressed – however many sessions or fields refer
+to it, and is decompressed lazily when a consumer calls ``load_text``.
+
+* Key: SHA-256 of the UTF-8 text.
+* Compression: zstd when the optional ``zstandard`` package is installed,
+  zlib otherwise (the codec is recorded in the first byte of each payload).
+* With session persistence enabled, payloads are written through to the
+  ``blobs`` table of the session database, so the in-memory copy can be
+  evicted (LRU, above ``VACALYSER_BLOB_MEM_MB``) and refs survive restarts.
+
+Typical usage
+-------------
+>>> from src.state.blob_store import put_text, load_text
+>>> ref = put_text("Senior Data Engineer …")
+>>> load_text(ref)
+'Senior Data Engineer …'
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
+
+try:
+    import zstandard as _zstd          # optional, ~3× faster than zlib at a better ratio
+except ImportError:
+    _zstd = None
+
+_MEM_LIMIT = int(float(os.getenv("VACALYSER_BLOB_MEM_MB", "256")) * 1024 * 1024)
+
+
+class BlobRef(NamedTuple):
+    """Reference to a stored text – what session state holds instead of the text."""
+    digest: str
+    size: int            # characters, for UI hints without loading the text
+
+    def __str__(self) -> str:
+        return f"<blob {self.digest[:12]} · {self.size} chars>"
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Codec
+# ────────────────────────────────────────────────────────────────────────────
+def _compress(data: bytes) -> bytes:
+    if _zstd is not None:
+        return b"Z" + _zstd.ZstdCompressor(level=3).compress(data)
+    return b"z" + zlib.compress(data, 6)
+
+
+def _decompress(payload: bytes) -> bytes:
+    codec, body = payload[:1], payload[1:]
+    if codec == b"Z":
+        if _zstd is None:
+            raise RuntimeError("blob was written with zstd but 'zstandard' is not installed")
+        return _zstd.ZstdDecompressor().decompress(body)
+    if codec == b"z":
+        return zlib.decompress(body)
+    return body                                          # b"r": stored raw
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Store
+# ────────────────────────────────────────────────────────────────────────────
+class BlobStore:
+    """Compressed payloads keyed by digest, LRU-bounded, with optional write-through."""
+
+    def __init__(self, mem_limit: int = _MEM_LIMIT) -> None:
+        self.mem_limit = mem_limit
+        self._payloads: "OrderedDict[str, bytes]" = OrderedDict()
+        self._persisted: set[str] = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _backing():
+        from src.state.persistence import get_store   # lazy: persistence imports BlobRef
+        return get_store()
+
+    def put(self, text: str) -> BlobRef:
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        ref = BlobRef(digest, len(text))
+        with self._lock:
+            if digest in self._payloads:
+                self._payloads.move_to_end(digest)
+                return ref
+        payload = _compress(data)
+        backing = self._backing()
+        if backing is not None:
+            try:
+                backing.put_blob(digest, payload)
+                persisted = True
+            except Exception as e:
+                print(f"blob_store: write-through failed - {e}")
+                persisted = False
+        else:
+            persisted = False
+        with self._lock:
+            if digest not in self._payloads:
+                self._payloads[digest] = payload
+                self._bytes += len(payload)
+                if persisted:
+                    self._persisted.add(digest)
+                self._evict()
+        return ref
+
+    def get(self, ref: BlobRef) -> str:
+        with self._lock:
+            payload = self._payloads.get(ref.digest)
+            if payload is not None:
+                self._payloads.move_to_end(ref.digest)
+        if payload is None:
+            backing = self._backing()
+            payload = backing.get_blob(ref.digest) if backing is not None else None
+            if payload is None:
+                raise KeyError(f"blob {ref.digest} not found")
+            with self._lock:
+                if ref.digest not in self._payloads:
+                    self._payloads[ref.digest] = payload
+                    self._bytes += len(payload)
+                    self._persisted.add(ref.digest)
+                    self._evict()
+        return _decompress(payload).decode("utf-8")
+
+    def _evict(self) -> None:
+        # Only payloads that are safe on disk may leave memory
+        if self._bytes <= self.mem_limit:
+            return
+        for digest in list(self._payloads):
+            if self._bytes <= self.mem_limit:
+                break
+            if digest in self._persisted:
+                self._bytes -= len(self._payloads.pop(digest))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"blobs": len(self._payloads), "compressed_bytes": self._bytes,
+                    "codec": "zstd" if _zstd is not None else "zlib"}
+
+
+_store = BlobStore()
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Public façade
+# ────────────────────────────────────────────────────────────────────────────
+def put_text(text: str) -> BlobRef:
+    """Store *text* once (compressed) and return its reference."""
+    return _store.put(text)
+
+
+@lru_cache(maxsize=32)
+def _load_cached(ref: BlobRef) -> str:
+    return _store.get(ref)
+
+
+def load_text(value: Any, default: str = "") -> str:
+    """
+    Resolve *value* to text: a ``BlobRef`` is loaded (recently used texts are
+    kept decompressed), a plain string is returned as is, None → *default*.
+    """
+    if value is None:
+        return default
+    if isinstance(value, BlobRef):
+        try:
+            return _load_cached(value)
+        except KeyError as e:
+            print(f"blob_store: {e}")
+            return default
+    return value
+
+
+def blob_stats() -> dict:
+    return _store.stats()
+
+
+def blob_ref_to_json(ref: BlobRef) -> dict:
+    return {"$blob": ref.digest, "size": ref.size}
+
+
+def blob_ref_from_json(obj: Any) -> Optional[BlobRef]:
+    """Inverse of ``blob_ref_to_json``; None if *obj* is not a ref."""
+    if isinstance(obj, dict) and set(obj) == {"$blob", "size"}:
+        return BlobRef(obj["$blob"], obj["size"])
+    return None
@@ -0,0 +1,205 @@
+"""
+Session persistence
+-------------------
+
+Server-side autosave for the wizard, so a browser refresh or a pod restart
+does not throw away uploads and LLM extractions.
+
+* One local SQLite file in WAL mode (readers never block the writer; commits
+  are a sequential log append).
+* Keyed by a session token that lives in the page URL (``?sid=…``), so a
+  reload of the same URL finds its session again.
+* ``save_fields`` writes only the fields passed in – callers hand over the
+  diff since the last save (``VacancyState.changed_since``).
+* Large values are content-addressed: stored once in ``blobs`` by SHA-256
+  and referenced from any number of fields/sessions. Fields holding a
+  ``BlobRef`` (raw ad text, see ``blob_store``) store only the reference; the
+  compressed payload is written to ``blobs`` by the blob store itself.
+* ``load_session`` is one indexed SELECT – a few milliseconds.
+
+Environment variables:
+
+    VACALYSER_SESSION_DB        SQLite file (default ~/.cache/vacalyser/sessions.sqlite3)
+    VACALYSER_PERSIST=0         disable persistence
+    VACALYSER_BLOB_MIN_BYTES    values at least this large go to ``blobs`` (default 4096)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from src.state.blob_store import BlobRef, blob_ref_from_json, blob_ref_to_json
+
+PERSIST_ENABLED = os.getenv("VACALYSER_PERSIST", "1") != "0"
+_DB_PATH = Path(os.getenv("VACALYSER_SESSION_DB", Path.home() / ".cache" / "vacalyser" / "sessions.sqlite3"))
+BLOB_MIN_BYTES = int(os.getenv("VACALYSER_BLOB_MIN_BYTES", "4096"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token       TEXT PRIMARY KEY,
+    created     REAL NOT NULL,
+    updated     REAL NOT NULL,
+    wizard_step INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS fields (
+    token     TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    value     TEXT,              -- JSON, NULL when the value lives in blobs
+    blob_hash TEXT,
+    PRIMARY KEY (token, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SessionStore:
+    """Thread-safe SQLite store for wizard sessions (one per process)."""
+
+    def __init__(self, path: str | os.PathLike = _DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")      # durable at checkpoints, fast commits
+        self._conn.executescript(_SCHEMA)
+
+    # ---------------------------------------------------------------- writes
+    def save_fields(
+        self,
+        token: str,
+        changed: Mapping[str, Any],
+        *,
+        wizard_step: Optional[int] = None,
+    ) -> int:
+        """Upsert *changed* fields (a diff) for *token*; returns rows written."""
+        now = time.time()
+        rows = []
+        blobs = []
+        for name, value in changed.items():
+            if isinstance(value, BlobRef):
+                # payload already in blobs (blob-store write-through) – keep the reference only
+                rows.append((token, name, json.dumps(blob_ref_to_json(value)), value.digest))
+                continue
+            encoded = json.dumps(value, ensure_ascii=False)
+            if len(encoded) >= BLOB_MIN_BYTES:
+                data = encoded.encode("utf-8")
+                digest = hashlib.sha256(data).hexdigest()
+                blobs.append((digest, data, len(data)))
+                rows.append((token, name, None, digest))
+            else:
+                rows.append((token, name, encoded, None))
+
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.execute(
+                    "INSERT INTO sessions (token, created, updated, wizard_step) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(token) DO UPDATE SET updated = excluded.updated"
+                    + (", wizard_step = excluded.wizard_step" if wizard_step is not None else ""),
+                    (token, now, now, wizard_step or 1),
+                )
+                if blobs:
+                    # Content-addressed: a text shared by many fields/sessions is stored once
+                    cur.executemany("INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)", blobs)
+                if rows:
+                    cur.executemany(
+                        "INSERT INTO fields (token, name, value, blob_hash) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(token, name) DO UPDATE SET value = excluded.value, blob_hash = excluded.blob_hash",
+                        rows,
+                    )
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    # ----------------------------------------------------------------- reads
+    def load_session(self, token: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Return ``(fields, wizard_step)`` for *token*, or None if unknown."""
+        with self._lock:
+            meta = self._conn.execute("SELECT wizard_step FROM sessions WHERE token = ?", (token,)).fetchone()
+            if meta is None:
+                return None
+            rows = self._conn.execute(
+                # BlobRef fields carry their reference in `value` – their payload stays unread
+                "SELECT f.name, f.value, b.data FROM fields f "
+                "LEFT JOIN blobs b ON f.value IS NULL AND b.hash = f.blob_hash WHERE f.token = ?",
+                (token,),
+            ).fetchall()
+        fields: Dict[str, Any] = {}
+        for name, value, data in rows:
+            if value is not None:
+                decoded = json.loads(value)
+                fields[name] = blob_ref_from_json(decoded) or decoded
+            elif data is not None:
+                fields[name] = json.loads(data.decode("utf-8"))
+        return fields, meta[0]
+
+    def put_blob(self, digest: str, data: bytes) -> None:
+        """Store a content-addressed payload (no-op if it already exists)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)", (digest, data, len(data))
+            )
+
+    def get_blob(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    # ----------------------------------------------------------- maintenance
+    def prune(self, max_age_days: float = 30) -> int:
+        """
+        Delete sessions idle longer than *max_age_days* and orphaned blobs.
+        Run it when no session is mid-upload: a blob written by the blob store
+        is only referenced once its field is autosaved.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                stale = [r[0] for r in cur.execute("SELECT token FROM sessions WHERE updated < ?", (cutoff,))]
+                cur.executemany("DELETE FROM fields WHERE token = ?", [(t,) for t in stale])
+                cur.executemany("DELETE FROM sessions WHERE token = ?", [(t,) for t in stale])
+                cur.execute(
+                    "DELETE FROM blobs WHERE hash NOT IN (SELECT blob_hash FROM fields WHERE blob_hash IS NOT NULL)"
+                )
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return len(stale)
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[SessionStore]:
+    """Process-wide store (None when persistence is disabled or unavailable)."""
+    global _store
+    if not PERSIST_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = SessionStore()
+                except (OSError, sqlite3.Error) as e:
+                    print(f"persistence: session store unavailable - {e}")
+                    return None
+    return _store
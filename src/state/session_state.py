@@ -1,33 +1,165 @@
+import re
+import secrets
+import sqlite3
+
 import streamlit as st
-from src.config import keys  # assuming keys.py defines STEP_KEYS or similar
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from src.state.blob_store import BlobRef
+from src.state.persistence import get_store
+from src.state.trace_log import TraceLog, spill_path_for
+from src.state.vacancy_state import VacancyState
+from src.utils.llm_usage import session_id, set_attribution_resolver
+from src.utils.tracing import set_sink_resolver
+
+# All wizard fields live in one VacancyState under this key
+VACANCY_KEY = "vacancy"
+# Persistence bookkeeping (underscore keys are never treated as wizard fields)
+_TOKEN_KEY = "_session_token"
+_PERSISTED_KEY = "_persisted_snapshot"
+TRACE_KEY = "_trace_log"
+_TOKEN_RE = re.compile(r"[\w-]{16,64}")
+
+
+def session_token() -> str:
+    """Token identifying this wizard session; kept in the URL as ``?sid=…``."""
+    token = st.session_state.get(_TOKEN_KEY)
+    if token:
+        return token
+    params = getattr(st, "query_params", None)
+    token = params.get("sid") if params is not None else None
+    if not token or not _TOKEN_RE.fullmatch(token):
+        token = secrets.token_urlsafe(16)
+        if params is not None:
+            params["sid"] = token          # a reload of this URL restores the session
+    st.session_state[_TOKEN_KEY] = token
+    return token
+
+
+def initialize_session_state() -> None:
+    """
+    Create the per-session VacancyState once (no-op on later reruns).
+    If the URL token belongs to a saved session, its fields and wizard step
+    are restored instead of starting empty.
+    """
+    if VACANCY_KEY in st.session_state:
+        return
+    vacancy = VacancyState()
+    store = get_store()
+    if store is not None:
+        try:
+            restored = store.load_session(session_token())
+        except sqlite3.Error as e:
+            print(f"initialize_session_state: restore failed - {e}")
+            restored = None
+        if restored:
+            fields, wizard_step = restored
+            vacancy.update(fields)
+            vacancy.clear_dirty()          # processors already ran before the reconnect
+            st.session_state["wizard_step"] = wizard_step
+    st.session_state[VACANCY_KEY] = vacancy
+    st.session_state[_PERSISTED_KEY] = vacancy.snapshot()
+
+
+def persist_session() -> int:
+    """
+    Autosave: write the fields changed since the last save (plus the current
+    wizard step). Returns the number of fields written.
+    """
+    store = get_store()
+    if store is None:
+        return 0
+    vacancy = get_vacancy_state()
+    snapshot = st.session_state.get(_PERSISTED_KEY)
+    changed = vacancy.changed_since(snapshot) if snapshot else list(vacancy.to_dict())
+    try:
+        written = store.save_fields(
+            session_token(),
+            {key: vacancy[key] for key in changed},
+            wizard_step=st.session_state.get("wizard_step", 1),
+        )
+    except sqlite3.Error as e:
+        print(f"persist_session: autosave failed - {e}")
+        return 0
+    st.session_state[_PERSISTED_KEY] = vacancy.snapshot()
+    return written
+
+
+def get_vacancy_state() -> VacancyState:
+    """Return this session's VacancyState, creating it on first use."""
+    initialize_session_state()
+    return st.session_state[VACANCY_KEY]
+
+
+def get_trace_log() -> TraceLog:
+    """This session's bounded trace log (spilled to ``VACALYSER_TRACE_DIR`` if set)."""
+    log = st.session_state.get(TRACE_KEY)
+    if log is None:
+        log = st.session_state[TRACE_KEY] = TraceLog(spill_path=spill_path_for(session_token()))
+    return log
+
+
+def _session_span_sink():
+    """Finished spans started from a script run go to that session's trace log."""
+    if get_script_run_ctx() is None:
+        return None                        # worker thread / bulk job: exporters only
+    log = get_trace_log()
+
+    def sink(spans) -> None:
+        for sp in spans:
+            log.record(
+                "span", sp.name, duration=sp.duration, ts=sp.start_ns / 1e9,
+                trace=sp.trace_id, span=sp.span_id, parent=sp.parent_id, error=sp.error, **sp.attrs,
+            )
+    return sink
+
+
+set_sink_resolver(_session_span_sink)
+
+
+def vacancy_key(vacancy: VacancyState) -> str:
+    """
+    Stable id of the vacancy being worked on: the internal job id if given,
+    else the digest of its ad text, else the session's "draft".
+    """
+    job_id = vacancy.get("internal_job_id")
+    if job_id:
+        return f"job:{job_id}"
+    raw = vacancy.get("parsed_data_raw")
+    if isinstance(raw, BlobRef):
+        return f"ad:{raw.digest[:12]}"
+    return f"draft:{session_id(session_token())}"
+
+
+def _usage_attribution():
+    """(session, vacancy, title) for LLM calls made from a script run."""
+    if get_script_run_ctx() is None:
+        return None
+    vacancy = get_vacancy_state()
+    return session_token(), vacancy_key(vacancy), vacancy.get("job_title", "")
+
+
+set_attribution_resolver(_usage_attribution)
+
 
 class SessionState:
     """Helper class to manage Vacalyser session state across Streamlit reruns."""
     def __init__(self):
-        # Initialize all expected keys in session_state if not present
-        for step, field_list in keys.STEP_KEYS.items():
-            for field in field_list:
-                if field not in st.session_state:
-                    st.session_state[field] = None
+        # All expected keys (keys.STEP_KEYS) are slots of one VacancyState
+        initialize_session_state()
+
+    @property
+    def vacancy(self) -> VacancyState:
+        return get_vacancy_state()
 
     def reset(self):
         """Clear all job spec fields from session state (e.g., to start a new session)."""
-        for step, field_list in keys.STEP_KEYS.items():
-            for field in field_list:
-                if field in st.session_state:
-                    del st.session_state[field]
+        self.vacancy.reset()
 
     # Convenience getters/setters can be added for frequently accessed fields, e.g.:
     def get_job_spec_dict(self):
         """Return a dictionary of all JobSpec fields from session state."""
-        spec = {}
-        for step, field_list in keys.STEP_KEYS.items():
-            for field in field_list:
-                spec[field] = st.session_state.get(field)
-        return spec
+        return self.vacancy.to_dict(include_empty=True)
 
     def load_from_dict(self, data: dict):
         """Load multiple fields into session state from a given dict (e.g., from AI output)."""
-        for key, value in data.items():
-            if key in st.session_state:
-                st.session_state[key] = value
+        self.vacancy.update(data)
@@ -0,0 +1,165 @@
+"""
+Trace log
+---------
+
+Structured, bounded event log for one wizard session – the data behind the
+sidebar Trace-Viewer.
+
+* Every event has a wall-clock timestamp, an optional duration (seconds), a
+  ``kind`` (``wizard``, ``analyze``, ``llm`` …), a short message and free
+  attributes.
+* Events live in a fixed-capacity ring buffer (``collections.deque`` with
+  ``maxlen``): a long session keeps the newest ``capacity`` events and memory
+  stays flat. Each event carries a running sequence number, so a viewer can
+  ask for "everything after #n" and the count of dropped events is known.
+* Optionally, events falling out of the buffer are appended to a JSONL file,
+  so the full history of a session is still on disk for later analysis.
+
+Environment variables:
+
+    VACALYSER_TRACE_CAPACITY    events kept in memory per session (default 500)
+    VACALYSER_TRACE_DIR         directory for ``<session>.jsonl`` spill files (default: no spill)
+
+Typical usage
+-------------
+>>> from src.state.trace_log import TraceLog
+>>> log = TraceLog(capacity=2)
+>>> _ = log.record("wizard", "Step 2 submitted", step=2)
+>>> _ = log.record("analyze", "Auto-extracted fields", duration=1.25)
+>>> _ = log.record("wizard", "Step 3 submitted", step=3)
+>>> [e.message for e in log.events(kinds={"wizard"})], log.dropped
+(['Step 3 submitted'], 1)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, NamedTuple, Optional
+
+DEFAULT_CAPACITY = int(os.getenv("VACALYSER_TRACE_CAPACITY", "500"))
+TRACE_DIR = os.getenv("VACALYSER_TRACE_DIR") or None
+
+
+class TraceEvent(NamedTuple):
+    """One immutable trace entry."""
+    seq: int
+    ts: float                       # time.time() at the start of the event
+    kind: str
+    message: str
+    duration: Optional[float] = None
+    attrs: Dict[str, Any] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        row = {"seq": self.seq, "ts": round(self.ts, 3), "kind": self.kind, "message": self.message}
+        if self.duration is not None:
+            row["duration_ms"] = round(self.duration * 1000, 1)
+        row.update(self.attrs)
+        return row
+
+
+class TraceLog:
+    """Fixed-capacity ring buffer of ``TraceEvent`` with optional JSONL spill."""
+
+    __slots__ = ("_events", "_seq", "_kinds", "spill_path")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: str | os.PathLike | None = None) -> None:
+        self._events: "deque[TraceEvent]" = deque(maxlen=max(1, capacity))
+        self._seq = 0
+        self._kinds: Counter = Counter()
+        self.spill_path = Path(spill_path) if spill_path else None
+
+    # ---------------------------------------------------------------- writes
+    def record(
+        self,
+        kind: str,
+        message: str = "",
+        *,
+        duration: Optional[float] = None,
+        ts: Optional[float] = None,
+        **attrs: Any,
+    ) -> TraceEvent:
+        """Append one event; the oldest one is dropped (or spilled) when full."""
+        self._seq += 1
+        event = TraceEvent(self._seq, time.time() if ts is None else ts, kind, message, duration, attrs)
+        if len(self._events) == self._events.maxlen:
+            self._spill(self._events[0])
+        self._events.append(event)
+        self._kinds[kind] += 1
+        return event
+
+    def _spill(self, event: TraceEvent) -> None:
+        if self.spill_path is None:
+            return
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(event.as_dict(), ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"TraceLog: spill failed - {e}")
+            self.spill_path = None          # do not retry on every event
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._kinds.clear()
+
+    # ----------------------------------------------------------------- reads
+    @property
+    def capacity(self) -> int:
+        return self._events.maxlen
+
+    @property
+    def total(self) -> int:
+        """Events recorded since the log was created (sequence of the newest)."""
+        return self._seq
+
+    @property
+    def dropped(self) -> int:
+        """Events no longer in memory (spilled or discarded)."""
+        return self._seq - len(self._events)
+
+    def kinds(self) -> List[str]:
+        return sorted(self._kinds)
+
+    def events(
+        self,
+        *,
+        kinds: Optional[Collection[str]] = None,
+        since: int = 0,
+        contains: str = "",
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+    ) -> List[TraceEvent]:
+        """
+        Buffered events, filtered by *kinds*, sequence number (> *since*) and
+        a case-insensitive *contains* substring; at most *limit* of the newest.
+        """
+        needle = contains.lower()
+        selected: List[TraceEvent] = []
+        # Walk newest → oldest so *since* and *limit* can stop early
+        for event in reversed(self._events):
+            if event.seq <= since or (limit is not None and len(selected) >= limit):
+                break
+            if kinds is not None and event.kind not in kinds:
+                continue
+            if needle and needle not in event.message.lower():
+                continue
+            selected.append(event)
+        return selected if newest_first else selected[::-1]
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        return iter(self._events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __repr__(self) -> str:
+        return f"TraceLog({len(self._events)}/{self.capacity} events, {self.dropped} dropped)"
+
+
+def spill_path_for(session: str) -> Optional[Path]:
+    """JSONL spill file for *session* under ``VACALYSER_TRACE_DIR`` (None if unset)."""
+    return Path(TRACE_DIR) / f"{session}.jsonl" if TRACE_DIR else None
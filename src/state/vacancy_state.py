@@ -0,0 +1,203 @@
+"""
+Vacancy state
+-------------
+
+One compact object per session for every wizard field, instead of ~100 loose
+``st.session_state`` entries.
+
+* The field index is derived once from ``config/keys.py`` (``STEP_KEYS`` +
+  ``GENERATED_KEYS``); names are interned and map to a slot in one list.
+* ``VacancyState`` uses ``__slots__``: a list of values plus an ``int``
+  bitmask of dirty fields – no per-instance ``__dict__``, no per-field objects.
+* ``snapshot()`` is a tuple of the current values (shallow, O(n) pointers);
+  ``changed_since(snapshot)`` diffs against it without any deep copy.
+* It speaks the small mapping protocol processors already use
+  (``state.get(k)``, ``state[k] = v``), so it can be handed to
+  ``TriggerEngine.notify_change`` directly.
+
+Typical usage
+-------------
+>>> from src.state.vacancy_state import VacancyState
+>>> vs = VacancyState({"job_title": "Data Engineer"})
+>>> vs["city"] = "Berlin"
+>>> vs.dirty_keys()
+['job_title', 'city']
+>>> vs.to_job_spec().city
+'Berlin'
+"""
+
+from __future__ import annotations
+
+import sys
+import types
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union, get_args, get_origin
+
+from src.config.keys import GENERATED_KEYS, STEP_KEYS
+from src.models.job_models import JobSpec
+
+# ────────────────────────────────────────────────────────────────────────────
+# Field index (built once per process)
+# ────────────────────────────────────────────────────────────────────────────
+FIELDS: Tuple[str, ...] = tuple(
+    dict.fromkeys(sys.intern(k) for keys in (*STEP_KEYS.values(), GENERATED_KEYS) for k in keys)
+)
+FIELD_INDEX: Dict[str, int] = {name: i for i, name in enumerate(FIELDS)}
+_STEP_MASKS: Dict[int, int] = {
+    step: sum(1 << FIELD_INDEX[k] for k in set(keys)) for step, keys in STEP_KEYS.items()
+}
+
+
+def _is_list_annotation(annotation: Any) -> bool:
+    """True for ``List[str]``, ``list[str]``, ``Optional[List[str]]``, ``list[str] | None`` …"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        return any(_is_list_annotation(arg) for arg in get_args(annotation) if arg is not type(None))
+    return annotation is list or get_origin(annotation) is list
+
+
+# JobSpec fields that hold lists (the wizard keeps them as one line per item)
+_LIST_FIELDS = frozenset(
+    name for name, field in JobSpec.model_fields.items() if _is_list_annotation(field.annotation)
+)
+
+
+def _keys_of(mask: int) -> List[str]:
+    keys = []
+    while mask:
+        low = mask & -mask
+        keys.append(FIELDS[low.bit_length() - 1])
+        mask ^= low
+    return keys
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# State object
+# ────────────────────────────────────────────────────────────────────────────
+class VacancyState:
+    """Typed container for all wizard fields of one session."""
+
+    __slots__ = ("_values", "_dirty")
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None) -> None:
+        self._values: List[Any] = [None] * len(FIELDS)
+        self._dirty = 0
+        if data:
+            self.update(data)
+
+    # ---------------------------------------------------------- mapping API
+    def __getitem__(self, key: str) -> Any:
+        return self._values[FIELD_INDEX[key]]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in FIELD_INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of *key*, or *default* if unset (None) or not a wizard field."""
+        i = FIELD_INDEX.get(key)
+        if i is None:
+            return default
+        value = self._values[i]
+        return default if value is None else value
+
+    def set(self, key: str, value: Any) -> bool:
+        """Store *value*; returns True (and marks *key* dirty) if it changed."""
+        i = FIELD_INDEX[key]
+        if self._values[i] == value:
+            return False
+        self._values[i] = value
+        self._dirty |= 1 << i
+        return True
+
+    def update(self, data: Mapping[str, Any]) -> List[str]:
+        """Set every known field in *data* (unknown keys are ignored); returns changed keys."""
+        return [key for key, value in data.items() if key in FIELD_INDEX and self.set(key, value)]
+
+    def reset(self) -> None:
+        """Clear all fields (e.g. to start a new vacancy)."""
+        self._values = [None] * len(FIELDS)
+        self._dirty = 0
+
+    def missing(self, step: int) -> List[str]:
+        """Fields of *step* that are still empty, in ``STEP_KEYS`` order."""
+        return [k for k in STEP_KEYS[step] if not self._values[FIELD_INDEX[k]]]
+
+    # ------------------------------------------------------------ dirty flags
+    def is_dirty(self, key: str) -> bool:
+        return bool(self._dirty >> FIELD_INDEX[key] & 1)
+
+    def dirty_keys(self, step: Optional[int] = None) -> List[str]:
+        """Fields changed since the last ``clear_dirty`` (optionally of one step)."""
+        mask = self._dirty if step is None else self._dirty & _STEP_MASKS[step]
+        return _keys_of(mask)
+
+    def clear_dirty(self, keys: Optional[List[str]] = None) -> None:
+        if keys is None:
+            self._dirty = 0
+        else:
+            for key in keys:
+                self._dirty &= ~(1 << FIELD_INDEX[key])
+
+    # -------------------------------------------------------------- snapshots
+    def snapshot(self) -> Tuple[Any, ...]:
+        """Immutable shallow copy of all values – cheap enough for every rerun."""
+        return tuple(self._values)
+
+    def restore(self, snapshot: Tuple[Any, ...]) -> None:
+        self._values = list(snapshot)
+        self._dirty = 0
+
+    def changed_since(self, snapshot: Tuple[Any, ...]) -> List[str]:
+        return [
+            FIELDS[i]
+            for i, (old, new) in enumerate(zip(snapshot, self._values))
+            if old is not new and old != new
+        ]
+
+    # ---------------------------------------------------------- serialisation
+    def to_dict(self, *, include_empty: bool = False) -> Dict[str, Any]:
+        return {
+            name: value
+            for name, value in zip(FIELDS, self._values)
+            if include_empty or value not in (None, "")
+        }
+
+    def to_job_spec(self) -> JobSpec:
+        """Build a ``JobSpec`` from the fields it models (list fields split by line)."""
+        data: Dict[str, Any] = {}
+        for name in JobSpec.model_fields:
+            value = self.get(name)
+            if value in (None, ""):
+                continue
+            if name in _LIST_FIELDS and isinstance(value, str):
+                value = [line.strip(" -•\t") for line in value.splitlines() if line.strip(" -•\t")]
+            data[name] = value
+        data.setdefault("job_title", "")
+        return JobSpec(**data)
+
+    def load_job_spec(self, spec: JobSpec | Mapping[str, Any]) -> List[str]:
+        """Merge a ``JobSpec`` (or its dict) into the state; returns changed keys."""
+        data = spec.model_dump() if isinstance(spec, JobSpec) else dict(spec)
+        return self.update({
+            key: "\n".join(map(str, value)) if isinstance(value, list) else value
+            for key, value in data.items()
+            if value is not None
+        })
+
+    @classmethod
+    def from_job_spec(cls, spec: JobSpec | Mapping[str, Any]) -> "VacancyState":
+        state = cls()
+        state.load_job_spec(spec)
+        state.clear_dirty()
+        return state
+
+    def __repr__(self) -> str:
+        filled = sum(v not in (None, "") for v in self._values)
+        return f"VacancyState({filled}/{len(FIELDS)} fields, {bin(self._dirty).count('1')} dirty)"
@@ -1,125 +1,417 @@
-<<<<<<< HEAD
-import base64
-import textract  # use textract to handle multiple file types conveniently
+from __future__ import annotations
+
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, Union
+
+from src.utils.tool_registry import tool
+from src.utils.tracing import span
+
+# PDFs with at least this many pages are sharded across a process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("VACALYSER_PDF_PARALLEL_MIN_PAGES", "40"))
+# Pages handed to one worker at a time
+PDF_SHARD_PAGES = int(os.getenv("VACALYSER_PDF_SHARD_PAGES", "16"))
+# Files on disk larger than this are memory-mapped instead of read into RAM
+MMAP_MIN_BYTES = int(os.getenv("VACALYSER_MMAP_MIN_BYTES", str(4 * 1024 * 1024)))
+
+# Anything we accept as file content: raw bytes, views on them, or a binary
+# file object (Streamlit's UploadedFile is a BytesIO subclass).
+FileContent = Union[bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+# What PyMuPDF opens without a copy: a path, or an in-memory buffer
+PdfSource = Union[str, os.PathLike, bytes, bytearray]
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Buffer helpers – avoid copying uploaded bytes
+# ────────────────────────────────────────────────────────────────────────────
+class MappedFile(mmap.mmap):
+    """Read-only mmap that remembers its file, so PDFs can be reopened by path."""
+
+    path: str
+
+
+def open_file_buffer(path: str | os.PathLike) -> bytes | MappedFile:
+    """
+    Return the content of *path* for ``extract_text_from_file``.
+
+    Small files are read once; large files are memory-mapped so the page cache
+    backs them instead of the Python heap (PDFs among them are then opened by
+    ``path`` – never copied into a bytes object).
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size < MMAP_MIN_BYTES or size == 0:
+            return fh.read()
+        mapped = MappedFile(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        mapped.path = os.fspath(path)
+        return mapped
 
-def extract_text_from_file(file_content: str, filename: str) -> str:
+
+def _as_bytes(file_content: FileContent) -> bytes:
     """
-    Extract readable text from an uploaded file.
-    file_content: base64-encoded content of the file.
-    filename: original file name with extension.
-    Returns a UTF-8 text string extracted from the file, or an empty string if extraction fails.
+    Return *file_content* as ``bytes`` (PyMuPDF needs them), copying only when
+    the source is not already backed by a bytes object.
     """
-    if not file_content or not filename:
-        return ""
+    if isinstance(file_content, bytes):
+        return file_content
+    if isinstance(file_content, memoryview):
+        base = file_content.obj
+        if isinstance(base, bytes) and file_content.contiguous and file_content.nbytes == len(base):
+            return base
+        return file_content.tobytes()
+    if isinstance(file_content, (bytearray, mmap.mmap)):
+        return bytes(file_content)
+    if isinstance(file_content, io.BytesIO):
+        # getvalue() shares the underlying buffer when it was built from bytes
+        return file_content.getvalue()
+    file_content.seek(0)
+    return file_content.read()
 
-    # Decode the base64 content to bytes
-    try:
-        file_bytes = base64.b64decode(file_content)
-    except Exception as e:
-        print(f"extract_text_from_file: Base64 decode error - {e}")
-        return ""
 
-    # Determine file type by extension
-    ext = filename.split(".")[-1].lower() if "." in filename else ""
+class _MmapStream(io.RawIOBase):
+    """Seekable read-only stream over an mmap (``mmap`` lacks ``seekable()`` before 3.13)."""
+
+    def __init__(self, mm: mmap.mmap) -> None:
+        self._mm = mm
+        mm.seek(0)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buf) -> int:
+        data = self._mm.read(len(buf))
+        buf[: len(data)] = data
+        return len(data)
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        self._mm.seek(pos, whence)
+        return self._mm.tell()
+
+    def tell(self) -> int:
+        return self._mm.tell()
+
+
+def _as_stream(file_content: FileContent) -> BinaryIO:
+    """Return a seekable binary stream over *file_content* without copying it."""
+    if isinstance(file_content, bytes):
+        return io.BytesIO(file_content)        # BytesIO shares an initial bytes object
+    if isinstance(file_content, mmap.mmap):
+        return _MmapStream(file_content)
+    if isinstance(file_content, (bytearray, memoryview)):
+        return io.BytesIO(_as_bytes(file_content))
+    file_content.seek(0)
+    return file_content
+
+
+def _decode_text(file_content: FileContent) -> str:
+    """Decode a plain-text file as UTF-8 (ignoring invalid bytes)."""
+    if isinstance(file_content, (bytes, bytearray, memoryview, mmap.mmap)):
+        return str(file_content, "utf-8", "ignore")   # decodes straight from the buffer
+    return _as_bytes(file_content).decode("utf-8", errors="ignore")
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# PDF – page-wise streaming extraction
+# ────────────────────────────────────────────────────────────────────────────
+def _pdf_source(file_content: FileContent) -> PdfSource:
+    """Path of a mapped file, else the buffer itself (bytes/bytearray are not copied)."""
+    path = getattr(file_content, "path", None)
+    if path:
+        return path
+    if isinstance(file_content, bytearray):
+        return file_content
+    return _as_bytes(file_content)
+
+
+def _open_pdf(source: PdfSource):
+    import fitz
+
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(os.fspath(source), filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+# One open document per worker process (set by the pool initializer)
+_worker_pdf = None
+
+
+def _init_pdf_worker(source: PdfSource) -> None:
+    """Pool initializer: open the PDF once per worker – a path is cheap to send, bytes go once."""
+    global _worker_pdf
+    _worker_pdf = _open_pdf(source)
+
+
+def _extract_pdf_range(start: int, stop: int) -> list[str]:
+    """Worker: return the text of pages ``start … stop-1`` (runs in a child process)."""
+    return [_worker_pdf[i].get_text("text") for i in range(start, stop)]
+
+
+def _iter_pdf_parallel(source: PdfSource, page_count: int, workers: int) -> Iterator[str]:
+    """
+    Shard the page range across *workers* processes and yield pages in order.
+
+    Only ``workers`` shards are in flight at any time, so a consumer that stops
+    early (budget reached) leaves the remaining pages unparsed.
+    """
+    shards = [
+        (start, min(start + PDF_SHARD_PAGES, page_count))
+        for start in range(0, page_count, PDF_SHARD_PAGES)
+    ]
+    if isinstance(source, bytearray):
+        source = bytes(source)              # pickled once per worker, not per shard
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker, initargs=(source,)) as pool:
+        pending = [
+            pool.submit(_extract_pdf_range, start, stop)
+            for start, stop in shards[:workers]
+        ]
+        next_shard = len(pending)
+        try:
+            while pending:
+                pages = pending.pop(0).result()
+                if next_shard < len(shards):
+                    start, stop = shards[next_shard]
+                    pending.append(pool.submit(_extract_pdf_range, start, stop))
+                    next_shard += 1
+                yield from pages
+        finally:
+            # Early stop (generator closed) → drop everything not yet running
+            for fut in pending:
+                fut.cancel()
+
+
+def iter_pdf_pages(
+    source: PdfSource,
+    *,
+    max_chars: int | None = None,
+    max_tokens: int | None = None,
+    workers: int | None = None,
+) -> Iterator[str]:
+    """
+    Yield the text of each PDF page, in page order.
+
+    *source* is a file path (large files: nothing is read into the heap, and
+    workers reopen the file themselves) or the PDF's bytes.
+    - Documents with ``PDF_PARALLEL_MIN_PAGES`` pages or more are sharded by page
+      range across a process pool (``workers`` defaults to all cores).
+    - Iteration stops as soon as *max_chars* characters or *max_tokens* tokens
+      (≈ chars / 4, see ``estimated_token_count``) have been yielded; the page
+      that crosses the budget is still yielded in full.
 
+    Raises ValueError if the PDF cannot be opened.
+    """
     try:
-        # Use textract for simplicity, it supports pdf, docx, txt, etc.
-        text = textract.process(file_bytes, extension=ext)
-        # textract.process can accept bytes and extension to figure out the parser
-        # However, if the above doesn't work as intended, an alternative is writing file_bytes to a temp file and using textract on it.
+        pdf_doc = _open_pdf(source)
     except Exception as e:
-        print(f"extract_text_from_file: textract failed for {filename} - {e}")
-        # Fallback manual handling for basic types
+        raise ValueError(f"Error reading PDF: {e}")
+
+    char_budget = max_chars
+    if max_tokens is not None:
+        token_chars = max_tokens * 4
+        char_budget = token_chars if char_budget is None else min(char_budget, token_chars)
+
+    workers = workers or os.cpu_count() or 1
+    with pdf_doc:
+        if pdf_doc.page_count >= PDF_PARALLEL_MIN_PAGES and workers > 1:
+            pages = _iter_pdf_parallel(source, pdf_doc.page_count, workers)
+        else:
+            # 'text' preserves layout better than 'blocks'
+            pages = (page.get_text("text") for page in pdf_doc)
+
+        seen = 0
         try:
-            if ext == "txt":
-                text = file_bytes  # raw bytes of text file (will decode below)
-            elif ext == "pdf":
-                # Fallback: try PyMuPDF
-                import fitz  # PyMuPDF
-                doc = fitz.open(stream=file_bytes, filetype="pdf")
-                extracted = []
-                for page in doc:
-                    extracted.append(page.get_text())
-                text = "\n".join(extracted).encode('utf-8')
-            elif ext in ("doc", "docx", "rtf", "odt"):
-                # Fallback: try to use python-docx for docx, or treat others as text
-                if ext in ("docx", "odt"):
-                    from io import BytesIO
-                    from docx import Document
-                    doc = Document(BytesIO(file_bytes))
-                    full_text = [para.text for para in doc.paragraphs]
-                    text = "\n".join(full_text).encode('utf-8')
-                else:
-                    # .doc or .rtf – not easily handled without external tools. Return empty.
-                    text = b""
+            for page_text in pages:
+                yield page_text
+                seen += len(page_text)
+                if char_budget is not None and seen >= char_budget:
+                    return
+        finally:
+            pages.close()
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# DOCX – streaming OOXML extraction (no python-docx object model)
+# ────────────────────────────────────────────────────────────────────────────
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+
+def _iter_docx_part(stream) -> Iterator[str]:
+    """
+    Incrementally parse one WordprocessingML part and yield text blocks.
+
+    Paragraphs are yielded as they close; a table row is yielded as one block
+    with its cells joined by `` | `` (cell paragraphs joined by a space), which
+    keeps label/value tables such as "Gehalt | 60.000 EUR" on one line.
+    Text-box paragraphs (``w:txbxContent``) surface as regular paragraphs; the
+    VML duplicate inside ``mc:Fallback`` is skipped.
+    """
+    from xml.etree.ElementTree import iterparse
+
+    paragraphs: list[list[str]] = []   # open w:p buffers (text boxes nest them)
+    rows: list[list[str]] = []         # open w:tr cell lists
+    cells: list[list[str]] = []        # open w:tc paragraph lists
+    open_elems = []                    # element stack, used to prune finished subtrees
+    fallback_depth = 0
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            open_elems.append(elem)
+            if tag == _MC_FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == _W + "p":
+                paragraphs.append([])
+            elif tag == _W + "tr":
+                rows.append([])
+            elif tag == _W + "tc":
+                cells.append([])
+            continue
+
+        # ---- end events
+        open_elems.pop()
+        if tag == _MC_FALLBACK:
+            fallback_depth -= 1
+        elif not fallback_depth:
+            yield from _docx_end(tag, elem, paragraphs, rows, cells)
+        # Text is consumed on close, so finished children can be dropped:
+        # memory stays proportional to nesting depth, not document size.
+        if open_elems:
+            open_elems[-1].clear()
+
+
+def _docx_end(tag, elem, paragraphs, rows, cells) -> Iterator[str]:
+    """Handle one closing WordprocessingML element (see ``_iter_docx_part``)."""
+    if tag == _W + "t":
+        if paragraphs and elem.text:
+            paragraphs[-1].append(elem.text)
+    elif tag == _W + "tab":
+        if paragraphs:
+            paragraphs[-1].append("\t")
+    elif tag in (_W + "br", _W + "cr"):
+        if paragraphs:
+            paragraphs[-1].append("\n")
+    elif tag == _W + "p":
+        text = "".join(paragraphs.pop()).strip()
+        if text:
+            if cells:
+                cells[-1].append(text)
             else:
-                text = b""
-        except Exception as e2:
-            print(f"extract_text_from_file: fallback extraction failed - {e2}")
-            text = b""
+                yield text
+    elif tag == _W + "tc":
+        cell_text = " ".join(cells.pop())
+        if rows:
+            rows[-1].append(cell_text)
+    elif tag == _W + "tr":
+        row_text = " | ".join(c for c in rows.pop() if c)
+        if row_text:
+            if cells:                     # nested table → belongs to the outer cell
+                cells[-1].append(row_text)
+            else:
+                yield row_text
 
-    # Decode text bytes to string
-    if isinstance(text, bytes):
-        try:
-            text_str = text.decode('utf-8', errors='ignore')
-        except Exception as e:
-            print(f"extract_text_from_file: UTF-8 decode error - {e}")
-            text_str = text.decode('latin-1', errors='ignore')  # fallback decode
-    else:
-        # If textract returned a string already
-        text_str = str(text)
-
-    # Clean the text: remove excessive whitespace
-    text_str = text_str.strip()
-    # If text is extremely long, consider truncating or summarizing here (but main summarization is handled upstream).
-    return text_str[:10000]  # Return at most 10000 characters to limit size for processing
-=======
-from __future__ import annotations
-from src.utils.tool_registry import tool
 
+def iter_docx_blocks(file_obj) -> Iterator[str]:
+    """
+    Yield text blocks from a DOCX file-like object in reading order:
+    header parts, the document body (paragraphs, table rows, text boxes),
+    then footer parts. Repeated header/footer lines are emitted once.
+
+    Raises ValueError if the file is not a valid DOCX package.
+    """
+    import zipfile
+
+    try:
+        package = zipfile.ZipFile(file_obj)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Error reading DOCX: {e}")
+
+    with package:
+        names = package.namelist()
+        if "word/document.xml" not in names:
+            raise ValueError("Error reading DOCX: word/document.xml missing")
+        headers = sorted(n for n in names if n.startswith("word/header") and n.endswith(".xml"))
+        footers = sorted(n for n in names if n.startswith("word/footer") and n.endswith(".xml"))
+
+        seen: set[str] = set()
+        for part in headers:
+            with package.open(part) as stream:
+                for block in _iter_docx_part(stream):
+                    if block not in seen:
+                        seen.add(block)
+                        yield block
+        with package.open("word/document.xml") as stream:
+            yield from _iter_docx_part(stream)
+        for part in footers:
+            with package.open(part) as stream:
+                for block in _iter_docx_part(stream):
+                    if block not in seen:
+                        seen.add(block)
+                        yield block
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Public tool
+# ────────────────────────────────────────────────────────────────────────────
 @tool
-def extract_text_from_file(file_content: bytes, filename: str) -> str:
+def extract_text_from_file(
+    file_content: FileContent,
+    filename: str,
+    *,
+    max_chars: int | None = None,
+    workers: int | None = None,
+) -> str:
     """
     Extracts text from an uploaded file (PDF, DOCX, or TXT) with improved handling:
-    - Uses PyMuPDF (fitz) for PDFs.
-    - Wraps DOCX bytes in a BytesIO for python-docx to parse reliably.
+    - Streams PDFs page by page via ``iter_pdf_pages`` (parallel for big files).
+    - Streams DOCX via ``iter_docx_blocks`` (tables, headers/footers, text boxes).
     - Maintains paragraph separation rather than merging everything into one line.
     - Basic text cleanup to remove excessive whitespace.
 
+    *file_content* may be bytes, a memoryview/mmap, or a binary file object such
+    as Streamlit's ``UploadedFile``; it is read without intermediate copies.
+    *max_chars* stops PDF extraction early once enough text has been collected.
+    *workers* caps the processes used for large PDFs (``1`` = in-process; pass
+    it from code that already runs in a worker pool).
+
     Raises ValueError if file type is not supported.
     """
-    import os
-    import fitz
-    import docx
-    from io import BytesIO
-
     ext = os.path.splitext(filename)[1].lower()
+    with span("extract.text_from_file", ext=ext) as sp:
+        cleaned_text = _extract_text(file_content, ext, max_chars, workers)
+        sp.set("chars", len(cleaned_text))
+    return cleaned_text
+
+
+def _extract_text(file_content: FileContent, ext: str, max_chars: int | None, workers: int | None) -> str:
     text = ""
 
     if ext == ".pdf":
-        # Use PyMuPDF to extract text from PDF
         try:
-            with fitz.open(stream=file_content, filetype="pdf") as pdf_doc:
-                pages_text = []
-                for page in pdf_doc:
-                    pages_text.append(page.get_text("text"))  # 'text' preserves layout better than 'blocks'
-                text = "\n\n".join(pages_text)
+            text = "\n\n".join(iter_pdf_pages(_pdf_source(file_content), max_chars=max_chars, workers=workers))
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Error reading PDF: {e}")
 
     elif ext == ".docx":
-        # Wrap bytes in a BytesIO for python-docx
+        # Stream the OOXML parts directly – includes tables, headers and text boxes
         try:
-            file_obj = BytesIO(file_content)
-            document = docx.Document(file_obj)
-            paragraphs = [p.text for p in document.paragraphs if p.text.strip()]
-            text = "\n\n".join(paragraphs)
+            text = "\n\n".join(iter_docx_blocks(_as_stream(file_content)))
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Error reading DOCX: {e}")
 
     elif ext == ".txt":
         # Decode as UTF-8 (ignore errors if not valid UTF-8)
-        text = file_content.decode("utf-8", errors="ignore")
+        text = _decode_text(file_content)
 
     else:
         # Unsupported file type
@@ -128,11 +420,9 @@ def extract_text_from_file(file_content: bytes, filename: str) -> str:
     # --- Text Cleanup ---
     # 1) Convert all kinds of newlines to standard \n
     # 2) Strip extra trailing spaces on each line
-    lines = [line.strip() for line in text.splitlines()]
+    lines = (line.strip() for line in text.splitlines())
     # 3) Remove empty lines that might result from repeated \n\n
-    lines = [ln for ln in lines if ln]
     # Rejoin with one blank line between paragraphs
-    cleaned_text = "\n\n".join(lines)
+    cleaned_text = "\n\n".join(ln for ln in lines if ln)
 
     return cleaned_text
->>>>>>> 07e4a6fe9ee73e2827c50212620e30ba2b339372
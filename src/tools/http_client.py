@@ -0,0 +1,424 @@
+"""
+HTTP fetch layer
+----------------
+
+One place for every outbound GET made by the scraping tools:
+
+* a process-wide ``requests.Session`` with a pooled ``HTTPAdapter`` (keep-alive,
+  connection reuse across wizard reruns and worker calls);
+* an on-disk response cache that honours ``Cache-Control`` (``max-age``,
+  ``no-cache``, ``no-store``), ``Expires`` and revalidates with
+  ``ETag`` / ``Last-Modified`` (a ``304`` costs one tiny round trip, a fresh
+  entry costs none);
+* a ``FetchResult`` that callers hand on to parsers, so a page that is needed
+  by several tools is downloaded exactly once;
+* bounded downloads – bodies are streamed in chunks, aborted above a size cap
+  or past a wall-clock deadline, and spooled to a temp file above a threshold,
+  so a pasted link to a huge PDF or an endless stream cannot exhaust a worker;
+* content sniffing – ``FetchResult.kind`` trusts magic bytes over the
+  (often wrong) ``Content-Type`` header;
+* ``open_stream`` for callers that only need the start of a body and stop
+  reading early.
+
+Environment variables:
+
+    VACALYSER_HTTP_CACHE_DIR        cache directory (default ~/.cache/vacalyser/http)
+    VACALYSER_HTTP_CACHE_MAX_BYTES  largest body written to the cache (default 5 MB)
+    VACALYSER_HTTP_CACHE=0          disable the disk cache
+    VACALYSER_HTTP_MAX_BYTES        largest body downloaded at all (default 25 MB)
+    VACALYSER_HTTP_DEADLINE         seconds allowed for one whole download (default 30)
+    VACALYSER_HTTP_SPOOL_BYTES      bodies above this go to a temp file (default 2 MB)
+"""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_USER_AGENT = "Vacalyser/1.0"
+_CACHE_ENABLED = os.getenv("VACALYSER_HTTP_CACHE", "1") != "0"
+_CACHE_DIR = Path(os.getenv("VACALYSER_HTTP_CACHE_DIR", Path.home() / ".cache" / "vacalyser" / "http"))
+_CACHE_MAX_BYTES = int(os.getenv("VACALYSER_HTTP_CACHE_MAX_BYTES", str(5 * 1024 * 1024)))
+MAX_DOWNLOAD_BYTES = int(os.getenv("VACALYSER_HTTP_MAX_BYTES", str(25 * 1024 * 1024)))
+DOWNLOAD_DEADLINE = float(os.getenv("VACALYSER_HTTP_DEADLINE", "30"))
+SPOOL_MIN_BYTES = int(os.getenv("VACALYSER_HTTP_SPOOL_BYTES", str(2 * 1024 * 1024)))
+_CHUNK_BYTES = 64 * 1024
+
+# Response headers persisted with a cache entry
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires", "date")
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+_CHARSET_RE = re.compile(r"charset=[\"']?([\w-]+)", re.IGNORECASE)
+
+
+class DownloadTooLarge(requests.RequestException):
+    """The body exceeded the configured maximum size."""
+
+
+class DownloadTimeout(requests.Timeout):
+    """The whole download took longer than its deadline."""
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 1  Pooled session (one per process)
+# ────────────────────────────────────────────────────────────────────────────
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared, connection-pooling session (created lazily)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=1)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = _USER_AGENT
+                _session = session
+    return _session
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 2  Result object
+# ────────────────────────────────────────────────────────────────────────────
+def response_charset(content_type: str) -> str:
+    """Charset declared in a ``Content-Type`` header, UTF-8 if none/unknown."""
+    m = _CHARSET_RE.search(content_type or "")
+    if m:
+        try:
+            return codecs.lookup(m.group(1)).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def sniff_kind(head: bytes, content_type: str = "") -> str:
+    """
+    Classify a body by its first bytes, using *content_type* only as a tie-breaker.
+
+    Returns ``"pdf"``, ``"docx"``, ``"zip"``, ``"html"``, ``"text"`` or ``"binary"``.
+    """
+    content_type = (content_type or "").lower()
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        # The first zip entries of a DOCX are [Content_Types].xml / word/…
+        if b"word/" in head or "officedocument" in content_type or "msword" in content_type:
+            return "docx"
+        return "zip"
+    sample = head[:1024].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if sample.startswith((b"<!doctype html", b"<html", b"<head", b"<body", b"<meta", b"<title")):
+        return "html"
+    if b"\x00" in head[:1024]:
+        return "binary"
+    if "html" in content_type and b"<" in sample:
+        return "html"
+    return "text"
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    from_cache: bool = False
+    # Set instead of ``content`` when the body was spooled to a temp file
+    spool_path: Optional[str] = None
+    _text: Optional[str] = field(default=None, repr=False)
+    _kind: Optional[str] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        # The temp file goes away with the result, even if close() is never called
+        self._cleanup = weakref.finalize(self, _unlink, self.spool_path) if self.spool_path else None
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "").lower()
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.spool_path) if self.spool_path else len(self.content)
+
+    @property
+    def kind(self) -> str:
+        """Sniffed body type – see ``sniff_kind``; computed once."""
+        if self._kind is None:
+            if self.spool_path:
+                with open(self.spool_path, "rb") as fh:
+                    head = fh.read(4096)
+            else:
+                head = self.content[:4096]
+            self._kind = sniff_kind(head, self.content_type)
+        return self._kind
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the declared charset (UTF-8 otherwise); computed once."""
+        if self._text is None:
+            body = Path(self.spool_path).read_bytes() if self.spool_path else self.content
+            self._text = body.decode(response_charset(self.content_type), errors="replace")
+        return self._text
+
+    def close(self) -> None:
+        """Delete the spool file now instead of at garbage collection."""
+        if self._cleanup is not None:
+            self._cleanup()
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 3  Disk cache
+# ────────────────────────────────────────────────────────────────────────────
+def _cache_paths(url: str) -> tuple[Path, Path]:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = _CACHE_DIR / digest[:2] / digest
+    return base.with_suffix(".json"), base.with_suffix(".body")
+
+
+def _freshness_deadline(headers: Dict[str, str], now: float) -> Optional[float]:
+    """
+    Epoch seconds until which a response may be served without revalidation.
+    Returns None if it must not be stored at all (``no-store``).
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "private" in cache_control:
+        return None                                  # shared cache: never keep per-user pages
+    if "no-cache" in cache_control:
+        return now                                   # store, but always revalidate
+    m = _MAX_AGE_RE.search(cache_control)
+    if m:
+        return now + int(m.group(1))
+    if headers.get("expires"):
+        try:
+            return parsedate_to_datetime(headers["expires"]).timestamp()
+        except (TypeError, ValueError):
+            return now
+    return now                                       # validators only → revalidate
+
+
+def _load_cached(url: str) -> Optional[tuple[dict, bytes]]:
+    meta_path, body_path = _cache_paths(url)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return meta, body_path.read_bytes()
+    except (OSError, ValueError):
+        return None
+
+
+def _store(url: str, resp: requests.Response, content: bytes, fresh_until: float) -> None:
+    meta_path, body_path = _cache_paths(url)
+    meta = {
+        "url": resp.url,
+        "status_code": resp.status_code,
+        "headers": {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers},
+        "fresh_until": fresh_until,
+    }
+    try:
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = body_path.with_suffix(".tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, body_path)                   # atomic – readers never see half a body
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    except OSError as e:
+        print(f"http_client: cache write failed for {url} - {e}")
+
+
+def _touch(url: str, meta: dict, fresh_until: float) -> None:
+    meta["fresh_until"] = fresh_until
+    try:
+        _cache_paths(url)[0].write_text(json.dumps(meta), encoding="utf-8")
+    except OSError:
+        pass
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 4  Bounded body read
+# ────────────────────────────────────────────────────────────────────────────
+def _abort(resp: requests.Response) -> None:
+    """Unblock a read stuck on a slow server: shut its socket down, then close."""
+    sock = getattr(getattr(resp.raw, "_connection", None), "sock", None)
+    if sock is None:                                # http.client hands the socket to the response
+        fp = getattr(getattr(resp.raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(fp, "raw", None), "_sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)         # close() alone does not wake a blocked recv
+        except OSError:
+            pass
+    resp.close()
+
+
+def _read_body(resp: requests.Response, url: str, max_bytes: int, deadline: float) -> tuple[bytes, Optional[str]]:
+    """
+    Drain a streamed response within *max_bytes* and *deadline* seconds.
+
+    Returns ``(content, None)`` for small bodies and ``(b"", spool_path)`` once
+    the body outgrew ``SPOOL_MIN_BYTES`` – at most one chunk plus the spool
+    threshold is ever held in memory. A watchdog aborts the connection when
+    the deadline passes, so a server that drips bytes slower than one chunk
+    per deadline is cut off too.
+    """
+    declared = resp.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise DownloadTooLarge(f"{url}: {declared} bytes exceeds the {max_bytes} byte limit")
+
+    expired = threading.Event()
+
+    def expire() -> None:
+        expired.set()
+        _abort(resp)
+
+    watchdog = threading.Timer(deadline, expire)
+    watchdog.daemon = True
+    buffer = bytearray()
+    spool = None
+    read = 0
+    watchdog.start()
+    try:
+        for chunk in resp.iter_content(_CHUNK_BYTES):
+            read += len(chunk)
+            if read > max_bytes:
+                raise DownloadTooLarge(f"{url}: body exceeds the {max_bytes} byte limit")
+            if expired.is_set():
+                break
+            if spool is not None:
+                spool.write(chunk)
+                continue
+            buffer += chunk
+            if len(buffer) > SPOOL_MIN_BYTES:
+                spool = tempfile.NamedTemporaryFile(prefix="vacalyser-", suffix=".body", delete=False)
+                spool.write(buffer)
+                buffer = bytearray()
+        if expired.is_set():                # the abort may also look like a clean end of body
+            raise DownloadTimeout(f"{url}: download exceeded {deadline:.0f}s")
+    except BaseException as e:
+        if spool is not None:
+            spool.close()
+            _unlink(spool.name)
+        if expired.is_set() and not isinstance(e, (DownloadTimeout, DownloadTooLarge)):
+            raise DownloadTimeout(f"{url}: download exceeded {deadline:.0f}s") from e
+        raise
+    finally:
+        watchdog.cancel()
+
+    if spool is None:
+        return bytes(buffer), None
+    spool.close()
+    return b"", spool.name
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 5  Public API
+# ────────────────────────────────────────────────────────────────────────────
+def fetch_cached(url: str) -> Optional[FetchResult]:
+    """Return a still-fresh cache entry for *url* without touching the network."""
+    cached = _load_cached(url) if _CACHE_ENABLED else None
+    if not cached:
+        return None
+    meta, body = cached
+    if meta.get("fresh_until", 0) <= time.time():
+        return None
+    headers = {k.lower(): v for k, v in meta["headers"].items()}
+    return FetchResult(meta["url"], meta["status_code"], headers, body, from_cache=True)
+
+
+@contextmanager
+def open_stream(url: str, *, timeout: float = 10) -> Iterator[requests.Response]:
+    """
+    GET *url* with ``stream=True`` through the pooled session (no cache).
+
+    The body is read lazily via ``iter_content``; leaving the block closes the
+    response, so a caller that stops early never downloads the rest.
+    Raises ``requests.RequestException`` (incl. ``HTTPError`` for 4xx/5xx).
+    """
+    resp = get_session().get(url, timeout=timeout, stream=True)
+    try:
+        resp.raise_for_status()
+        yield resp
+    finally:
+        resp.close()
+
+
+def fetch(
+    url: str,
+    *,
+    timeout: float = 10,
+    use_cache: bool = True,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> FetchResult:
+    """
+    GET *url* through the pooled session and the disk cache.
+
+    The body is streamed and capped at *max_bytes* (``VACALYSER_HTTP_MAX_BYTES``)
+    and *deadline* seconds for the whole transfer (``VACALYSER_HTTP_DEADLINE``);
+    *timeout* still applies to connecting and to each socket read. Large bodies
+    are spooled to a temp file (``FetchResult.spool_path``).
+
+    Raises ``requests.RequestException`` (incl. ``HTTPError`` for 4xx/5xx,
+    ``DownloadTooLarge`` and ``DownloadTimeout``).
+    """
+    max_bytes = MAX_DOWNLOAD_BYTES if max_bytes is None else max_bytes
+    deadline = DOWNLOAD_DEADLINE if deadline is None else deadline
+    now = time.time()
+    cached = _load_cached(url) if (use_cache and _CACHE_ENABLED) else None
+    req_headers: Dict[str, str] = {}
+
+    if cached:
+        meta, body = cached
+        headers = {k.lower(): v for k, v in meta["headers"].items()}
+        if meta.get("fresh_until", 0) > now:
+            return FetchResult(meta["url"], meta["status_code"], headers, body, from_cache=True)
+        if "etag" in headers:
+            req_headers["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            req_headers["If-Modified-Since"] = headers["last-modified"]
+
+    with get_session().get(url, timeout=timeout, headers=req_headers, stream=True) as resp:
+        if cached and resp.status_code == 304:
+            meta, body = cached
+            headers = {k.lower(): v for k, v in meta["headers"].items()}
+            headers.update({k.lower(): v for k, v in resp.headers.items() if k.lower() in _KEPT_HEADERS})
+            fresh_until = _freshness_deadline(headers, now)
+            if fresh_until is not None:
+                meta["headers"] = headers
+                _touch(url, meta, fresh_until)
+            return FetchResult(meta["url"], meta["status_code"], headers, body, from_cache=True)
+
+        resp.raise_for_status()
+        content, spool_path = _read_body(resp, url, max_bytes, deadline)
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+
+        if (use_cache and _CACHE_ENABLED and resp.status_code == 200
+                and spool_path is None and len(content) <= _CACHE_MAX_BYTES):
+            fresh_until = _freshness_deadline(headers, now)
+            has_validator = "etag" in headers or "last-modified" in headers
+            if fresh_until is not None and (fresh_until > now or has_validator):
+                _store(url, resp, content, fresh_until)
+
+        return FetchResult(resp.url, resp.status_code, headers, content, spool_path=spool_path)
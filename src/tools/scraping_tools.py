@@ -1,32 +1,113 @@
-import requests
+import codecs
+from html.parser import HTMLParser
+
 from bs4 import BeautifulSoup
 
-def scrape_company_site(url: str) -> dict:
+from src.tools.file_tools import extract_text_from_file, open_file_buffer
+from src.tools.http_client import fetch, fetch_cached, open_stream, response_charset
+from src.utils.main_content import extract_main_content
+from src.utils.tracing import traced
+
+# Streaming fast path: bytes per read and the most we read before giving up
+_STREAM_CHUNK = 16 * 1024
+_STREAM_MAX_BYTES = 512 * 1024
+# Tags that may appear in <head>; any other start tag implies the body has begun
+_HEAD_TAGS = {"html", "head", "title", "meta", "link", "style", "script", "base", "noscript", "template"}
+
+
+class _HeadInfoParser(HTMLParser):
     """
-    Fetch basic company info from a website URL.
-    Returns a dict with 'title' and 'description' of the page, if found.
+    Incremental title / meta-description reader.
+
+    Sets ``done`` once nothing more can be learned: the head ended (``</head>``,
+    ``<body>`` or the first start tag that cannot be in a head – pages often
+    omit both) and a meta description exists, or – without one – the first
+    non-empty ``<p>`` has been read.
     """
-    result = {"title": None, "description": None}
-    if not url:
-        return result
-    try:
-        # Ensure URL has scheme
-        if not url.startswith("http"):
-            url = "https://" + url
-        # Make request with timeout
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-    except Exception as e:
-        # In case of any request error, just return empty info
-        print(f"scrape_company_site: Failed to fetch {url} - {e}")
-        return result
 
-    # Parse HTML content
-    try:
-        soup = BeautifulSoup(resp.text, "html.parser")
-    except Exception as e:
-        print(f"scrape_company_site: HTML parse error for {url} - {e}")
-        return result
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title: str | None = None
+        self.description: str | None = None
+        self.first_paragraph: str | None = None
+        self.done = False
+        self._head_closed = False
+        self._title_parts: list[str] | None = None
+        self._p_parts: list[str] | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if not self._head_closed and tag not in _HEAD_TAGS:
+            self._close_head()
+        if tag == "title" and self.title is None:
+            self._title_parts = []
+        elif tag == "meta" and self.description is None:
+            attrs = dict(attrs)
+            if (attrs.get("name") or "").lower() == "description" and (attrs.get("content") or "").strip():
+                self.description = attrs["content"].strip()
+        elif tag == "p" and self._head_closed and self.first_paragraph is None:
+            self._p_parts = []
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._p_parts is not None:
+            self._p_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip() or None
+            self._title_parts = None
+        elif tag == "head":
+            self._close_head()
+        elif tag == "p" and self._p_parts is not None:
+            text = " ".join("".join(self._p_parts).split())
+            self._p_parts = None
+            if text:
+                self.first_paragraph = text
+                self.done = True
+
+    def _close_head(self) -> None:
+        self._head_closed = True
+        if self.description:
+            self.done = True
+
+
+def _shorten(text: str | None, limit: int = 200) -> str | None:
+    """Limit first-paragraph fallbacks to avoid very long text."""
+    if not text:
+        return None
+    return (text[:limit] + "...") if len(text) > limit else text
+
+
+def _scan_html(html: str) -> _HeadInfoParser:
+    """Feed an already-downloaded page in slices, stopping as soon as possible."""
+    parser = _HeadInfoParser()
+    for i in range(0, len(html), _STREAM_CHUNK):
+        parser.feed(html[i:i + _STREAM_CHUNK])
+        if parser.done:
+            break
+    return parser
+
+
+def _scan_stream(url: str, timeout: float) -> _HeadInfoParser:
+    """Stream *url* into the parser; the connection is dropped once it is done."""
+    parser = _HeadInfoParser()
+    with open_stream(url, timeout=timeout) as resp:
+        charset = response_charset(resp.headers.get("content-type", ""))
+        decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        read = 0
+        for chunk in resp.iter_content(_STREAM_CHUNK):
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done or read >= _STREAM_MAX_BYTES:
+                break
+    return parser
+
+
+def _parse_with_soup(html: str) -> dict:
+    """Full BeautifulSoup parse – the fallback when the streaming parser fails or finds nothing."""
+    soup = BeautifulSoup(html, "html.parser")
+    result = {"title": None, "description": None}
 
     # Extract page title
     title_tag = soup.find("title")
@@ -45,13 +126,98 @@ def scrape_company_site(url: str) -> dict:
     if not result["description"]:
         p_tag = soup.find("p")
         if p_tag:
-            text = p_tag.get_text(" ", strip=True)
-            # Limit length to avoid very long text
-            if text:
-                result["description"] = (text[:200] + "...") if len(text) > 200 else text
+            result["description"] = _shorten(p_tag.get_text(" ", strip=True))
+    return result
+
+
+@traced("scrape.company_site")
+def scrape_company_site(url: str, html: str | None = None) -> dict:
+    """
+    Fetch basic company info from a website URL.
+    Returns a dict with 'title' and 'description' of the page, if found.
+    Pass *html* when the page body was already downloaded (parse-once handoff);
+    the URL is then not fetched again.
+
+    The page is streamed through an incremental parser that stops at
+    ``</head>`` (or at the first paragraph when there is no meta description),
+    so usually only the first few KB are downloaded. A full BeautifulSoup parse
+    of the whole page is used only if the incremental parser fails or finds
+    neither a description nor a paragraph.
+    """
+    result = {"title": None, "description": None}
+    if not url and html is None:
+        return result
+    if html is None:
+        # Ensure URL has scheme
+        if not url.startswith("http"):
+            url = "https://" + url
+        cached = fetch_cached(url)
+        if cached is not None:
+            html = cached.text
+
+    try:
+        if html is not None:
+            parser = _scan_html(html)
+        else:
+            try:
+                parser = _scan_stream(url, timeout=5)
+            except Exception as e:
+                # In case of any request error, just return empty info
+                print(f"scrape_company_site: Failed to fetch {url} - {e}")
+                return result
+        result["title"] = parser.title
+        result["description"] = parser.description or _shorten(parser.first_paragraph)
+    except Exception as e:
+        # Incremental parse failed – fall back to a full download + parse
+        print(f"scrape_company_site: streaming parse failed for {url}, using full parse - {e}")
+
+    if not result["description"]:
+        try:
+            if html is None:
+                html = fetch(url, timeout=5).text
+            soup_result = _parse_with_soup(html)
+        except Exception as e:
+            print(f"scrape_company_site: HTML parse error for {url} - {e}")
+            return result
+        result["title"] = result["title"] or soup_result["title"]
+        result["description"] = soup_result["description"]
 
-    # Truncate overly long description for safety (shouldn't normally happen with above logic)
+    # Truncate overly long description for safety
     if result["description"] and len(result["description"]) > 300:
         result["description"] = result["description"][:300] + "..."
 
     return result
+
+
+def fetch_url_text(url: str, timeout: int = 10) -> str:
+    """
+    Fetch readable text from a job-ad URL (Streamlit-free, usable from workers).
+    The URL is downloaded once (or served from the HTTP cache), within the size
+    and time limits of http_client.fetch, and the body is handed to the parser
+    matching its sniffed type (magic bytes first, Content-Type second):
+    - For HTML pages: the ad's main content (boilerplate stripped, headings and
+      lists kept) via extract_main_content; title + description via
+      scrape_company_site(url, html=...) if no main content is found.
+    - For PDF or docx: extract_text_from_file on the downloaded body (memory-
+      mapped when it was spooled to disk).
+    - Plain text: returned as is; other binary bodies yield "".
+    Raises requests.RequestException if the download fails or exceeds its limits.
+    """
+    page = fetch(url, timeout=timeout)
+    try:
+        kind = page.kind
+        if kind == "html":
+            text = extract_main_content(page.text)
+            if text:
+                return text
+            info = scrape_company_site(page.url, html=page.text)
+            return "\n".join(v for v in (info.get("title"), info.get("description")) if v)
+        if kind in ("pdf", "docx"):
+            body = open_file_buffer(page.spool_path) if page.spool_path else page.content
+            return extract_text_from_file(body, f"file.{kind}")
+        if kind == "text":
+            return page.text
+        print(f"fetch_url_text: unsupported content at {url} ({page.content_type or kind})")
+        return ""
+    finally:
+        page.close()
@@ -0,0 +1,198 @@
+"""
+Company-site crawler
+--------------------
+
+``scrape_company_site`` only sees the homepage. ``crawl_company_site`` builds
+on it: it fetches the homepage, picks a few candidate pages from its links
+(about / careers / benefits, German and English), fetches those concurrently
+with a per-host connection limit, and returns whatever was collected when the
+global deadline hits – a slow page never delays the result past *deadline*.
+
+Typical usage
+-------------
+>>> from src.tools.site_crawler import candidate_pages, crawl_company_site
+>>> candidate_pages("https://example.com", '<a href="/ueber-uns">Über uns</a>'
+...                 '<a href="/dienstleistungen">Dienstleistungen</a><a href="/jobs">Karriere</a>')
+{'about': 'https://example.com/ueber-uns', 'careers': 'https://example.com/jobs'}
+>>> info = crawl_company_site("https://example.com", deadline=4)     # doctest: +SKIP
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin, urlparse
+
+from src.tools.http_client import fetch
+from src.tools.scraping_tools import scrape_company_site
+
+# Category → hints for the link. A hint must be a whole path segment
+# (/de/karriere/, not /bestellen or /kultur-events) or whole words of the
+# link text, with "-" standing for the space ("ueber-uns" ~ "Über uns").
+PAGE_HINTS: Dict[str, Tuple[str, ...]] = {
+    "about": ("about", "ueber-uns", "über-uns", "uber-uns", "unternehmen", "company", "who-we-are"),
+    "careers": ("karriere", "career", "careers", "jobs", "stellen", "stellenangebote", "join-us"),
+    "benefits": ("benefits", "vorteile", "leistungen", "culture", "kultur", "arbeiten-bei", "why-us"),
+}
+_HINT_RES = {
+    category: re.compile(r"(?:^|-)(?:%s)(?:-|$)" % "|".join(map(re.escape, hints)))
+    for category, hints in PAGE_HINTS.items()
+}
+_WORD_RE = re.compile(r"[^\W_]+")
+_EXTENSION_RE = re.compile(r"\.(?:html?|php|aspx?|jsp)$")
+
+# Dedicated pool for the blocking requests calls. Unlike the loop's default
+# executor it is not joined by asyncio.run(), so a request still running at the
+# deadline cannot hold up the result.
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="site-crawler")
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Link discovery
+# ────────────────────────────────────────────────────────────────────────────
+class _LinkCollector(HTMLParser):
+    """Collect ``(href, link text)`` pairs – no DOM is built."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.links: List[Tuple[str, str]] = []
+        self._href: str | None = None
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._href = dict(attrs).get("href")
+            self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._href is not None:
+            self.links.append((self._href, " ".join("".join(self._text).split())))
+            self._href = None
+
+
+def _host(url: str) -> str:
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def _hint_category(path: str, text: str, skip: Dict[str, str]) -> str | None:
+    """First category not in *skip* whose hints name a path segment or the link text."""
+    segments = {_EXTENSION_RE.sub("", seg) for seg in path.lower().split("/") if seg}
+    label = "-".join(_WORD_RE.findall(text.lower()))
+    for category, hints in PAGE_HINTS.items():
+        if category not in skip and (segments.intersection(hints) or _HINT_RES[category].search(label)):
+            return category
+    return None
+
+
+def candidate_pages(base_url: str, html: str, max_pages: int = 3) -> Dict[str, str]:
+    """Return ``{category: absolute_url}`` for the best same-site link per category."""
+    parser = _LinkCollector()
+    try:
+        parser.feed(html)
+    except Exception as e:                     # malformed markup – use what we have
+        print(f"site_crawler: link parse error for {base_url} - {e}")
+
+    home_host = _host(base_url)
+    chosen: Dict[str, str] = {}
+    seen_urls = {base_url.rstrip("/")}
+    for href, text in parser.links:
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        absolute = urljoin(base_url, href).split("#", 1)[0]
+        if _host(absolute) != home_host or absolute.rstrip("/") in seen_urls:
+            continue
+        category = _hint_category(urlparse(absolute).path, text, chosen)
+        if category is not None:
+            chosen[category] = absolute
+            seen_urls.add(absolute.rstrip("/"))
+        if len(chosen) >= max_pages:
+            break
+    return chosen
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Async crawl
+# ────────────────────────────────────────────────────────────────────────────
+async def crawl_company_site_async(
+    url: str,
+    *,
+    max_pages: int = 3,
+    per_host: int = 2,
+    deadline: float = 6.0,
+) -> dict:
+    """
+    Crawl *url* and up to *max_pages* candidate pages within *deadline* seconds.
+
+    Returns ``{"url", "title", "description", "pages": {category: {...}}}``;
+    pages that did not finish in time are simply missing.
+    """
+    result: dict = {"url": url, "title": None, "description": None, "pages": {}}
+    if not url:
+        return result
+    if not url.startswith("http"):
+        url = "https://" + url
+
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + deadline
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def get(page_url: str):
+        sem = host_limits.setdefault(_host(page_url), asyncio.Semaphore(per_host))
+        async with sem:
+            remaining = max(0.5, stop_at - loop.time())
+            # requests is blocking – run it in the crawler's thread pool
+            return await loop.run_in_executor(
+                _EXECUTOR, lambda: fetch(page_url, timeout=min(5.0, remaining))
+            )
+
+    try:
+        home = await asyncio.wait_for(get(url), timeout=max(0.1, stop_at - loop.time()))
+    except Exception as e:
+        print(f"crawl_company_site: Failed to fetch {url} - {e}")
+        return result
+
+    result["url"] = home.url
+    result.update(scrape_company_site(home.url, html=home.text))
+
+    links = candidate_pages(home.url, home.text, max_pages)
+    if not links:
+        return result
+
+    tasks = {asyncio.create_task(get(link)): category for category, link in links.items()}
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, stop_at - loop.time()))
+    for task in pending:
+        task.cancel()                              # deadline hit – keep what we have
+
+    for task in done:
+        if task.exception() is not None:
+            continue
+        page = task.result()
+        info = scrape_company_site(page.url, html=page.text)
+        result["pages"][tasks[task]] = {"url": page.url, **info}
+    return result
+
+
+def crawl_company_site(url: str, **kwargs) -> dict:
+    """Synchronous wrapper around ``crawl_company_site_async`` (safe inside a running loop)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(crawl_company_site_async(url, **kwargs))
+
+    # Already inside an event loop (e.g. notebook) → run in a helper thread
+    box: dict = {}
+    worker = threading.Thread(
+        target=lambda: box.setdefault("r", asyncio.run(crawl_company_site_async(url, **kwargs)))
+    )
+    worker.start()
+    worker.join()
+    return box.get("r", {"url": url, "title": None, "description": None, "pages": {}})
@@ -0,0 +1,195 @@
+"""
+field_matcher.py – find "Label: value" lines for wizard fields in one pass.
+
+All labels (English originals plus German/English synonyms) are compiled
+**once at import** into a single regex shaped like a character trie, so a text
+position that cannot start a label is rejected after one character.
+``match_fields`` walks the text with one ``finditer`` scan instead of two
+substring searches per label.
+
+Matching is case-insensitive and tolerant of whitespace/hyphen differences
+("must have skills :" matches "Must-Have Skills:"). Accepted separators are
+``:`` and ``|`` (the latter is how DOCX table rows are flattened).
+
+Typical usage
+-------------
+>>> from src.utils.field_matcher import match_fields
+>>> match_fields("Jobtitel: Data Engineer\\nGehalt: 60.000 EUR")
+{'job_title': 'Data Engineer', 'salary_range': '60.000 EUR'}
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Tuple
+
+# --------------------------------------------------------------------------- #
+# Label table – first entry is the canonical English label used by the wizard
+# --------------------------------------------------------------------------- #
+FIELD_LABELS: Dict[str, Tuple[str, ...]] = {
+    "job_title": ("Job Title", "Position Title", "Jobtitel", "Stellenbezeichnung", "Stellentitel"),
+    "company_name": ("Company Name", "Company", "Unternehmen", "Firma", "Arbeitgeber"),
+    "brand_name": ("Brand Name", "Marke", "Markenname"),
+    "headquarters_location": ("HQ Location", "Headquarters", "Firmensitz", "Hauptsitz"),
+    "company_website": ("Company Website", "Website", "Webseite", "Homepage"),
+    "date_of_employment_start": ("Date of Employment Start", "Start Date", "Starting Date",
+                                 "Eintrittsdatum", "Startdatum", "Arbeitsbeginn", "Beginn"),
+    "job_type": ("Job Type", "Employment Type", "Anstellungsart", "Beschäftigungsart", "Arbeitszeitmodell"),
+    "contract_type": ("Contract Type", "Vertragsart", "Befristung"),
+    "job_level": ("Job Level", "Seniority", "Karrierestufe", "Erfahrungslevel"),
+    "city": ("City (Job Location)", "Job Location", "Location", "City",
+             "Arbeitsort", "Einsatzort", "Standort"),
+    "team_structure": ("Team Structure", "Teamstruktur"),
+    "role_description": ("Role Description", "Job Description", "Stellenbeschreibung", "Rollenbeschreibung"),
+    "reports_to": ("Reports To", "Reporting To", "Berichtet an", "Vorgesetzte(r)"),
+    "supervises": ("Supervises", "Führungsverantwortung für"),
+    "role_type": ("Role Type", "Rollentyp"),
+    "role_priority_projects": ("Role Priority Projects", "Priority Projects", "Prioritäre Projekte"),
+    "travel_requirements": ("Travel Requirements", "Reisebereitschaft", "Reisetätigkeit"),
+    "work_schedule": ("Work Schedule", "Working Hours", "Arbeitszeit", "Arbeitszeiten"),
+    "role_keywords": ("Role Keywords", "Keywords", "Schlagworte", "Schlüsselwörter"),
+    "decision_making_authority": ("Decision Making Authority", "Entscheidungsbefugnis"),
+    "role_performance_metrics": ("Role Performance Metrics", "Performance Metrics", "KPIs", "Erfolgskennzahlen"),
+    "task_list": ("Task List", "Tasks", "Aufgaben", "Ihre Aufgaben", "Deine Aufgaben"),
+    "key_responsibilities": ("Key Responsibilities", "Responsibilities", "Verantwortlichkeiten", "Hauptaufgaben"),
+    "technical_tasks": ("Technical Tasks", "Technische Aufgaben"),
+    "managerial_tasks": ("Managerial Tasks", "Führungsaufgaben"),
+    "administrative_tasks": ("Administrative Tasks", "Administrative Aufgaben"),
+    "customer_facing_tasks": ("Customer-Facing Tasks", "Kundenaufgaben"),
+    "internal_reporting_tasks": ("Internal Reporting Tasks", "Internes Reporting"),
+    "performance_tasks": ("Performance Tasks",),
+    "innovation_tasks": ("Innovation Tasks", "Innovationsaufgaben"),
+    "task_prioritization": ("Task Prioritization", "Priorisierung"),
+    "hard_skills": ("Hard Skills", "Fachliche Kompetenzen", "Fachkenntnisse"),
+    "soft_skills": ("Soft Skills", "Persönliche Kompetenzen", "Soziale Kompetenzen"),
+    "must_have_skills": ("Must-Have Skills", "Requirements", "Required Skills",
+                         "Anforderungen", "Ihr Profil", "Dein Profil"),
+    "nice_to_have_skills": ("Nice-to-Have Skills", "Nice to Have", "Wünschenswert", "Von Vorteil"),
+    "certifications_required": ("Certifications Required", "Certifications", "Zertifizierungen", "Zertifikate"),
+    "language_requirements": ("Language Requirements", "Languages", "Sprachkenntnisse", "Sprachen"),
+    "tool_proficiency": ("Tool Proficiency", "Tools", "Werkzeuge", "Toolkenntnisse"),
+    "domain_expertise": ("Domain Expertise", "Fachgebiet", "Domänenwissen"),
+    "leadership_competencies": ("Leadership Competencies", "Führungskompetenzen"),
+    "technical_stack": ("Technical Stack", "Tech Stack", "Technologie-Stack", "Technologien"),
+    "industry_experience": ("Industry Experience", "Branchenerfahrung", "Berufserfahrung"),
+    "analytical_skills": ("Analytical Skills", "Analytische Fähigkeiten"),
+    "communication_skills": ("Communication Skills", "Kommunikationsfähigkeit", "Kommunikationsfähigkeiten"),
+    "project_management_skills": ("Project Management Skills", "Projektmanagement"),
+    "soft_requirement_details": ("Additional Soft Requirements", "Weitere Anforderungen"),
+    "visa_sponsorship": ("Visa Sponsorship", "Visum", "Arbeitserlaubnis"),
+    "salary_range": ("Salary Range", "Salary", "Compensation", "Gehalt", "Gehaltsspanne",
+                     "Vergütung", "Jahresgehalt"),
+    "currency": ("Currency", "Währung"),
+    "pay_frequency": ("Pay Frequency", "Auszahlung", "Zahlungsintervall"),
+    "commission_structure": ("Commission Structure", "Provision", "Provisionsmodell"),
+    "bonus_scheme": ("Bonus Scheme", "Bonus", "Bonusregelung"),
+    "vacation_days": ("Vacation Days", "Holidays", "Annual Leave", "Urlaub", "Urlaubstage", "Urlaubsanspruch"),
+    "flexible_hours": ("Flexible Hours", "Gleitzeit", "Flexible Arbeitszeiten"),
+    "remote_work_policy": ("Remote Work Policy", "Remote Work", "Remote", "Homeoffice", "Home-Office", "Mobiles Arbeiten"),
+    "relocation_assistance": ("Relocation Assistance", "Relocation", "Umzugshilfe", "Umzugsunterstützung"),
+    "childcare_support": ("Childcare Support", "Kinderbetreuung"),
+    "recruitment_steps": ("Recruitment Steps", "Hiring Process", "Bewerbungsprozess", "Auswahlprozess"),
+    "recruitment_timeline": ("Recruitment Timeline", "Zeitplan"),
+    "number_of_interviews": ("Number of Interviews", "Anzahl Interviews", "Anzahl der Gespräche"),
+    "interview_format": ("Interview Format", "Interviewformat", "Gesprächsformat"),
+    "assessment_tests": ("Assessment Tests", "Assessment", "Einstellungstest"),
+    "onboarding_process_overview": ("Onboarding Process Overview", "Onboarding", "Einarbeitung"),
+    "recruitment_contact_email": ("Recruitment Contact Email", "Contact Email", "E-Mail", "Email", "Kontakt-E-Mail"),
+    "recruitment_contact_phone": ("Recruitment Contact Phone", "Contact Phone", "Phone", "Telefon", "Tel."),
+    "application_instructions": ("Application Instructions", "How to Apply", "Bewerbung", "So bewirbst du dich"),
+    "language_of_ad": ("Language of Ad", "Anzeigensprache"),
+    "translation_required": ("Translation Required", "Übersetzung erforderlich"),
+    "employer_branding_elements": ("Employer Branding Elements", "Employer Branding"),
+    "desired_publication_channels": ("Desired Publication Channels", "Publication Channels", "Veröffentlichungskanäle"),
+    "internal_job_id": ("Internal Job ID", "Job ID", "Reference", "Referenznummer", "Kennziffer", "Stellen-ID"),
+    "ad_seniority_tone": ("Ad Seniority Tone", "Tonalität"),
+    "ad_length_preference": ("Ad Length Preference", "Anzeigenlänge"),
+    "deadline_urgency": ("Deadline Urgency", "Application Deadline", "Bewerbungsfrist", "Bewerbungsschluss"),
+    "company_awards": ("Company Awards", "Awards", "Auszeichnungen"),
+    "diversity_inclusion_statement": ("Diversity & Inclusion Statement", "Diversity Statement", "Vielfalt"),
+    "legal_disclaimers": ("Legal Disclaimers", "Rechtliche Hinweise"),
+    "social_media_links": ("Social Media Links", "Social Media"),
+    "video_introduction_option": ("Video Introduction Option", "Videovorstellung"),
+    "comments_internal": ("Comments (Internal)", "Interne Kommentare", "Interne Notizen"),
+}
+
+# --------------------------------------------------------------------------- #
+# Compiled matcher (built once)
+# --------------------------------------------------------------------------- #
+_SEP_RE = re.compile(r"[\s\-]+")
+
+
+def _normalise_label(label: str) -> str:
+    """Canonical lookup form: lower-case, whitespace/hyphen runs → one space."""
+    return _SEP_RE.sub(" ", label.strip()).lower()
+
+
+def _trie_pattern(labels) -> str:
+    """
+    Compile normalised *labels* into one prefix-sharing regex (a character
+    trie), so each text position is rejected after a character or two instead
+    of being tried against every alternative in turn.
+    """
+    trie: dict = {}
+    for label in labels:
+        node = trie
+        for ch in label:
+            node = node.setdefault(ch, {})
+        node[""] = {}                     # end-of-label marker
+
+    def build(node: dict) -> str:
+        branches = []
+        optional = "" in node
+        for ch in sorted(k for k in node if k):
+            atom = r"[\s\-]+" if ch == " " else re.escape(ch)
+            branches.append(atom + build(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            # Greedy "?" keeps longest-label-wins semantics (City (Job Location) > City)
+            body = f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+_LABEL_TO_KEY: Dict[str, str] = {}
+for _key, _labels in FIELD_LABELS.items():
+    for _label in _labels:
+        _LABEL_TO_KEY.setdefault(_normalise_label(_label), _key)
+
+_LABEL_RE = re.compile(
+    rf"(?<![\w-])(?P<label>{_trie_pattern(_LABEL_TO_KEY)})[ \t]*[:：|][ \t]*",
+    re.IGNORECASE,
+)
+
+
+# --------------------------------------------------------------------------- #
+# Public façade
+# --------------------------------------------------------------------------- #
+def match_fields(text: str) -> Dict[str, str]:
+    """
+    Return ``{field_key: value}`` for every labelled field found in *text*.
+
+    A value runs to the end of its line – or to the next label, so that
+    whitespace-collapsed text ("Job Title: X Company: Y") still splits
+    correctly. The first occurrence of a field wins; empty values are skipped.
+    """
+    if not text:
+        return {}
+
+    matches = list(_LABEL_RE.finditer(text))     # the single linear scan
+    found: Dict[str, str] = {}
+    for i, m in enumerate(matches):
+        key = _LABEL_TO_KEY.get(_normalise_label(m.group("label")))
+        if key is None or key in found:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        newline = text.find("\n", m.end(), end)
+        if newline != -1:
+            end = newline
+        value = text[m.end():end].strip()
+        if value:
+            found[key] = value
+    return found
@@ -0,0 +1,123 @@
+"""
+llm_cache.py – small process-wide cache for LLM results.
+
+LLM answers that depend only on a few normalised inputs (a field set, a role
+family, a fingerprint of the spec) are computed once per process and shared
+by every session. Each hit is booked in ``llm_usage`` as a cache hit, so the
+usage dashboard shows whether caching pays off.
+
+* Thread-safe LRU (``OrderedDict``) with a size bound and an optional TTL.
+* ``get_or_compute(key, compute)`` – concurrent misses for the same key wait
+  for one computation instead of each calling the model.
+* Failed computations (``compute`` raising) are not cached.
+
+Typical usage
+-------------
+>>> from src.utils.llm_cache import LLMCache
+>>> cache = LLMCache("demo", maxsize=2)
+>>> cache.get_or_compute(("a",), lambda: 42)
+42
+>>> cache.get(("a",))
+42
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from src.utils.llm_usage import record_cache_hit
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class LLMCache:
+    """LRU(+TTL) cache of LLM results for one *operation*."""
+
+    def __init__(self, operation: str, *, maxsize: int = 512, ttl: Optional[float] = None) -> None:
+        self.operation = operation
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self.hits = self.misses = 0
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        stored, value = entry
+        if self.ttl is not None and time.time() - stored > self.ttl:
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Cached value for *key*, computing it (once, even under concurrency) on a miss."""
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    self.hits += 1
+                    break
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self.misses += 1
+                    done = self._inflight[key] = threading.Event()
+            if waiter is None:
+                try:
+                    value = compute()
+                    self.put(key, value)
+                    return value
+                finally:
+                    with self._lock:
+                        del self._inflight[key]
+                    done.set()
+            waiter.wait()                       # another thread is computing – then look again
+        record_cache_hit(self.operation)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def fingerprint(obj: Any) -> str:
+    """Stable short hash of a JSON-serialisable value (dict order does not matter)."""
+    data = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:20]
+
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_json_object(text: str) -> Dict[str, Any]:
+    """Parse a model answer that should be one JSON object (code fences tolerated)."""
+    data = json.loads(_FENCE_RE.sub("", text.strip()))
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    return data
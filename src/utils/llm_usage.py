@@ -0,0 +1,347 @@
+"""
+llm_usage.py – token, cost and latency accounting for every LLM call.
+
+Each call (or cache hit) becomes one ``UsageRecord`` – operation, model,
+prompt/completion/cached tokens, latency, retries, cost – and is aggregated
+per process, per model, per operation, per session and per vacancy.
+
+* Session and vacancy are attributed through a resolver registered by the
+  app (``set_attribution_resolver``); work done for a session in another
+  thread runs inside ``attributed(session, vacancy)``. Calls from other worker
+  threads or bulk jobs are booked under ``(background)``.
+* Sessions are booked under ``session_id(token)`` – a salted hash – never
+  the raw ``?sid=`` token, which would restore the session for anyone who
+  reads the dashboard, the export or ``usage.jsonl``. Functions taking a
+  ``session`` argument expect the raw token and hash it themselves.
+* Costs come from ``MODEL_PRICES`` (USD per 1M tokens, longest model-prefix
+  match); ``VACALYSER_MODEL_PRICES`` may override or extend it with a JSON
+  object ``{"model": [input, output], …}``.
+* Machine-readable output: every record is appended to
+  ``usage.jsonl``, and an aggregate ``usage_summary.json`` is rewritten
+  (atomically, at most every ``_SUMMARY_INTERVAL`` s) next to it.
+
+Environment variables:
+
+    VACALYSER_USAGE_DIR        output directory (default ~/.cache/vacalyser/usage)
+    VACALYSER_USAGE_LOG=0      keep accounting in memory only
+    VACALYSER_MODEL_PRICES     JSON price overrides
+    VACALYSER_USAGE_SALT       salt for session ids (default: random per process)
+
+Typical usage
+-------------
+>>> from src.utils.llm_usage import record_response, usage_summary
+>>> record_response("summarize_text", response, latency=1.8, retries=1)   # doctest: +SKIP
+>>> usage_summary()["process"]["cost_usd"]                                 # doctest: +SKIP
+0.0123
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+USAGE_DIR = Path(os.getenv("VACALYSER_USAGE_DIR", Path.home() / ".cache" / "vacalyser" / "usage"))
+USAGE_LOG_ENABLED = os.getenv("VACALYSER_USAGE_LOG", "1") != "0"
+_SUMMARY_INTERVAL = 10.0
+# Bounds for the per-key aggregates and the in-memory call history
+_MAX_KEYS = 1000
+_RECENT = 500
+
+BACKGROUND = "(background)"
+# Without a configured salt, session ids are stable only within one process
+_SESSION_SALT = os.getenv("VACALYSER_USAGE_SALT", "").encode() or secrets.token_bytes(16)
+
+# USD per 1M tokens (input, output) – list prices, check before relying on them
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+try:
+    MODEL_PRICES.update({k: tuple(v) for k, v in json.loads(os.getenv("VACALYSER_MODEL_PRICES", "{}")).items()})
+except (ValueError, TypeError) as e:
+    print(f"llm_usage: ignoring VACALYSER_MODEL_PRICES - {e}")
+_PRICE_PREFIXES = sorted(MODEL_PRICES, key=len, reverse=True)
+
+
+def price_of(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Cost in USD, 0.0 for unknown models."""
+    for prefix in _PRICE_PREFIXES:
+        if model.startswith(prefix):
+            price_in, price_out = MODEL_PRICES[prefix]
+            return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+    return 0.0
+
+
+def session_id(token: str) -> str:
+    """Salted, non-reversible id under which *token*'s usage is booked."""
+    if token == BACKGROUND:
+        return token
+    return hmac.new(_SESSION_SALT, token.encode("utf-8"), hashlib.sha256).hexdigest()[:12]
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 1  Records & aggregates
+# ────────────────────────────────────────────────────────────────────────────
+class UsageRecord(NamedTuple):
+    ts: float
+    operation: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int                  # prompt tokens served from OpenAI's prompt cache
+    latency: float                      # seconds, including retries
+    retries: int
+    cache_hit: bool                     # answered from a local cache, no API call
+    cost_usd: float
+    session: str
+    vacancy: str
+    error: Optional[str] = None
+
+
+class _Totals:
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens",
+                 "latency", "retries", "cache_hits", "errors", "cost_usd")
+
+    def __init__(self) -> None:
+        self.calls = self.prompt_tokens = self.completion_tokens = self.cached_tokens = 0
+        self.retries = self.cache_hits = self.errors = 0
+        self.latency = self.cost_usd = 0.0
+
+    def add(self, rec: UsageRecord) -> None:
+        self.calls += 1
+        self.prompt_tokens += rec.prompt_tokens
+        self.completion_tokens += rec.completion_tokens
+        self.cached_tokens += rec.cached_tokens
+        self.latency += rec.latency
+        self.retries += rec.retries
+        self.cache_hits += rec.cache_hit
+        self.errors += rec.error is not None
+        self.cost_usd += rec.cost_usd
+
+    def as_dict(self) -> Dict[str, Any]:
+        api_calls = self.calls - self.cache_hits
+        return {
+            "calls": self.calls,
+            "api_calls": api_calls,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.calls, 3) if self.calls else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_prompt_tokens": self.cached_tokens,
+            "retries": self.retries,
+            "errors": self.errors,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_s": round(self.latency, 3),
+            "avg_latency_s": round(self.latency / api_calls, 3) if api_calls else 0.0,
+        }
+
+
+class UsageLedger:
+    """Thread-safe, process-wide aggregation of ``UsageRecord``s."""
+
+    def __init__(self, out_dir: Optional[Path] = USAGE_DIR if USAGE_LOG_ENABLED else None) -> None:
+        self.out_dir = out_dir
+        self._lock = threading.Lock()
+        self._process = _Totals()
+        self._groups: Dict[str, "OrderedDict[str, _Totals]"] = {
+            dim: OrderedDict() for dim in ("model", "operation", "session", "vacancy")
+        }
+        self._recent: "deque[UsageRecord]" = deque(maxlen=_RECENT)
+        self._titles: Dict[str, str] = {}
+        self._summary_written = 0.0
+
+    def add(self, rec: UsageRecord, *, vacancy_title: str = "") -> None:
+        with self._lock:
+            self._process.add(rec)
+            for dim, group in self._groups.items():
+                key = getattr(rec, dim)
+                totals = group.get(key)
+                if totals is None:
+                    totals = group[key] = _Totals()
+                    if len(group) > _MAX_KEYS:
+                        group.popitem(last=False)          # least recently active key
+                else:
+                    group.move_to_end(key)
+                totals.add(rec)
+            if vacancy_title:
+                self._titles[rec.vacancy] = vacancy_title
+            self._recent.append(rec)
+            write_summary = time.time() - self._summary_written >= _SUMMARY_INTERVAL
+            if write_summary:
+                self._summary_written = time.time()
+        if self.out_dir is not None:
+            self._append_log(rec)
+            if write_summary:
+                self.write_summary()
+
+    # ----------------------------------------------------------------- reads
+    def summary(self, *, session: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregates as plain dicts (optionally only one session's row)."""
+        with self._lock:
+            groups = {
+                dim: {key: t.as_dict() for key, t in group.items()}
+                for dim, group in self._groups.items()
+            }
+            result = {"generated": time.time(), "process": self._process.as_dict(), **groups}
+            result["vacancy_titles"] = {k: self._titles.get(k, "") for k in self._groups["vacancy"]}
+        if session is not None:
+            result["session"] = {session: result["session"].get(session, _Totals().as_dict())}
+        return result
+
+    def cost(self, session: str) -> float:
+        """USD booked for *session* (0.0 if unknown or evicted)."""
+        with self._lock:
+            totals = self._groups["session"].get(session)
+            return totals.cost_usd if totals is not None else 0.0
+
+    def recent(self, limit: int = 100, *, session: Optional[str] = None) -> List[UsageRecord]:
+        with self._lock:
+            records = list(self._recent)
+        if session is not None:
+            records = [r for r in records if r.session == session]
+        return records[-limit:][::-1]
+
+    # ---------------------------------------------------------------- output
+    def _append_log(self, rec: UsageRecord) -> None:
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            with (self.out_dir / "usage.jsonl").open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(rec._asdict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"llm_usage: usage log unavailable - {e}")
+            self.out_dir = None
+
+    def write_summary(self, path: Optional[Path] = None) -> Optional[Path]:
+        """Write ``usage_summary.json`` atomically; returns its path."""
+        path = path or (self.out_dir / "usage_summary.json" if self.out_dir else None)
+        if path is None:
+            return None
+        tmp = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self.summary(), indent=1), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"llm_usage: summary not written - {e}")
+            return None
+        return path
+
+
+_ledger = UsageLedger()
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 2  Attribution (session / vacancy)
+# ────────────────────────────────────────────────────────────────────────────
+_attribution_resolver: Optional[Callable[[], Optional[Tuple[str, str, str]]]] = None
+_attribution_override: ContextVar[Optional[Tuple[str, str, str]]] = ContextVar("vacalyser_usage_owner", default=None)
+
+
+def set_attribution_resolver(resolver: Optional[Callable[[], Optional[Tuple[str, str, str]]]]) -> None:
+    """*resolver* returns ``(session, vacancy_key, vacancy_title)`` for the calling thread, or None."""
+    global _attribution_resolver
+    _attribution_resolver = resolver
+
+
+@contextmanager
+def attributed(session: str, vacancy: str, title: str = "") -> Iterator[None]:
+    """Book calls made inside the block for *session* / *vacancy* (e.g. from a worker thread)."""
+    token = _attribution_override.set((session, vacancy, title))
+    try:
+        yield
+    finally:
+        _attribution_override.reset(token)
+
+
+def _attribution() -> Tuple[str, str, str]:
+    override = _attribution_override.get()
+    if override is not None:
+        return override
+    if _attribution_resolver is not None:
+        try:
+            found = _attribution_resolver()
+        except Exception as e:
+            print(f"llm_usage: attribution failed - {e}")
+            found = None
+        if found:
+            return found
+    return BACKGROUND, BACKGROUND, ""
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 3  Public façade
+# ────────────────────────────────────────────────────────────────────────────
+def record_call(
+    operation: str,
+    model: str,
+    *,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cached_tokens: int = 0,
+    latency: float = 0.0,
+    retries: int = 0,
+    cache_hit: bool = False,
+    error: Optional[str] = None,
+) -> UsageRecord:
+    session, vacancy, title = _attribution()
+    rec = UsageRecord(
+        time.time(), operation, model, prompt_tokens, completion_tokens, cached_tokens,
+        latency, retries, cache_hit, 0.0 if cache_hit else price_of(model, prompt_tokens, completion_tokens),
+        session_id(session), vacancy, error,
+    )
+    _ledger.add(rec, vacancy_title=title)
+    return rec
+
+
+def record_response(operation: str, response: Any, *, latency: float, retries: int = 0) -> UsageRecord:
+    """Book an OpenAI chat completion response (reads ``response.usage``)."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return record_call(
+        operation,
+        getattr(response, "model", None) or "unknown",
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+        latency=latency,
+        retries=retries,
+    )
+
+
+def record_error(operation: str, model: str, error: BaseException, *, latency: float, retries: int = 0) -> UsageRecord:
+    return record_call(operation, model, latency=latency, retries=retries, error=f"{type(error).__name__}: {error}")
+
+
+def record_cache_hit(operation: str, model: str = "cache") -> UsageRecord:
+    """Book an LLM answer served from a local cache (no tokens, no cost)."""
+    return record_call(operation, model, cache_hit=True)
+
+
+def usage_summary(*, session: Optional[str] = None) -> Dict[str, Any]:
+    """Aggregates; with *session* (raw token) only that session's row, keyed by ``session_id``."""
+    return _ledger.summary(session=session_id(session) if session is not None else None)
+
+
+def session_cost(session: str) -> float:
+    return _ledger.cost(session_id(session))
+
+
+def recent_calls(limit: int = 100, *, session: Optional[str] = None) -> List[UsageRecord]:
+    return _ledger.recent(limit, session=session_id(session) if session is not None else None)
+
+
+def write_usage_summary(path: Optional[Path] = None) -> Optional[Path]:
+    return _ledger.write_summary(path)
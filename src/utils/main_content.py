@@ -0,0 +1,340 @@
+"""
+main_content.py – readability-style main-content extraction for job-ad pages.
+
+A job-ad page is mostly chrome: navigation, cookie banners, "similar jobs"
+rails, footers. ``extract_main_content`` keeps only the ad itself:
+
+1. If the page embeds a schema.org ``JobPosting`` (JSON-LD – most ATS and job
+   boards do), its title, employer, location and description are used.
+2. Otherwise the page is parsed once into a light block tree (stdlib
+   ``HTMLParser``, no DOM library), obvious boilerplate subtrees are dropped,
+   and every container is scored by the text it holds, its comma density and
+   its link density. The best container (plus strong siblings) is rendered.
+
+Headings are kept as ``## …`` lines and list items as ``- …`` so the LLM
+still sees the ad's structure, at a fraction of the tokens of the full page.
+
+Typical usage
+-------------
+>>> from src.utils.main_content import extract_main_content
+>>> extract_main_content("<nav><a href='/'>Home</a></nav><article><h2>Tasks</h2>"
+...                      "<ul><li>Build data pipelines, models and dashboards</li></ul></article>")
+'## Tasks\\n- Build data pipelines, models and dashboards'
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# --------------------------------------------------------------------------- #
+# Tag classes & patterns
+# --------------------------------------------------------------------------- #
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "canvas", "select", "button"}
+# no "form": ASP.NET pages and many ATS wrap the whole body in one <form>
+_BOILERPLATE_TAGS = {"nav", "footer", "aside", "dialog"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_BLOCK_TAGS = _HEADINGS | {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+    "table", "tr", "td", "th", "pre", "blockquote", "header", "body", "html",
+}
+# Tags whose open element is closed implicitly by a new sibling of the same kind
+_AUTO_CLOSE = {"p": {"p"}, "li": {"li"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"}, "tr": {"tr"}, "td": {"td", "th"}, "th": {"td", "th"}}
+
+_DROP_RE = re.compile(r"cookie|consent|gdpr|onetrust|usercentrics|newsletter|modal|popup|skip-link", re.I)
+_NEGATIVE_RE = re.compile(
+    r"nav|menu|footer|sidebar|social|share|breadcrumb|related|similar|banner|sponsor|"
+    r"promo|teaser|widget|comment|login|search", re.I,
+)
+_POSITIVE_RE = re.compile(
+    r"job|stelle|posting|vacancy|position|description|beschreibung|content|article|main|"
+    r"detail|body|text|entry", re.I,
+)
+_LD_JSON_RE = re.compile(
+    r"<script[^>]+type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.I | re.S,
+)
+
+# Child marker for <br>
+_BR = ("\n", False)
+
+# A block must carry at least this much text to vote for its ancestors
+_MIN_BLOCK_CHARS = 25
+# Below this, the scored result is considered a miss and all kept text is used
+_MIN_RESULT_CHARS = 200
+
+
+# --------------------------------------------------------------------------- #
+# Light block tree
+# --------------------------------------------------------------------------- #
+class _Node:
+    __slots__ = ("tag", "hint", "parent", "children", "score", "_text", "_link")
+
+    def __init__(self, tag: str, hint: str = "", parent: Optional["_Node"] = None) -> None:
+        self.tag = tag
+        self.hint = hint                    # class + id, used for weighting
+        self.parent = parent
+        self.children: list = []            # _Node | (text, is_link)
+        self.score = 0.0
+        self._text: Optional[int] = None
+        self._link: Optional[int] = None
+
+    def text_len(self) -> int:
+        if self._text is None:
+            self._text = self._link = 0
+            for child in self.children:
+                if isinstance(child, _Node):
+                    self._text += child.text_len()
+                    self._link += child.link_len()
+                else:
+                    self._text += len(child[0])
+                    self._link += len(child[0]) if child[1] else 0
+        return self._text
+
+    def link_len(self) -> int:
+        self.text_len()
+        return self._link
+
+    def link_density(self) -> float:
+        total = self.text_len()
+        return self.link_len() / total if total else 0.0
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = _Node("root")
+        self.blocks: List[_Node] = []       # nodes that directly hold text
+        self._block_ids: set = set()
+        self._stack: List[_Node] = [self.root]
+        self._skip_depth = 0                # inside script/style or a dropped subtree
+        self._skip_tag: Optional[str] = None
+        self._links = 0
+
+    # -- helpers --------------------------------------------------------------
+    def _close(self, tag: str) -> None:
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    # -- HTMLParser hooks -----------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in _VOID_TAGS:
+            if tag == "br" and self._stack[-1].children:
+                self._stack[-1].children.append(_BR)
+            return
+
+        attrs = dict(attrs)
+        hint = f"{attrs.get('class') or ''} {attrs.get('id') or ''}".strip()
+        role = (attrs.get("role") or "").lower()
+        if (tag in _SKIP_TAGS or tag in _BOILERPLATE_TAGS or role in ("navigation", "banner", "contentinfo")
+                or attrs.get("aria-hidden") == "true" or (hint and _DROP_RE.search(hint))):
+            self._skip_depth, self._skip_tag = 1, tag
+            return
+
+        if tag == "a":
+            self._links += 1
+            return
+        if tag not in _BLOCK_TAGS:
+            return                          # inline markup: only its text matters
+
+        for open_tag in _AUTO_CLOSE.get(tag, ()):
+            if self._stack[-1].tag == open_tag:
+                self._stack.pop()
+        node = _Node(tag, hint, self._stack[-1])
+        self._stack[-1].children.append(node)
+        self._stack.append(node)
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+            return
+        if tag == "a":
+            self._links = max(0, self._links - 1)
+        elif tag in _BLOCK_TAGS:
+            self._close(tag)
+
+    def handle_data(self, data):
+        if self._skip_depth or not data:
+            return
+        node = self._stack[-1]
+        if not data.strip() and not node.children:
+            return                          # leading whitespace carries nothing
+        is_link = bool(self._links)
+        last = node.children[-1] if node.children else None
+        if isinstance(last, tuple) and last is not _BR and last[1] == is_link:
+            node.children[-1] = (last[0] + data, is_link)
+        else:
+            node.children.append((data, is_link))
+        if node is not self.root and id(node) not in self._block_ids and data.strip():
+            self._block_ids.add(id(node))
+            self.blocks.append(node)
+
+
+# --------------------------------------------------------------------------- #
+# Scoring
+# --------------------------------------------------------------------------- #
+def _class_weight(node: _Node) -> float:
+    weight = 0.0
+    if node.hint:
+        if _NEGATIVE_RE.search(node.hint):
+            weight -= 25
+        if _POSITIVE_RE.search(node.hint):
+            weight += 25
+    if node.tag in ("article", "main"):
+        weight += 25
+    return weight
+
+
+def _best_container(blocks: List[_Node]) -> Optional[_Node]:
+    candidates = {}
+    for block in blocks:
+        own = "".join(c[0] for c in block.children if isinstance(c, tuple))
+        if len(own.strip()) < _MIN_BLOCK_CHARS:
+            continue
+        points = 1 + own.count(",") + own.count(";") + min(len(own) / 100, 3)
+        # the block votes for itself-or-list, its parent and (half) its grandparent
+        target = block.parent if block.tag in ("li", "td", "dd", "dt") and block.parent else block
+        for node, share in ((target, 1.0), (target.parent, 1.0), (target.parent and target.parent.parent, 0.5)):
+            if node is None or node.tag == "root":
+                continue
+            if id(node) not in candidates:
+                node.score = _class_weight(node)
+                candidates[id(node)] = node
+            node.score += points * share
+
+    best = None
+    for node in candidates.values():
+        node.score *= 1 - node.link_density()
+        if best is None or node.score > best.score:
+            best = node
+    return best
+
+
+# --------------------------------------------------------------------------- #
+# Rendering
+# --------------------------------------------------------------------------- #
+def _render(node: _Node, out: List[str]) -> None:
+    buffer: List[str] = []
+
+    def flush() -> None:
+        line = " ".join("".join(buffer).split())
+        buffer.clear()
+        if not line:
+            return
+        if node.tag in _HEADINGS:
+            line = "## " + line
+        elif node.tag == "li":
+            line = "- " + line
+        out.append(line)
+
+    for child in node.children:
+        if isinstance(child, _Node):
+            flush()
+            _render(child, out)
+        elif child is _BR:
+            flush()
+        else:
+            buffer.append(child[0])
+    flush()
+
+
+def _render_many(nodes: List[_Node]) -> str:
+    out: List[str] = []
+    for node in nodes:
+        _render(node, out)
+    # drop immediate duplicates (e.g. repeated "Apply now" lines)
+    lines = [line for i, line in enumerate(out) if i == 0 or line != out[i - 1]]
+    return "\n".join(lines)
+
+
+def _job_posting_text(raw_html: str) -> str:
+    """Text of an embedded schema.org JobPosting, or ""."""
+    for match in _LD_JSON_RE.finditer(raw_html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if not isinstance(item, dict) or "JobPosting" not in str(item.get("@type", "")):
+                continue
+            lines = []
+            if item.get("title"):
+                lines.append(f"## {item['title']}")
+            org = item.get("hiringOrganization")
+            if isinstance(org, dict) and org.get("name"):
+                lines.append(f"Company: {org['name']}")
+            locations = item.get("jobLocation")
+            for loc in locations if isinstance(locations, list) else [locations]:
+                address = loc.get("address") if isinstance(loc, dict) else None
+                if isinstance(address, dict) and address.get("addressLocality"):
+                    lines.append(f"Location: {address['addressLocality']}")
+                    break
+            if item.get("employmentType"):
+                kind = item["employmentType"]
+                lines.append(f"Employment type: {', '.join(kind) if isinstance(kind, list) else kind}")
+            description = item.get("description") or ""
+            if "&lt;" in description:
+                description = html.unescape(description)   # some boards double-escape the markup
+            body = _extract_from_tree(description, whole=True) if "<" in description else description.strip()
+            if body:
+                lines.append(body)
+                return "\n".join(lines)
+    return ""
+
+
+def _extract_from_tree(raw_html: str, *, whole: bool = False) -> str:
+    builder = _TreeBuilder()
+    try:
+        builder.feed(raw_html)
+        builder.close()
+    except Exception as e:                      # malformed markup – use what was built
+        print(f"main_content: parse error - {e}")
+
+    if whole:
+        return _render_many([builder.root])
+
+    best = _best_container(builder.blocks)
+    if best is None:
+        return _render_many([builder.root])
+
+    # Siblings that score well belong to the ad too (e.g. split "tasks"/"profile" sections)
+    chosen = [best]
+    if best.parent is not None:
+        threshold = max(10.0, best.score * 0.2)
+        chosen = [
+            sib for sib in best.parent.children
+            if isinstance(sib, _Node) and (sib is best or (sib.score >= threshold and sib.link_density() < 0.25))
+        ]
+    text = _render_many(chosen)
+    if len(text) < _MIN_RESULT_CHARS:
+        text = _render_many([builder.root])     # scoring missed – keep everything not dropped
+    return text
+
+
+# --------------------------------------------------------------------------- #
+# Public façade
+# --------------------------------------------------------------------------- #
+def extract_main_content(raw_html: str, *, max_chars: int | None = None) -> str:
+    """
+    Return the main readable content of an HTML page as compact text.
+
+    Headings become ``## …`` lines, list items ``- …`` lines, other blocks one
+    line each. Returns "" if nothing readable is found.
+    """
+    if not raw_html:
+        return ""
+    text = _job_posting_text(raw_html) if "ld+json" in raw_html else ""
+    if not text:
+        text = _extract_from_tree(raw_html)
+    return text[:max_chars] if max_chars else text
@@ -0,0 +1,228 @@
+"""
+memory.py – per-session memory accounting and leak hints.
+
+* ``deep_sizeof(obj)`` – retained size estimate: ``sys.getsizeof`` summed over
+  everything reachable through containers, ``__dict__`` and ``__slots__``.
+  Objects shared by the whole process (modules, classes, functions, the
+  cached TriggerEngine) are not counted; within one session an object
+  reachable from several keys is counted once, for the first key.
+* ``measure_state(state)`` – bytes per session-state key; ``SizeHistory``
+  keeps the last measurements per session and key and flags keys that grew
+  on every one of them (``growing_keys``) – the signature of an unbounded list.
+* ``take_snapshot()`` / ``snapshot_diff()`` – tracemalloc snapshots, diffed
+  against the previous one (top allocation sites by growth).
+* ``list_session_states()`` – all live Streamlit sessions of this process
+  (internal runtime API; falls back to the current session only).
+
+Environment variables:
+
+    VACALYSER_MEMORY_WATCH=1   measure the session after every rerun (growth tracking)
+
+Typical usage
+-------------
+>>> from src.utils.memory import deep_sizeof
+>>> deep_sizeof(["x" * 1000]) > 1000
+True
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+MEMORY_WATCH = os.getenv("VACALYSER_MEMORY_WATCH", "0") == "1"
+# Session-state keys holding process-wide objects (built once, shared by all sessions)
+SHARED_KEYS = frozenset({"trigger_engine"})
+# Upper bound on objects visited per deep_sizeof call (keeps the page responsive)
+_MAX_OBJECTS = 500_000
+_HISTORY = 8
+_MIN_GROWTH_BYTES = 16 * 1024
+
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+               types.MethodType, types.CodeType, types.FrameType)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), range)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 1  Sizes
+# ────────────────────────────────────────────────────────────────────────────
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate retained size of *obj* in bytes (see module docstring)."""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    visited = 0
+    while stack and visited < _MAX_OBJECTS:
+        o = stack.pop()
+        oid = id(o)
+        if oid in seen or isinstance(o, _SKIP_TYPES):
+            continue
+        seen.add(oid)
+        visited += 1
+        try:
+            total += sys.getsizeof(o)
+        except TypeError:
+            continue
+        if isinstance(o, _ATOMIC_TYPES):
+            continue
+        if isinstance(o, Mapping):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        d = getattr(o, "__dict__", None)
+        if d is not None and not isinstance(o, Mapping):
+            stack.append(d)
+        for cls in type(o).__mro__:
+            for slot in cls.__dict__.get("__slots__", ()):
+                value = getattr(o, slot, None)
+                if value is not None:
+                    stack.append(value)
+    return total
+
+
+def measure_state(state: Mapping[str, Any]) -> Dict[str, int]:
+    """Bytes retained per key of one session state (shared keys → 0)."""
+    seen: set = set()
+    sizes = {}
+    for key in list(state.keys()):
+        if key in SHARED_KEYS:
+            sizes[key] = 0
+            continue
+        try:
+            value = state[key]
+        except KeyError:
+            continue
+        sizes[key] = deep_sizeof(value, seen)
+    return sizes
+
+
+class SizeHistory:
+    """Last ``_HISTORY`` measurements per (session, key)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, "deque[Tuple[float, int]]"]] = {}
+
+    def record(self, session: str, sizes: Mapping[str, int]) -> None:
+        now = time.time()
+        with self._lock:
+            per_key = self._data.setdefault(session, {})
+            for key, size in sizes.items():
+                per_key.setdefault(key, deque(maxlen=_HISTORY)).append((now, size))
+
+    def growing_keys(self, session: str, min_points: int = 4) -> List[Tuple[str, int, int]]:
+        """``(key, first, last)`` for keys that grew at every one of ≥ *min_points* measurements."""
+        flagged = []
+        with self._lock:
+            for key, points in self._data.get(session, {}).items():
+                sizes = [size for _, size in points]
+                if len(sizes) < min_points:
+                    continue
+                if all(b > a for a, b in zip(sizes, sizes[1:])) and sizes[-1] - sizes[0] >= _MIN_GROWTH_BYTES:
+                    flagged.append((key, sizes[0], sizes[-1]))
+        return flagged
+
+    def forget(self, keep: Iterable[str]) -> None:
+        """Drop the history of sessions that no longer exist."""
+        keep = set(keep)
+        with self._lock:
+            for session in [s for s in self._data if s not in keep]:
+                del self._data[session]
+
+
+size_history = SizeHistory()
+
+
+def record_rerun(session: str, state: Mapping[str, Any]) -> None:
+    """Per-rerun hook (``VACALYSER_MEMORY_WATCH=1``): sizes by key, plus a tracemalloc snapshot if tracing."""
+    size_history.record(session, measure_state(state))
+    if tracemalloc.is_tracing():
+        take_snapshot()
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux; None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 2  Live sessions
+# ────────────────────────────────────────────────────────────────────────────
+def list_session_states() -> List[Tuple[str, Mapping[str, Any]]]:
+    """
+    ``(session_id, state)`` for every active session of this process.
+    Uses Streamlit's runtime internals; if they moved, only the calling
+    session is returned.
+    """
+    try:
+        from streamlit.runtime import Runtime
+        infos = Runtime.instance()._session_mgr.list_active_sessions()
+        return [(info.session.id, info.session.session_state.filtered_state) for info in infos]
+    except Exception as e:
+        print(f"list_session_states: runtime API unavailable - {e}")
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return [(ctx.session_id if ctx else "current", st.session_state)]
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 3  tracemalloc snapshots
+# ────────────────────────────────────────────────────────────────────────────
+_snapshots: "deque[Tuple[float, tracemalloc.Snapshot]]" = deque(maxlen=2)
+
+
+def start_tracing(frames: int = 10) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    _snapshots.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def take_snapshot() -> Optional[tracemalloc.Snapshot]:
+    """Snapshot current allocations (None unless tracing is on)."""
+    if not tracemalloc.is_tracing():
+        return None
+    gc.collect()
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    _snapshots.append((time.time(), snap))
+    return snap
+
+
+def snapshot_diff(top: int = 25, key_type: str = "lineno") -> List[Dict[str, Any]]:
+    """Top allocation sites by growth between the last two snapshots."""
+    if len(_snapshots) < 2:
+        return []
+    (_, old), (_, new) = _snapshots
+    return [
+        {
+            "site": str(stat.traceback[0]) if stat.traceback else "?",
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "size_kb": round(stat.size / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in new.compare_to(old, key_type)[:top]
+    ]
+
+
+def snapshot_times() -> List[float]:
+    return [ts for ts, _ in _snapshots]
@@ -0,0 +1,184 @@
+"""
+profiling.py – opt-in profiling of individual wizard reruns.
+
+``profiled(fn, mode=…, step=…, session=…)`` runs *fn* under a profiler and
+stores one capture per call:
+
+* ``<id>.folded`` – sampled stacks in the folded format ("a;b;c 42"), the
+  input of flamegraph.pl / speedscope / inferno (the flame-graph artifact);
+* ``<id>.prof``   – cProfile stats (mode ``cprofile`` only), for pstats/snakeviz;
+* ``<id>.json``   – metadata: time, session, step, wall time, sample count.
+
+*session* is the hashed ``llm_usage.session_id`` – captures and their file
+names must never carry the raw session token.
+
+Modes: ``sample`` – a background thread samples the calling thread's stack
+every ``SAMPLE_INTERVAL`` s (low overhead); ``cprofile`` – deterministic
+cProfile *plus* sampling. When profiling is off, callers invoke *fn*
+directly – nothing here runs.
+
+Environment variables:
+
+    VACALYSER_PROFILE_DIR      capture directory (default ~/.cache/vacalyser/profiles)
+    VACALYSER_PROFILE_KEEP     captures kept, oldest deleted first (default 200)
+
+Typical usage
+-------------
+>>> from src.utils.profiling import profiled, list_captures
+>>> result = profiled(run_wizard, mode="sample", step=5, session="3f9a0c1b2d4e")  # doctest: +SKIP
+>>> list_captures()[0]["step"]                                                      # doctest: +SKIP
+5
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+PROFILE_DIR = Path(os.getenv("VACALYSER_PROFILE_DIR", Path.home() / ".cache" / "vacalyser" / "profiles"))
+PROFILE_KEEP = int(os.getenv("VACALYSER_PROFILE_KEEP", "200"))
+SAMPLE_INTERVAL = 0.005
+MODES = ("sample", "cprofile")
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 1  Stack sampler
+# ────────────────────────────────────────────────────────────────────────────
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL) -> None:
+        super().__init__(name="vacalyser-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_frames = sys._current_frames
+        while not self._stop_event.wait(self.interval):
+            frame = own_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 2  Capture a call
+# ────────────────────────────────────────────────────────────────────────────
+def profiled(
+    fn: Callable[[], T],
+    *,
+    mode: str = "sample",
+    step: Optional[int] = None,
+    session: str = "",
+    out_dir: Path = PROFILE_DIR,
+) -> T:
+    """Run *fn* under the profiler and store a capture (even if *fn* raises)."""
+    if mode not in MODES:
+        mode = "sample"
+    sampler = _StackSampler(threading.get_ident())
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    started = time.time()
+    t0 = time.perf_counter()
+    error = None
+    sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return fn()
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        stacks = sampler.stop()
+        _store_capture(
+            out_dir, stacks, profiler,
+            {
+                "ts": started,
+                "session": session,
+                "step": step,
+                "mode": mode,
+                "wall_s": round(time.perf_counter() - t0, 4),
+                "samples": sum(stacks.values()),
+                "sample_interval_s": SAMPLE_INTERVAL,
+                "error": error,
+            },
+        )
+
+
+def _store_capture(out_dir: Path, stacks: Counter, profiler: Optional[cProfile.Profile], meta: Dict[str, Any]) -> None:
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(meta["ts"])) + f"-{int(meta['ts'] * 1000) % 1000:03d}"
+    step = meta["step"] if meta["step"] is not None else "x"
+    capture_id = meta["id"] = f"{stamp}_{meta['session'] or 'anon'}_step{step}"
+    try:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with (out_dir / f"{capture_id}.folded").open("w", encoding="utf-8") as fh:
+            fh.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        if profiler is not None:
+            profiler.dump_stats(str(out_dir / f"{capture_id}.prof"))
+        (out_dir / f"{capture_id}.json").write_text(json.dumps(meta), encoding="utf-8")
+        _prune(out_dir)
+    except OSError as e:
+        print(f"profiled: capture not stored - {e}")
+
+
+def _prune(out_dir: Path) -> None:
+    if PROFILE_KEEP <= 0:
+        return
+    for old in sorted(out_dir.glob("*.json"))[:-PROFILE_KEEP]:
+        for suffix in (".json", ".folded", ".prof"):
+            old.with_suffix(suffix).unlink(missing_ok=True)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 3  Reading captures (diagnostics page)
+# ────────────────────────────────────────────────────────────────────────────
+def list_captures(out_dir: Path = PROFILE_DIR, limit: int = 100) -> List[Dict[str, Any]]:
+    """Capture metadata, newest first."""
+    if not out_dir.is_dir():
+        return []
+    captures = []
+    for path in sorted(out_dir.glob("*.json"), reverse=True)[:limit]:
+        try:
+            captures.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as e:
+            print(f"list_captures: skipping {path.name} - {e}")
+    return captures
+
+
+def capture_file(capture_id: str, suffix: str, out_dir: Path = PROFILE_DIR) -> Optional[Path]:
+    """Path of one artifact (``.folded``/``.prof``/``.json``) of a capture, if present."""
+    path = out_dir / f"{Path(capture_id).name}{suffix}"
+    return path if path.is_file() else None
+
+
+def self_time(folded: str, top: int = 25) -> List[tuple[str, int]]:
+    """Leaf frames with the most samples – "where the time is spent"."""
+    counts: Counter = Counter()
+    for line in folded.splitlines():
+        stack, _, n = line.rpartition(" ")
+        if stack:
+            counts[stack.rsplit(";", 1)[-1]] += int(n)
+    return counts.most_common(top)
@@ -0,0 +1,214 @@
+"""
+rule_extractor.py – deterministic fast path for predictable JobSpec fields.
+
+Contact data, salary/currency, start date, vacation days, job/contract type and
+remote policy follow a handful of patterns in German and English ads. They are
+picked up here with precompiled regexes and small gazetteers, each with a
+confidence score, *before* any LLM call. Only fields the rules could not fill
+confidently need to be requested from the model.
+
+Typical usage
+-------------
+>>> from src.utils.rule_extractor import confident_fields
+>>> confident_fields("Vollzeit, unbefristet. 30 Tage Urlaub. Bewerbung an jobs@acme.de")
+{'recruitment_contact_email': 'jobs@acme.de', 'vacation_days': '30 days', 'job_type': 'Full-Time', 'contract_type': 'Permanent'}
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, NamedTuple
+
+# Fields at or above this confidence are treated as settled
+CONFIDENCE_THRESHOLD = 0.8
+
+
+class FieldGuess(NamedTuple):
+    value: str
+    confidence: float
+
+
+# --------------------------------------------------------------------------- #
+# Compiled patterns & gazetteers
+# --------------------------------------------------------------------------- #
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-zA-Z]{2,}\b")
+_EMAIL_HINT_RE = re.compile(r"(?i)\b(?:jobs?|karriere|career|bewerbung|apply|recruit\w*|hr|talent)\b")
+
+# A phone number starts with a country code (+49, 0049) or a trunk "0" (030, (030),
+# 0151) and continues in digit groups – no dots, so dates and amounts never match
+_PHONE_RE = re.compile(
+    r"(?<![\w+(.,/-])"
+    r"(?:(?:\+|00)[1-9]\d{0,2}(?:\s?\(0\))?|\(0\d{1,5}\)|0\d{1,5})"
+    r"(?:\s?[/-]\s?\d|\s\d|\d)+"
+    r"(?!\w|[.,]\d)"
+)
+_DATE_LIKE_RE = re.compile(r"\d{1,2}[/-]\d{1,2}[/-](?:\d{4}|\d{2})")
+_PHONE_HINT_RE = re.compile(r"(?i)\b(?:tel(?:efon)?|phone|mobil(?:e)?|fon|call)\b\.?\s*:?\s*$")
+
+_AMOUNT = r"\d{1,3}(?:[.,\s]\d{3})+|\d+(?:[.,]\d+)?\s?[kK]|\d{4,6}"
+_CURRENCY = r"€|EUR|Euro|USD|\$|£|GBP|CHF"
+_SALARY_RANGE_RE = re.compile(
+    rf"(?P<cur1>{_CURRENCY})?\s*(?P<low>{_AMOUNT})\s*(?P<cur2>{_CURRENCY})?\s*"
+    rf"(?:-|–|—|bis|to)\s*(?P<cur3>{_CURRENCY})?\s*(?P<high>{_AMOUNT})\s*(?P<cur4>{_CURRENCY})?",
+    re.IGNORECASE,
+)
+_SALARY_HINT_RE = re.compile(r"(?i)gehalt|vergütung|salary|compensation|brutto|gross|jahres|annual|p\.\s?a\.")
+_CURRENCY_MAP = {"€": "EUR", "eur": "EUR", "euro": "EUR", "usd": "USD", "$": "USD",
+                 "£": "GBP", "gbp": "GBP", "chf": "CHF"}
+
+_ASAP_RE = re.compile(
+    r"(?i)\b(?:ab\s+sofort|zum\s+nächstmöglichen\s+(?:zeitpunkt|termin)|asap|as\s+soon\s+as\s+possible|immediately)\b"
+)
+_START_DATE_RE = re.compile(
+    r"(?i)\b(?:ab|zum|start(?:ing)?(?:\s+date)?|beginn|eintritt(?:sdatum)?|from)\s*:?\s*"
+    r"(?P<d>\d{1,2})\.\s?(?P<m>\d{1,2})\.\s?(?P<y>\d{4})"
+)
+_ISO_DATE_RE = re.compile(r"(?i)\b(?:start(?:ing)?(?:\s+date)?|beginn|from)\s*:?\s*(?P<iso>\d{4}-\d{2}-\d{2})\b")
+
+_VACATION_RE = re.compile(
+    r"(?i)\b(?P<n>\d{2})\s*(?:urlaubstage|tage\s+(?:jahres)?urlaub|arbeitstage\s+urlaub|"
+    r"(?:paid\s+)?(?:vacation|holiday)\s+days|days\s+(?:of\s+)?(?:paid\s+)?(?:vacation|holiday|annual\s+leave))"
+)
+
+# (pattern, wizard option) – order decides ties; options match the wizard selectboxes
+_JOB_TYPES = [
+    (re.compile(r"(?i)\b(?:vollzeit|full[\s-]?time)\b"), "Full-Time"),
+    (re.compile(r"(?i)\b(?:teilzeit|part[\s-]?time|werkstudent\w*)\b"), "Part-Time"),
+    (re.compile(r"(?i)\b(?:praktikum|praktikant\w*|internship)\b"), "Internship"),
+    (re.compile(r"(?i)\b(?:freelance\w*|freiberuflich\w*|freelancer)\b"), "Freelance"),
+    (re.compile(r"(?i)\b(?:ehrenamt\w*|volunteer\w*)\b"), "Volunteer"),
+]
+_CONTRACT_TYPES = [
+    (re.compile(r"(?i)\b(?:unbefristet\w*|permanent|festanstellung)\b"), "Permanent"),
+    (re.compile(r"(?i)\b(?:befristet\w*|fixed[\s-]?term|temporary|elternzeitvertretung)\b"), "Fixed-Term"),
+    (re.compile(r"(?i)\b(?:contractor|werkvertrag|auf\s+projektbasis)\b"), "Contract"),
+]
+_REMOTE_POLICIES = [
+    (re.compile(r"(?i)(?:100\s?%\s?remote|fully\s+remote|full[\s-]remote|remote[\s-]first|"
+                r"vollständig\s+remote|komplett\s+remote|ortsunabhängig)"), "Full Remote"),
+    (re.compile(r"(?i)\b(?:hybrid\w*|home[\s-]?office|mobiles\s+arbeiten)\b"), "Hybrid"),
+    (re.compile(r"(?i)\b(?:vor\s+ort|on[\s-]?site|präsenz\w*|in[\s-]office)\b"), "On-site"),
+]
+
+
+# --------------------------------------------------------------------------- #
+# Individual rules
+# --------------------------------------------------------------------------- #
+def _email(text: str) -> FieldGuess | None:
+    emails = list(dict.fromkeys(_EMAIL_RE.findall(text)))
+    if not emails:
+        return None
+    if len(emails) == 1:
+        return FieldGuess(emails[0], 0.95)
+    for email in emails:
+        if _EMAIL_HINT_RE.search(email.split("@", 1)[0]):
+            return FieldGuess(email, 0.85)
+    return FieldGuess(emails[0], 0.6)
+
+
+def _phone(text: str) -> FieldGuess | None:
+    best = None
+    for m in _PHONE_RE.finditer(text):
+        raw = m.group(0).strip()
+        digits = sum(c.isdigit() for c in raw)
+        if not 7 <= digits <= 15 or _DATE_LIKE_RE.fullmatch(raw):
+            continue
+        hinted = bool(_PHONE_HINT_RE.search(text[max(0, m.start() - 20):m.start()]))
+        guess = FieldGuess(raw, 0.9 if hinted else 0.55)
+        if hinted:
+            return guess
+        best = best or guess
+    return best
+
+
+def _parse_amount(raw: str) -> float:
+    raw = raw.strip().lower().replace(" ", "")
+    if raw.endswith("k"):
+        return float(raw[:-1].replace(",", ".")) * 1000
+    return float(re.sub(r"[.,]", "", raw))
+
+
+def _salary(text: str) -> tuple[FieldGuess, FieldGuess | None] | None:
+    for m in _SALARY_RANGE_RE.finditer(text):
+        try:
+            low, high = _parse_amount(m.group("low")), _parse_amount(m.group("high"))
+        except ValueError:
+            continue
+        if not (1000 <= low < high <= 1_000_000):
+            continue                          # years, postcodes, phone fragments …
+        cur = next((m.group(g) for g in ("cur1", "cur2", "cur3", "cur4") if m.group(g)), None)
+        hinted = bool(_SALARY_HINT_RE.search(text[max(0, m.start() - 60):m.end() + 30]))
+        if not cur and not hinted:
+            continue
+        confidence = 0.9 if cur and hinted else 0.8 if cur else 0.65
+        code = _CURRENCY_MAP.get(cur.lower()) if cur else None
+        value = f"{low:,.0f} – {high:,.0f}".replace(",", " ") + (f" {code}" if code else "")
+        return FieldGuess(value, confidence), (FieldGuess(code, confidence) if code else None)
+    return None
+
+
+def _start_date(text: str) -> FieldGuess | None:
+    m = _START_DATE_RE.search(text)
+    if m:
+        d, mo, y = int(m.group("d")), int(m.group("m")), int(m.group("y"))
+        if 1 <= d <= 31 and 1 <= mo <= 12:
+            return FieldGuess(f"{y:04d}-{mo:02d}-{d:02d}", 0.85)
+    m = _ISO_DATE_RE.search(text)
+    if m:
+        return FieldGuess(m.group("iso"), 0.85)
+    if _ASAP_RE.search(text):
+        return FieldGuess("ASAP", 0.85)
+    return None
+
+
+def _vacation(text: str) -> FieldGuess | None:
+    m = _VACATION_RE.search(text)
+    if not m:
+        return None
+    days = int(m.group("n"))
+    return FieldGuess(f"{days} days", 0.9 if 20 <= days <= 40 else 0.5)
+
+
+def _gazetteer(text: str, table) -> FieldGuess | None:
+    hits = [option for pattern, option in table if pattern.search(text)]
+    if not hits:
+        return None
+    # A single unambiguous hit is reliable; several competing ones are not
+    return FieldGuess(hits[0], 0.85 if len(hits) == 1 else 0.5)
+
+
+# --------------------------------------------------------------------------- #
+# Public façade
+# --------------------------------------------------------------------------- #
+def extract_structured_fields(text: str) -> Dict[str, FieldGuess]:
+    """Run every rule over *text*; returns ``{field: FieldGuess}`` for fields found."""
+    if not text:
+        return {}
+
+    found: Dict[str, FieldGuess] = {}
+
+    def put(key: str, guess: FieldGuess | None) -> None:
+        if guess is not None:
+            found[key] = guess
+
+    put("recruitment_contact_email", _email(text))
+    put("recruitment_contact_phone", _phone(text))
+    salary = _salary(text)
+    if salary:
+        put("salary_range", salary[0])
+        put("currency", salary[1])
+    put("date_of_employment_start", _start_date(text))
+    put("vacation_days", _vacation(text))
+    put("job_type", _gazetteer(text, _JOB_TYPES))
+    put("contract_type", _gazetteer(text, _CONTRACT_TYPES))
+    put("remote_work_policy", _gazetteer(text, _REMOTE_POLICIES))
+    return found
+
+
+def confident_fields(text: str, threshold: float = CONFIDENCE_THRESHOLD) -> Dict[str, str]:
+    """Return ``{field: value}`` for rule hits with confidence ≥ *threshold*."""
+    return {
+        key: guess.value
+        for key, guess in extract_structured_fields(text).items()
+        if guess.confidence >= threshold
+    }
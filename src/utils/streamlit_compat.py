@@ -0,0 +1,34 @@
+"""
+streamlit_compat.py – small shims over Streamlit APIs that moved between versions.
+
+``fragment`` resolves to ``st.fragment`` (1.37+), ``st.experimental_fragment``
+(1.33–1.36) or, on older releases, a no-op decorator – the decorated function
+then simply runs as part of the full script rerun, as before.
+
+Typical usage
+-------------
+>>> from src.utils.streamlit_compat import fragment
+>>> @fragment
+... def trace_panel():
+...     st.write("only this block reruns when its widgets change")
+"""
+
+from __future__ import annotations
+
+from typing import Callable, TypeVar
+
+import streamlit as st
+
+F = TypeVar("F", bound=Callable)
+
+
+def _no_fragment(func: F) -> F:
+    return func
+
+
+fragment: Callable[[F], F] = (
+    getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or _no_fragment
+)
+
+# True when widget interactions inside a fragment rerun only that fragment
+HAS_FRAGMENTS = fragment is not _no_fragment
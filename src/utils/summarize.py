@@ -1,10 +1,13 @@
 import os
-import openai
+
+from src.utils.tool_registry import chat_completion
+from src.utils.tracing import traced
 
 # Choose a model for summarization: use GPT-3.5 for economy/standard to save cost, GPT-4 for high fidelity if needed.
 SUMMARIZE_MODEL_ECO = os.getenv("SUMMARIZE_MODEL_ECO", "gpt-3.5-turbo")
 SUMMARIZE_MODEL_HI = os.getenv("SUMMARIZE_MODEL_HI", "gpt-4")
 
+@traced("llm.summarize_text")
 def summarize_text(text: str, quality: str = "standard") -> str:
     """
     Summarize the given text at the specified quality level.
@@ -31,13 +34,13 @@ def summarize_text(text: str, quality: str = "standard") -> str:
         max_tokens = 600
 
     try:
-        response = openai.ChatCompletion.create(
+        summary = chat_completion(
+            prompt,
             model=model,
-            messages=[{"role": "user", "content": prompt}],
             temperature=0.0,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            operation=f"summarize_text.{quality}",
         )
-        summary = response.choices[0].message.content.strip()
     except Exception as e:
         print(f"summarize_text: API error during summarization - {e}")
         # In case of error, fallback to simple truncation
@@ -6,6 +6,14 @@ The functions are intentionally dependency-light:
 * Only the Python standard-library is required.
 * `beautifulsoup4` is optional – when installed we use it to strip HTML tags.
 
+The default pipeline runs in a single pass over precompiled patterns: the
+HTML parser and the entity decoder are only invoked when a cheap scan finds
+markup / ``&``, NFC normalisation is skipped for already-normalised text and
+quote replacement only runs when a precompiled scan finds a fancy quote. Benchmark it
+against the step-by-step pipeline with::
+
+    python -m src.utils.text_cleanup ads/
+
 Typical usage
 -------------
 >>> from src.utils.text_cleanup import clean_text
@@ -17,8 +25,32 @@ from __future__ import annotations
 
 import html
 import re
+import sys
+import time
 import unicodedata
-from typing import Callable, Sequence
+from functools import lru_cache
+from html.parser import HTMLParser
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Sequence
+
+from src.utils.tracing import traced
+
+# --------------------------------------------------------------------------- #
+# Compiled once
+# --------------------------------------------------------------------------- #
+_TAG_RE = re.compile(r"<[^>]+>")
+# Something that looks like a real tag, comment or doctype – "a < b" does not
+_MARKUP_RE = re.compile(r"<(?:[A-Za-z][\w:-]*[\s/>]|/[A-Za-z]|!)")
+# Fancy quotes/ellipsis → ASCII
+_ASCII_REPLACEMENTS = (
+    ("\u201c", '"'),  # left “
+    ("\u201d", '"'),  # right ”
+    ("\u2018", "'"),  # left ‘
+    ("\u2019", "'"),  # right ’
+    ("\u2026", "..."),
+)
+_FANCY_RE = re.compile("[" + "".join(bad for bad, _ in _ASCII_REPLACEMENTS) + "]")
 
 # --------------------------------------------------------------------------- #
 # Low-level helpers
@@ -30,33 +62,61 @@ def _strip_html(raw: str) -> str:
         from bs4 import BeautifulSoup  # heavyweight import, keep lazy
     except ImportError:
         # Fallback – blunt removal of <>… tags
-        return re.sub(r"<[^>]+>", "", raw)
+        return _TAG_RE.sub("", raw)
 
     soup = BeautifulSoup(raw, "html.parser")
     return soup.get_text(separator=" ")
 
 def _collapse_ws(text: str) -> str:
     """Collapse all runs of whitespace (incl. newlines) → single space."""
-    return re.sub(r"\s+", " ", text, flags=re.UNICODE).strip()
+    # str.split() uses the same Unicode whitespace class as \s, ~3× faster than re.sub
+    return " ".join(text.split())
 
 def _normalise_unicode(text: str) -> str:
     """Use NFC normalisation and convert fancy quotes/ellipses to ASCII."""
-    text = unicodedata.normalize("NFC", text)
-    # Very small ASCII replacement table – extend if you like
-    replacements = {
-        "\u201c": '"',  # left “
-        "\u201d": '"',  # right ”
-        "\u2018": "'",  # left ‘
-        "\u2019": "'",  # right ’
-        "\u2026": "...",
-    }
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
+    if text.isascii():
+        return text
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    # Very small ASCII replacement table – extend _ASCII_REPLACEMENTS if you like.
+    # str.replace scans at C speed; str.translate falls back to a per-character
+    # slow path for non-ASCII input, so it is not used here.
+    if _FANCY_RE.search(text):
+        for bad, good in _ASCII_REPLACEMENTS:
+            text = text.replace(bad, good)
     return text
 
+
+def _looks_like_html(text: str) -> bool:
+    """Cheap pre-scan: does *text* contain anything tag-like?"""
+    return "<" in text and _MARKUP_RE.search(text) is not None
+
+
+def _prepare(raw: str) -> str:
+    """Default pipeline minus whitespace collapsing; each step only runs if it can matter."""
+    text = html.unescape(raw) if "&" in raw else raw
+    if _looks_like_html(text):
+        text = _strip_html(text)
+    return _normalise_unicode(text)
+
+
+def _default_clean(raw: str) -> str:
+    """The default pipeline in one pass."""
+    return _collapse_ws(_prepare(raw))
+
+
+# Step-by-step form of the default pipeline (also the benchmark baseline)
+DEFAULT_STEPS: tuple[Callable[[str], str], ...] = (
+    html.unescape,
+    _strip_html,
+    _normalise_unicode,
+    _collapse_ws,
+)
+
 # --------------------------------------------------------------------------- #
 # Public façade
 # --------------------------------------------------------------------------- #
+@traced("text.clean_text")
 def clean_text(
     raw: str,
     *,
@@ -81,23 +141,213 @@ def clean_text(
     """
     if raw is None:
         return ""
-
-    pipeline = steps or (
-        lambda s: html.unescape(s),
-        _strip_html,
-        _normalise_unicode,
-        _collapse_ws,
-    )
+    if not steps:
+        return _default_clean(raw)
 
     cleaned = raw
-    for fn in pipeline:
+    for fn in steps:
         cleaned = fn(cleaned)
     return cleaned
 
 
+# --------------------------------------------------------------------------- #
+# Streaming variant – for multi-MB documents
+# --------------------------------------------------------------------------- #
+# Raw text ending in what ``html.unescape`` could still read as an entity
+_PARTIAL_ENTITY_RE = re.compile(r"&(?:#[xX]?[0-9a-fA-F]*|[^\t\n\f <&#;]{0,32})$")
+_LAST_SPACE_RE = re.compile(r"[\s\S]*\s")
+# Strings inside these never reach BeautifulSoup's get_text
+_HIDDEN_TAGS = {"script", "style", "template", "rt", "rp"}
+# Past this much unsplittable text the carry is cut at the last whitespace anyway
+_MAX_CARRY = 1 << 18
+
+
+@lru_cache(maxsize=None)
+def _bs4_available() -> bool:
+    return find_spec("bs4") is not None
+
+
+def _last_space(text: str, start: int, stop: int) -> int:
+    """Position just after the last whitespace in ``text[start:stop]``, or -1."""
+    m = _LAST_SPACE_RE.match(text, start, stop)
+    return m.end() if m else -1
+
+
+@lru_cache(maxsize=None)
+def _void_tags() -> frozenset:
+    from bs4.builder import HTMLTreeBuilder
+    return frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+
+
+class _SafeCuts(HTMLParser):
+    """
+    Runs unescaped text through ``html.parser`` the way BeautifulSoup does and
+    records the last whitespace it reads as visible text, outside any hidden
+    element, together with the tags still open there.
+    """
+
+    def __init__(self, context: tuple[str, ...]) -> None:
+        super().__init__(convert_charrefs=False)
+        self.stack = list(context)
+        self.hidden = sum(name in _HIDDEN_TAGS for name in self.stack)
+        self.read_to = 0                    # end of the last construct handled
+        self.cut, self.at_cut = 0, context
+
+    def updatepos(self, i: int, j: int) -> int:
+        self.read_to = j
+        return super().updatepos(i, j)
+
+    def handle_data(self, data: str) -> None:
+        if not self.hidden:
+            space = _last_space(data, 0, len(data))
+            if space > 0:
+                self.cut, self.at_cut = self.read_to + space, tuple(self.stack)
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag not in _void_tags():
+            self.stack.append(tag)
+            self.hidden += tag in _HIDDEN_TAGS
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        pass                                # opened and closed again
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.stack:               # closes everything opened inside it too
+            i = len(self.stack) - 1 - self.stack[::-1].index(tag)
+            self.hidden -= sum(name in _HIDDEN_TAGS for name in self.stack[i:])
+            del self.stack[i:]
+
+
+def _split_safe(text: str, context: tuple[str, ...] = ()) -> tuple[str, str, tuple[str, ...]]:
+    """
+    Split unescaped *text* into ``(ready, carry, open_tags)`` so that *ready*
+    ends in whitespace outside any markup. Cleaning ``open_tags`` + carry on
+    its own then gives the words of cleaning it after *ready*.
+    """
+    if _bs4_available():
+        cuts = _SafeCuts(context)
+        cuts.feed(text)                     # no close(): an unfinished construct stays unread
+        cut, context = cuts.cut, cuts.at_cut
+    else:
+        # the regex fallback strips "<" … first ">" – never cut after an unmatched "<"
+        cut = _last_space(text, 0, len(text))
+        while cut > 0 and text.rfind("<", 0, cut) > text.rfind(">", 0, cut):
+            cut = _last_space(text, 0, text.rfind("<", 0, cut))
+        cut = max(0, cut)
+    if not cut and len(text) > _MAX_CARRY:
+        cut = max(0, _last_space(text, 0, len(text)))
+    return text[:cut], text[cut:], context
+
+
+def _words(text: str, markup: bool, context: tuple[str, ...] = ()) -> list[str]:
+    if markup:
+        text = _strip_html("".join(f"<{name}>" for name in context) + text)
+    return _normalise_unicode(text).split()
+
+
+def clean_text_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming form of the default ``clean_text`` pipeline.
+
+    Consumes an iterable of text chunks (e.g. pages from
+    ``file_tools.iter_pdf_pages``) and lazily yields cleaned chunks whose
+    concatenation equals ``clean_text("".join(chunks))``. The stream mirrors
+    the pipeline stage by stage: raw text is unescaped once any entity it
+    ends in is complete, and the unescaped text is only cut at whitespace
+    outside tags, comments and script/style blocks – the tags still open
+    there are replayed before the next piece – so markup and entities split
+    across chunks are cleaned together. Pieces that tag stripping would change
+    are held back until the document is known to contain markup. Peak memory
+    is one chunk plus a small carry (at most ``_MAX_CARRY`` characters of
+    unsplittable text; beyond that the result may differ).
+
+    >>> "".join(clean_text_stream(["Hello   Wor", "ld &am", "p; “you” ", "  there"]))
+    'Hello World & "you" there'
+    """
+    carry = ""               # raw text that may end inside an entity
+    pending = ""             # unescaped text not yet cut at a safe point
+    context: tuple[str, ...] = ()             # tags open before *pending*
+    held: list[tuple[tuple[str, ...], str]] = []   # pieces that clean differently with / without markup
+    markup = False           # the document contains tags
+    emitted = False
+
+    def out(words: list[str]) -> Iterator[str]:
+        nonlocal emitted
+        if words:
+            yield (" " if emitted else "") + " ".join(words)
+            emitted = True
+
+    def piece(text: str, opened: tuple[str, ...]) -> Iterator[str]:
+        nonlocal markup
+        if not markup and _looks_like_html(text):
+            markup = True
+            for earlier, held_text in held:
+                yield from out(_words(held_text, True, earlier))
+            held.clear()
+        if markup:
+            yield from out(_words(text, True, opened))
+            return
+        words = _words(text, False)
+        if held or (("&" in text or "<" in text) and _words(text, True, opened) != words):
+            held.append((opened, text))
+        else:
+            yield from out(words)
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        raw = carry + chunk
+        m = _PARTIAL_ENTITY_RE.search(raw)
+        raw, carry = (raw[:m.start()], raw[m.start():]) if m else (raw, "")
+        pending += html.unescape(raw) if "&" in raw else raw
+        opened = context
+        ready, pending, context = _split_safe(pending, context)
+        if ready:
+            yield from piece(ready, opened)
+    pending += html.unescape(carry) if carry else ""
+    if pending:
+        yield from piece(pending, context)
+    for _, text in held:                     # no markup after all
+        yield from out(_words(text, False))
+
+
 # --------------------------------------------------------------------------- #
 # Convenience – very rough token estimate (≈4 chars per token for English)
 # --------------------------------------------------------------------------- #
 def estimated_token_count(text: str) -> int:
     """Cheap heuristic: #tokens ≈ len(text) / 4."""
     return max(1, len(text) // 4)
+
+
+# --------------------------------------------------------------------------- #
+# Benchmark – python -m src.utils.text_cleanup <dir-or-files…>
+# --------------------------------------------------------------------------- #
+def _benchmark(paths: Sequence[str], repeat: int = 5) -> None:
+    corpus = []
+    for arg in paths:
+        p = Path(arg)
+        files = sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p]
+        for f in files:
+            if f.suffix.lower() in (".txt", ".html", ".htm", ".md"):
+                corpus.append(f.read_text(encoding="utf-8", errors="replace"))
+    if not corpus:
+        print("No .txt/.html/.md files found.")
+        return
+
+    kb = sum(len(t) for t in corpus) / 1024
+    for label, steps in (("step-by-step", DEFAULT_STEPS), ("single-pass", None)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text in corpus:
+                clean_text(text, steps=steps)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:>13}: {best * 1e3:8.1f} ms for {len(corpus)} docs / {kb:.0f} KB"
+              f"  ({best * 1e6 / kb:.1f} µs/KB)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m src.utils.text_cleanup <dir-or-files…>")
+        sys.exit(2)
+    _benchmark(sys.argv[1:])
@@ -4,6 +4,8 @@
 Global Tool & LLM helper for Vacalyser Wizard
 =============================================
 *  **chat_completion(...)**  → OpenAI v1 wrapper (3-retry exponential back-off)
+*  **call_with_retry(...)**  → same retries for any ``client.….create`` call
+   (both book tokens, cost, latency and retries in ``llm_usage``)
 *  **@tool** / get_tool()    → tiny registry making any callable discoverable
 ---------------------------------------------------------------------------
 Environment variables *or* Streamlit `st.secrets` are honoured automatically:
@@ -17,16 +19,19 @@ from __future__ import annotations
 
 import logging
 import os
+import time
 from typing import Any, Callable, Dict, List
 
 import streamlit as st
 from openai import OpenAI                     # pip install openai>=1.0
+from src.utils.tracing import span
 from tenacity import (                        # pip install tenacity
-    retry,
+    Retrying,
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type,
 )
+from src.utils.llm_usage import record_error, record_response
 
 # ────────────────────────────────────────────────────────────────────────────
 # 1  OpenAI client (instantiated exactly once)
@@ -48,23 +53,50 @@ _MODEL_DEFAULT: str = (
 )
 
 # ────────────────────────────────────────────────────────────────────────────
-# 1a  Low-level chat call with three retries (1 → 4 s back-off)
+# 1a  Low-level calls with three retries (1 → 4 s back-off) + usage accounting
 # ────────────────────────────────────────────────────────────────────────────
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=1, max=4),
-    retry=retry_if_exception_type(Exception),
-    reraise=True,
-)
+def _retrying() -> Retrying:
+    return Retrying(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=4),
+        retry=retry_if_exception_type(Exception),
+        reraise=True,
+    )
+
+
+def call_with_retry(create: Callable[..., Any], *args: Any, operation: str = "openai.create", **kwargs: Any) -> Any:
+    """
+    Call an OpenAI ``create`` function with three retries and return its
+    response; tokens, latency and the number of retries are booked under
+    *operation* (failures too, once all attempts are spent).
+    """
+    started = time.perf_counter()
+    attempts = 0
+    try:
+        for attempt in _retrying():
+            with attempt:
+                attempts += 1
+                resp = create(*args, **kwargs)
+    except Exception as e:
+        record_error(operation, kwargs.get("model", "unknown"), e,
+                     latency=time.perf_counter() - started, retries=attempts - 1)
+        raise
+    record_response(operation, resp, latency=time.perf_counter() - started, retries=attempts - 1)
+    return resp
+
+
 def _send_chat(
     messages: List[Dict[str, str]],
     *,
     model: str,
     temperature: float,
     max_tokens: int,
+    operation: str = "chat_completion",
 ) -> str:
     """Returns **content** of the first choice (stripped)."""
-    resp = _client.chat.completions.create(
+    resp = call_with_retry(
+        _client.chat.completions.create,
+        operation=operation,
         model=model,
         messages=messages,
         temperature=temperature,
@@ -80,23 +112,29 @@ def chat_completion(
     model: str = _MODEL_DEFAULT,
     temperature: float = 0.7,
     max_tokens: int = 256,
+    operation: str = "chat_completion",
 ) -> str:
     """
     Convenience façade around OpenAI ChatCompletion.
 
     Only **returns the assistant content** (so callers never need to unpack).
     Retries (3×) are built-in; any exception after three attempts will bubble up.
+    *operation* names the calling code path in the usage accounting.
     """
     msgs: list[dict[str, str]] = []
     if system:
         msgs.append({"role": "system", "content": system})
     msgs.append({"role": "user", "content": prompt})
-    return _send_chat(
-        msgs,
-        model=model,
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
+    with span("llm.chat_completion", model=model, operation=operation, prompt_chars=len(prompt)) as sp:
+        content = _send_chat(
+            msgs,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            operation=operation,
+        )
+        sp.set("response_chars", len(content))
+    return content
 
 # ────────────────────────────────────────────────────────────────────────────
 # 2  Tool registry (super-small on purpose)
@@ -0,0 +1,319 @@
+"""
+tracing.py – lightweight spans for "where did the time go?" questions.
+
+* ``span(name, **attrs)`` is a context manager; spans opened inside it (same
+  thread / asyncio task – tracked with ``contextvars``) become its children.
+* ``@traced()`` wraps a whole function in a span named after it.
+* Sampling is decided once per root span (``VACALYSER_TRACE_SAMPLE``, 0…1),
+  children follow their root. An unsampled span is a shared no-op object –
+  the cost is one ContextVar lookup and one ``random()`` per root.
+* Finished traces (all spans of one root) go to the configured exporters:
+  ``jsonl`` (one span per line) and ``otlp`` (one OTLP/JSON
+  ``ExportTraceServiceRequest`` per line, readable by the OpenTelemetry
+  collector's file receiver and most trace viewers), and to the sink returned
+  by ``set_sink_resolver`` – the app uses that to show a session's traces in
+  the Trace-Viewer timeline.
+
+Environment variables:
+
+    VACALYSER_TRACING=0             disable spans entirely
+    VACALYSER_TRACE_SAMPLE          fraction of root spans recorded (default 1.0)
+    VACALYSER_TRACE_EXPORT          comma list of exporters: jsonl, otlp (default: none)
+    VACALYSER_TRACE_EXPORT_DIR      output directory (default ~/.cache/vacalyser/traces)
+
+Typical usage
+-------------
+>>> from src.utils.tracing import span, traced
+>>> @traced()
+... def parse(text):
+...     return text.split()
+>>> with span("wizard.analyze", chars=11) as sp:
+...     words = parse("hello world")
+...     sp.set("words", len(words))
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACING_ENABLED = os.getenv("VACALYSER_TRACING", "1") != "0"
+SAMPLE_RATE = float(os.getenv("VACALYSER_TRACE_SAMPLE", "1.0"))
+EXPORT_DIR = Path(os.getenv("VACALYSER_TRACE_EXPORT_DIR", Path.home() / ".cache" / "vacalyser" / "traces"))
+# Runaway loops must not grow one trace without bound
+MAX_SPANS_PER_TRACE = 2000
+
+_SERVICE_NAME = "vacalyser"
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 1  Span objects
+# ────────────────────────────────────────────────────────────────────────────
+class _Trace:
+    __slots__ = ("trace_id", "spans", "sink")
+
+    def __init__(self, sink: Optional[Callable[[List["Span"]], None]]) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.sink = sink
+
+
+class Span:
+    """One timed operation; use via ``span()``, not directly."""
+
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "start_ns", "end_ns", "error", "_trace", "_token")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], trace: _Trace, parent_id: Optional[str]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._trace = trace
+        self._token = None
+
+    @property
+    def trace_id(self) -> str:
+        return self._trace.trace_id
+
+    @property
+    def duration(self) -> float:
+        """Seconds (0 while the span is still open)."""
+        return max(0, self.end_ns - self.start_ns) / 1e9
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        trace = self._trace
+        if len(trace.spans) < MAX_SPANS_PER_TRACE or self.parent_id is None:
+            trace.spans.append(self)
+        if self.parent_id is None:
+            _finish(trace)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration * 1000, 3),
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, {self.duration * 1000:.1f} ms)"
+
+
+class _NoopSpan:
+    """Stands in for unsampled spans; a root no-op also silences its children."""
+
+    __slots__ = ("_token",)
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        self._token = _current.set(_UNSAMPLED)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+
+
+class _NestedNoop(_NoopSpan):
+    """Child of an unsampled root – nothing to set or reset."""
+
+    def __enter__(self) -> "_NestedNoop":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_UNSAMPLED = object()
+_NESTED_NOOP = _NestedNoop()
+_current: ContextVar[Any] = ContextVar("vacalyser_span", default=None)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 2  Public API
+# ────────────────────────────────────────────────────────────────────────────
+def span(name: str, **attrs: Any) -> Span | _NoopSpan:
+    """Open a span named *name*; use as ``with span(...) as sp:``."""
+    parent = _current.get()
+    if parent is _UNSAMPLED or not TRACING_ENABLED:
+        return _NESTED_NOOP
+    if parent is None:
+        if SAMPLE_RATE < 1.0 and random.random() >= SAMPLE_RATE:
+            return _NoopSpan()
+        return Span(name, attrs, _Trace(_resolve_sink()), None)
+    return Span(name, attrs, parent._trace, parent.span_id)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator: run the function inside ``span(name or module.qualname)``."""
+    def deco(func: F) -> F:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return deco
+
+
+def current_span() -> Optional[Span]:
+    parent = _current.get()
+    return parent if isinstance(parent, Span) else None
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# 3  Sinks & exporters
+# ────────────────────────────────────────────────────────────────────────────
+_sink_resolver: Optional[Callable[[], Optional[Callable[[List[Span]], None]]]] = None
+
+
+def set_sink_resolver(resolver: Optional[Callable[[], Optional[Callable[[List[Span]], None]]]]) -> None:
+    """
+    *resolver* is called when a sampled root span starts and may return a
+    callable that receives the finished spans of that trace (e.g. the
+    current Streamlit session's trace log), or None.
+    """
+    global _sink_resolver
+    _sink_resolver = resolver
+
+
+def _resolve_sink() -> Optional[Callable[[List[Span]], None]]:
+    if _sink_resolver is None:
+        return None
+    try:
+        return _sink_resolver()
+    except Exception as e:
+        print(f"tracing: sink resolver failed - {e}")
+        return None
+
+
+class JsonlExporter:
+    """Appends one JSON object per span to *path*."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(s.as_dict(), ensure_ascii=False, default=str) + "\n" for s in spans)
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}             # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """One trace as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": _SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 1,                          # SPAN_KIND_INTERNAL
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attrs.items()],
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+class OtlpJsonExporter(JsonlExporter):
+    """Appends one OTLP/JSON request per trace to *path* (JSON Lines)."""
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(to_otlp(spans), ensure_ascii=False, default=str) + "\n"
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(line)
+
+
+_EXPORTER_TYPES = {"jsonl": (JsonlExporter, "spans.jsonl"), "otlp": (OtlpJsonExporter, "traces.otlp.jsonl")}
+_exporters: List[JsonlExporter] = []
+
+
+def add_exporter(exporter: Any) -> None:
+    """Register anything with an ``export(spans)`` method."""
+    _exporters.append(exporter)
+
+
+def _configure_from_env() -> None:
+    names = [n.strip() for n in os.getenv("VACALYSER_TRACE_EXPORT", "").split(",") if n.strip()]
+    if not names:
+        return
+    try:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"tracing: export directory unavailable - {e}")
+        return
+    for name in names:
+        if name not in _EXPORTER_TYPES:
+            print(f"tracing: unknown exporter '{name}' (expected one of {', '.join(_EXPORTER_TYPES)})")
+            continue
+        cls, filename = _EXPORTER_TYPES[name]
+        add_exporter(cls(EXPORT_DIR / filename))
+
+
+def _finish(trace: _Trace) -> None:
+    # Children close before their root – order by start time for viewers
+    spans = sorted(trace.spans, key=lambda s: s.start_ns)
+    if trace.sink is not None:
+        try:
+            trace.sink(spans)
+        except Exception as e:
+            print(f"tracing: sink failed - {e}")
+    for exporter in _exporters:
+        try:
+            exporter.export(spans)
+        except Exception as e:
+            print(f"tracing: {type(exporter).__name__} failed - {e}")
+
+
+_configure_from_env()
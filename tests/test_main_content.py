@@ -0,0 +1,23 @@
+from src.utils.main_content import extract_main_content
+
+AD = (
+    "<nav><a href='/'>Home</a> <a href='/jobs'>Jobs</a></nav>"
+    "<div class='job-description'><h2>Data Engineer (m/w/d)</h2>"
+    "<p>We are looking for a data engineer to build pipelines, models and dashboards "
+    "for our analytics team in Berlin, working closely with product, finance and sales.</p>"
+    "<ul><li>Design and run ETL jobs, streaming pipelines and data quality checks</li>"
+    "<li>Python, SQL, Airflow, dbt and a cloud data warehouse</li></ul></div>"
+    "<footer>Impressum</footer>"
+)
+
+
+def test_plain_page():
+    text = extract_main_content(f"<html><body>{AD}</body></html>")
+    assert "## Data Engineer (m/w/d)" in text
+    assert "- Python, SQL, Airflow, dbt and a cloud data warehouse" in text
+    assert "Impressum" not in text
+
+
+def test_page_wrapped_in_form():
+    page = f"<html><body><form id='aspnetForm' method='post'>{AD}</form></body></html>"
+    assert extract_main_content(page) == extract_main_content(f"<html><body>{AD}</body></html>")
@@ -0,0 +1,32 @@
+import random
+
+from src.utils.text_cleanup import clean_text, clean_text_stream
+
+PARTS = [
+    "<p", " cl", "ass='x'>", "</p>", "</ p>", "<br>", "<b>", "</b>", "<!-- c > d -->", "<script>",
+    "var a = '<p>' ", "</script>", "<template>", "</template>", "title='a > b'", "<!DOCTYPE html>",
+    "&amp;", "&lt;", "&amp;lt;", "&nbsp;", "&#233;", "&#x41", "&copy", "&notit;", "&", ";", "<", ">",
+    "x<y", "a", "b", " ", "\t", "\n", "é", "́", "“",
+]
+
+
+def _chunks(text, rng):
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 6)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_stream_doctest_example():
+    assert "".join(clean_text_stream(["Hello   Wor", "ld &am", "p; “you” ", "  there"])) == 'Hello World & "you" there'
+
+
+def test_stream_keeps_tag_and_entity_across_chunks():
+    chunks = ["\t<p cl", "ass='x'>&amp;aa", ""]
+    assert "".join(clean_text_stream(chunks)) == clean_text("".join(chunks)) == "&aa"
+
+
+def test_stream_equals_clean_text():
+    rng = random.Random(38)
+    for _ in range(2000):
+        text = "".join(rng.choice(PARTS) for _ in range(rng.randint(1, 20)))
+        chunks = _chunks(text, rng)
+        assert "".join(clean_text_stream(chunks)) == clean_text(text), chunks